@@ -0,0 +1,57 @@
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import maplib.constants as consts
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_peak_rss_kb():
+    """
+    Peak resident set size of the current process in KiB, or None if the
+    platform does not provide it.
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024
+    return peak_rss
+
+
+def measure(func, *args, trace=True, **kwargs):
+    """
+    Return (result, seconds, peak traced python memory in KiB).
+    Tracing slows python down a lot, if trace is False the peak is None.
+    """
+    if trace:
+        tracemalloc.start()
+    begin = time.perf_counter()
+    result = func(*args, **kwargs)
+    end = time.perf_counter()
+    if not trace:
+        return result, end - begin, None
+    peak_memory = tracemalloc.get_traced_memory()[1] // 1024
+    tracemalloc.stop()
+    return result, end - begin, peak_memory
+
+
+def run_module_in_subprocess(module_name, *args):
+    """
+    Runs `python -m module_name args` in a fresh interpreter, which should
+    print a single json object as its last line of output.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-m", module_name, *args],
+        cwd=consts.REPOSITORY_DIR,
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    last_line = completed.stdout.decode(consts.UTF_8).strip().splitlines()[-1]
+    return json.loads(last_line)
@@ -0,0 +1,134 @@
+"""
+Compares computing the control points of a synthetic metro line pair by
+pair with np.linalg (as Metro used to) against the closed-form solver,
+both pair by pair and all pairs at once. Where the offset of two parallel
+stations is diagonal to their lines, np.linalg picks the bypass direction
+by rounding noise and the closed form takes the tie branch, so those
+control points differ.
+    python -m benchmarks.control_point_benchmark [-n 10000] [--seed 0]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from maplib.tools.numpy_type_tools import np_float
+from maplib.tools.numpy_type_tools import np_to_tuple
+from maplib.tools.simple_functions import adjacent_n_tuples
+from maplib.tools.simple_functions import format_table
+from maplib.tools.simple_functions import shrink_value
+from maplib.tools.space_ops import midpoint
+from maplib.tools.space_ops import restore_angle
+from maplib.tools.space_ops import rotate
+from maplib.tools.space_ops import solve_intersection_point
+from maplib.utils.models import Metro
+
+
+class LinalgMetro(Metro):
+    """
+    The solver of Metro before the closed form, kept for reference.
+    """
+    def compute_control_points(self, station_coords):
+        control_points = []
+        for point1, point2 in adjacent_n_tuples(station_coords, 2, self.loop):
+            control_points = self.update_control_point(point1, point2, control_points)
+        if not self.loop:
+            control_points.insert(0, station_coords[0])
+            control_points.append(station_coords[-1])
+        return control_points
+
+    def update_control_point(self, point1, point2, control_points):
+        simplified_direction1 = self.coord_to_direction_dict[np_to_tuple(point1)]
+        simplified_direction2 = self.coord_to_direction_dict[np_to_tuple(point2)]
+        theta1, theta2 = [
+            restore_angle(simplified_direction)
+            for simplified_direction in [simplified_direction1, simplified_direction2]
+        ]
+        intersection_point = solve_intersection_point(point1, theta1, point2, theta2)
+        if intersection_point is None:
+            append_point = self.append_new_point(point1, point2, simplified_direction1)
+            control_points = self.update_control_point(point1, append_point, control_points)
+            control_points = self.update_control_point(point2, append_point, control_points)
+        elif intersection_point is not np.nan:
+            control_points.append(intersection_point)
+        return control_points
+
+    def append_new_point(self, point1, point2, simplified_direction):
+        rotated_point1, rotated_point2 = [
+            rotate(point, -restore_angle(simplified_direction))
+            for point in [point1, point2]
+        ]
+        h, v = rotated_point2 - rotated_point1
+        if v < 0:
+            h, v = -h, -v
+        if h > v:
+            append_direction = 1
+        elif h < -v:
+            append_direction = 3
+        else:
+            append_direction = 2
+        append_point = midpoint(point1, point2)
+        append_direction = shrink_value(simplified_direction + append_direction, 0, 4)
+        self.coord_to_direction_dict[np_to_tuple(append_point)] = append_direction
+        return append_point
+
+
+class PairwiseMetro(Metro):
+    """
+    The closed-form solver, forced to go pair by pair.
+    """
+    def solve_control_points(self, pairs):
+        return None
+
+
+def get_synthetic_stations(num_stations, seed):
+    """
+    A line going right, whose stations are at least 2 apart in x so that
+    no midpoint is keyed the same as a station.
+    """
+    rng = np.random.default_rng(seed)
+    xs = np.cumsum(rng.integers(2, 5, num_stations))
+    ys = np.cumsum(rng.integers(-3, 4, num_stations))
+    directions = rng.integers(0, 4, num_stations)
+    station_coords = [np_float(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+    return station_coords, directions.tolist()
+
+
+def solve(ClassName, station_coords, directions):
+    metro = ClassName.__new__(ClassName)
+    metro.loop = False
+    metro.init_dicts()
+    for station_coord, direction in zip(station_coords, directions):
+        metro.coord_to_direction_dict[np_to_tuple(station_coord)] = direction
+    begin = time.perf_counter()
+    control_points = metro.compute_control_points(station_coords)
+    return control_points, time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--num-stations", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    station_coords, directions = get_synthetic_stations(args.num_stations, args.seed)
+    reference_points, reference_seconds = solve(LinalgMetro, station_coords, directions)
+    pairwise_points, pairwise_seconds = solve(PairwiseMetro, station_coords, directions)
+    vectorized_points, vectorized_seconds = solve(Metro, station_coords, directions)
+    if not np.array_equal(pairwise_points, vectorized_points):
+        raise ValueError("closed form all at once")
+    diff_vals = np.abs(np.array(vectorized_points) - np.array(reference_points)).max(axis=1)
+    rows = [
+        ["np.linalg pair by pair", "{0:.3f}".format(reference_seconds)],
+        ["closed form pair by pair", "{0:.3f}".format(pairwise_seconds)],
+        ["closed form all at once", "{0:.3f}".format(vectorized_seconds)],
+    ]
+    print(format_table(("solver", "seconds"), rows))
+    print("{0} stations, {1} control points, {2} off by rounding (max {3:.1e}), {4} off by ties".format(
+        args.num_stations, len(reference_points),
+        np.count_nonzero((diff_vals > 0) & (diff_vals < 1e-9)), diff_vals[diff_vals < 1e-9].max(),
+        np.count_nonzero(diff_vals >= 1e-9),
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares building the glyph paths of a project from path strings (parsed
+and checked every time) against pre-parsed glyph outlines.
+    python -m benchmarks.glyph_outline_benchmark [-p Shanghai] [-r 3]
+"""
+import argparse
+import os
+import time
+
+import maplib.constants as consts
+
+from maplib.svg.path_types import CommandPath
+from maplib.svg.path_types import OutlinePath
+from maplib.tools.file_tools import load_dict
+from maplib.tools.glyph_outline import GlyphOutline
+from maplib.tools.simple_functions import format_table
+from maplib.utils.params_getter import RenderContext
+
+
+def get_path_strings(project_name):
+    global_tex_dict = load_dict(os.path.join(consts.FILE_DIR, project_name, "tex.json"))
+    return [
+        path_string
+        for font_path_dict in global_tex_dict["path"].values()
+        for path_string in font_path_dict.values()
+    ]
+
+
+def build_paths(ClassName, path_vals):
+    return [
+        ClassName("g{0}".format(index_num), path_val).attrib["d"]
+        for index_num, path_val in enumerate(path_vals)
+    ]
+
+
+def get_best_seconds(repeat, func, *args):
+    best_seconds = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - begin
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds = seconds
+    return result, best_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--project", default=consts.DEFAULT_PROJECT_CITY_NAME)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    path_strings = get_path_strings(args.project)
+    with RenderContext(args.project).activate():
+        command_strs, command_seconds = get_best_seconds(
+            args.repeat, build_paths, CommandPath, path_strings
+        )
+        outlines, parse_seconds = get_best_seconds(
+            args.repeat, lambda: [GlyphOutline.from_path_string(s) for s in path_strings]
+        )
+        outline_strs, outline_seconds = get_best_seconds(
+            args.repeat, build_paths, OutlinePath, outlines
+        )
+    if command_strs != outline_strs:
+        raise ValueError("outline paths differ from command paths")
+    rows = [
+        ["CommandPath from strings", "{0:.3f}".format(command_seconds)],
+        ["GlyphOutline parsing (once)", "{0:.3f}".format(parse_seconds)],
+        ["OutlinePath from outlines", "{0:.3f}".format(outline_seconds)],
+    ]
+    print("{0} glyph paths, identical output".format(len(path_strings)))
+    print(format_table(("step", "seconds"), rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compares loading tex.json with json.load against the mmap glyph store.
+Every backend runs in a fresh interpreter so that peak RSS is comparable.
+    python -m benchmarks.glyph_store_benchmark [-p Shanghai]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import maplib.constants as consts
+
+from benchmarks.bench_tools import get_peak_rss_kb
+from benchmarks.bench_tools import run_module_in_subprocess
+from maplib.tools.file_tools import load_dict
+from maplib.tools.glyph_store import GlyphStore
+from maplib.tools.simple_functions import format_table
+
+
+def lookup_json(json_file_name, keys):
+    global_tex_dict = load_dict(json_file_name)
+    for font_type, string in keys:
+        tex_file_dict = global_tex_dict["file"][font_type][string]
+        for path_id_num in tex_file_dict["h"].split():
+            global_tex_dict["path"][font_type][path_id_num]
+
+
+def lookup_store(store_file_name, keys):
+    store = GlyphStore(store_file_name)
+    for font_type, string in keys:
+        tex_file_dict = store.get_file_dict(font_type, string)
+        for path_id_num in tex_file_dict["h"].split():
+            store.get_path_string(font_type, path_id_num)
+    store.close()
+
+
+def run_backend(backend, json_file_name, store_file_name, keys_file_name):
+    with open(keys_file_name, "r", encoding=consts.UTF_8) as input_file:
+        keys = json.load(input_file)
+    begin = time.perf_counter()
+    if backend == "json":
+        lookup_json(json_file_name, keys)
+    elif backend == "store":
+        lookup_store(store_file_name, keys)
+    end = time.perf_counter()
+    print(json.dumps({
+        "seconds": end - begin,
+        "peak_rss_kb": get_peak_rss_kb(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--project", default=consts.DEFAULT_PROJECT_CITY_NAME)
+    parser.add_argument("--backend", choices=("none", "json", "store"))
+    parser.add_argument("--store")
+    parser.add_argument("--keys")
+    parser.add_argument("--fraction", type=float, default=1.0,
+        help="fraction of the file records looked up")
+    args = parser.parse_args()
+    json_file_name = os.path.join(consts.FILE_DIR, args.project, "tex.json")
+    if args.backend is not None:
+        run_backend(args.backend, json_file_name, args.store, args.keys)
+        return
+    global_tex_dict = load_dict(json_file_name)
+    keys = [
+        (font_type, string)
+        for font_type, font_file_dict in global_tex_dict["file"].items()
+        for string in font_file_dict
+    ]
+    keys = keys[:round(len(keys) * args.fraction)]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store_file_name = os.path.join(temp_dir, "tex.bin")
+        keys_file_name = os.path.join(temp_dir, "keys.json")
+        begin = time.perf_counter()
+        GlyphStore.write(global_tex_dict, store_file_name)
+        convert_time = time.perf_counter() - begin
+        with open(keys_file_name, "w", encoding=consts.UTF_8) as output_file:
+            json.dump(keys, output_file)
+        rows = []
+        results = {}
+        for backend in ("none", "json", "store"):
+            result = run_module_in_subprocess(
+                "benchmarks.glyph_store_benchmark", "-p", args.project, "--backend", backend,
+                "--store", store_file_name, "--keys", keys_file_name
+            )
+            results[backend] = result
+            rows.append([
+                backend,
+                "{0:.4f}".format(result["seconds"]),
+                result["peak_rss_kb"],
+            ])
+        print("{0} file records looked up, conversion took {1:.3f} s".format(len(keys), convert_time))
+        print("file sizes: json {0} B, store {1} B".format(
+            os.path.getsize(json_file_name), os.path.getsize(store_file_name)
+        ))
+        print(format_table(("backend", "seconds", "peak rss (KiB)"), rows))
+
+
+if __name__ == "__main__":
+    main()
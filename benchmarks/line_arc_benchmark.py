@@ -0,0 +1,110 @@
+"""
+Compares computing the arc corners of routes one corner at a time (as
+LineArcPath used to) against get_corner_arcs, per route and for all routes
+at once. The routes of the project are repeated to scale the count.
+    python -m benchmarks.line_arc_benchmark [-p Shanghai] [-x 1 10 100]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import maplib.constants as consts
+
+from maplib.tools.simple_functions import adjacent_n_tuples
+from maplib.tools.simple_functions import format_table
+from maplib.tools.space_ops import abs_arg_pair
+from maplib.tools.space_ops import arg
+from maplib.tools.space_ops import get_angle
+from maplib.tools.space_ops import get_corner_arcs
+from maplib.utils.constructor import Constructor
+from maplib.utils.params_getter import RenderContext
+
+
+def get_routes(project_name):
+    with RenderContext(project_name).activate():
+        constructor = Constructor()
+    routes = []
+    for metro in constructor.metro_objs:
+        if metro.route_type == "y":
+            routes.append((metro.main_control_points, False))
+            routes.append((metro.sub_control_points, False))
+        else:
+            routes.append((metro.control_points, metro.loop))
+    return routes
+
+
+def get_corners(control_points, loop):
+    control_points = np.array(control_points, dtype="float64")
+    if loop:
+        return control_points, np.roll(control_points, -1, axis=0), np.roll(control_points, -2, axis=0)
+    return control_points[:-2], control_points[1:-1], control_points[2:]
+
+
+def corners_one_at_a_time(routes, arc_radius):
+    results = []
+    for control_points, loop in routes:
+        for a, b, c in adjacent_n_tuples(control_points, 3, loop):
+            theta = get_angle(a, b, c)
+            sweep_flag = 0 if theta >= 0 else 1
+            cut_off_length = arc_radius / np.tan(abs(theta) / 2)
+            h1, h2 = [
+                (b + abs_arg_pair(cut_off_length, arg(p - b)))
+                for p in [a, c]
+            ]
+            results.append((h1, h2, sweep_flag))
+    return results
+
+
+def corners_per_route(routes, arc_radius):
+    results = []
+    for control_points, loop in routes:
+        before_arc_points, after_arc_points, sweep_flags = get_corner_arcs(
+            *get_corners(control_points, loop), arc_radius
+        )
+        results.extend(zip(before_arc_points, after_arc_points, sweep_flags.tolist()))
+    return results
+
+
+def corners_all_at_once(routes, arc_radius):
+    a, b, c = [
+        np.concatenate(arrays)
+        for arrays in zip(*[get_corners(control_points, loop) for control_points, loop in routes])
+    ]
+    before_arc_points, after_arc_points, sweep_flags = get_corner_arcs(a, b, c, arc_radius)
+    return list(zip(before_arc_points, after_arc_points, sweep_flags.tolist()))
+
+
+def is_same_result(result1, result2):
+    return len(result1) == len(result2) and all([
+        np.array_equal(h1, g1) and np.array_equal(h2, g2) and flag1 == flag2
+        for (h1, h2, flag1), (g1, g2, flag2) in zip(result1, result2)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--project", default=consts.DEFAULT_PROJECT_CITY_NAME)
+    parser.add_argument("-x", "--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("-r", "--arc-radius", type=float, default=1.5)
+    args = parser.parse_args()
+    routes = get_routes(args.project)
+    rows = []
+    for scale_factor in args.scales:
+        scaled_routes = routes * scale_factor
+        row = ["{0} routes".format(len(scaled_routes))]
+        reference_result = None
+        for func in (corners_one_at_a_time, corners_per_route, corners_all_at_once):
+            begin = time.perf_counter()
+            result = func(scaled_routes, args.arc_radius)
+            row.append("{0:.4f}".format(time.perf_counter() - begin))
+            if reference_result is None:
+                reference_result = result
+            elif not is_same_result(reference_result, result):
+                raise ValueError(func.__name__)
+        rows.append(row)
+    print(format_table(("scale", "one at a time (s)", "per route (s)", "all at once (s)"), rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,592 @@
+"""
+Writes a synthetic input.json about scale times the size of the network
+of a project (Shanghai by default: 28 lines, ~670 station rows), with
+lines, loops, y-branches, transfer stations, geography, names and marks.
+Station, district and mark names are reused from the project, so that
+their glyphs are already in its tex.json.
+    python -m benchmarks.network_generator -o synthetic.json [--scale 10] [--seed 0]
+"""
+import argparse
+import math
+import os
+import random
+
+import maplib.constants as consts
+
+from maplib.tools.file_tools import dump_dict
+from maplib.tools.file_tools import load_dict
+from maplib.utils.constructor import Constructor
+
+
+class Route(object):
+    """
+    A route of straight segments on the lattice of LATTICE_STEP, every
+    segment given by (begin point, unit vector, number of steps). The
+    stations of a segment are chosen among its lattice points, every
+    segment keeps at least one, so that the control points solved by Metro
+    are exactly the bends. A station is kept by its position along its
+    segment, in units, so that a transfer may move it off the lattice. A
+    branch (the sub route of a y-type metro) has no station where it
+    begins.
+    """
+    def __init__(self, segments, loop=False, is_branch=False):
+        self.segments = segments
+        self.loop = loop
+        self.is_branch = is_branch
+        self.station_positions = [set() for segment in segments]
+        self.fixed_locations = set()
+
+    @staticmethod
+    def get_point(segment, step):
+        return Route.get_position_point(segment, NetworkGenerator.LATTICE_STEP * step)
+
+    @staticmethod
+    def get_position_point(segment, position):
+        begin_point, unit_vector, num_steps = segment
+        return (
+            begin_point[0] + position * unit_vector[0],
+            begin_point[1] + position * unit_vector[1],
+        )
+
+    def get_steps(self, segment_index):
+        """
+        The steps of a segment where a station may be, i.e. all but the
+        bends, the ends of a line included.
+        """
+        num_steps = self.segments[segment_index][2]
+        first_step = 0 if segment_index == 0 and not self.loop and not self.is_branch else 1
+        last_step = num_steps if segment_index == len(self.segments) - 1 and not self.loop else num_steps - 1
+        return range(first_step, last_step + 1)
+
+    def get_end_point(self):
+        return Route.get_point(self.segments[-1], self.segments[-1][2])
+
+    def get_point_dict(self):
+        """
+        {point: (segment index, step)} of the points where a station may be.
+        """
+        return {
+            Route.get_point(segment, step): (segment_index, step)
+            for segment_index, segment in enumerate(self.segments)
+            for step in self.get_steps(segment_index)
+        }
+
+    def choose_stations(self, rng, excluded_steps=None):
+        """
+        Every second or third step of each segment, apart from the
+        excluded ones. A segment whose steps are all excluded is left to
+        add_station.
+        """
+        if excluded_steps is None:
+            excluded_steps = {}
+        for segment_index in range(len(self.segments)):
+            steps = [
+                step for step in self.get_steps(segment_index)
+                if step not in excluded_steps.get(segment_index, ())
+            ]
+            if not steps:
+                continue
+            spacing = rng.choice((2, 3))
+            offset = rng.randrange(spacing)
+            chosen_steps = set(steps[offset::spacing]) or {steps[len(steps) // 2]}
+            if segment_index == 0 and not self.loop and not self.is_branch:
+                chosen_steps.add(steps[0])
+            if segment_index == len(self.segments) - 1 and not self.loop:
+                chosen_steps.add(steps[-1])
+            for step in chosen_steps:
+                self.add_station(segment_index, step)
+        return self
+
+    def get_excluded_steps(self, points):
+        """
+        {segment index: steps} of the given points, None if a segment would
+        be left without any step.
+        """
+        excluded_steps = {}
+        for segment_index, segment in enumerate(self.segments):
+            steps = self.get_steps(segment_index)
+            excluded_steps[segment_index] = set([
+                step for step in steps if Route.get_point(segment, step) in points
+            ])
+            if len(excluded_steps[segment_index]) == len(steps):
+                return None
+        return excluded_steps
+
+    def add_station(self, segment_index, step, offset=0):
+        self.station_positions[segment_index].add(NetworkGenerator.LATTICE_STEP * step + offset)
+        return self
+
+    def remove_station(self, segment_index, step):
+        self.station_positions[segment_index].discard(NetworkGenerator.LATTICE_STEP * step)
+        return self
+
+    def get_transfer_offset(self, segment_index, step):
+        """
+        The offset of one unit along the positive axis, where a station
+        of a transfer may be moved to, None if the segment is diagonal,
+        the step is one of its ends or the station is fixed.
+        """
+        unit_vector = self.segments[segment_index][1]
+        if 0 not in unit_vector or not 0 < step < self.segments[segment_index][2]:
+            return None
+        if (segment_index, step) in self.fixed_locations:
+            return None
+        return sum(unit_vector)
+
+    def get_stations(self):
+        """
+        Return [(point, simplified direction, lattice point)] in the order
+        of the route, the lattice point of a station moved by a transfer
+        being the point it was moved from.
+        """
+        stations = []
+        for segment_index, segment in enumerate(self.segments):
+            direction = NetworkGenerator.get_simplified_direction(segment[1])
+            for position in sorted(self.station_positions[segment_index]):
+                lattice_position = NetworkGenerator.snap(position)
+                stations.append((
+                    Route.get_position_point(segment, position),
+                    direction,
+                    Route.get_position_point(segment, lattice_position),
+                ))
+        return stations
+
+
+class NetworkGenerator(object):
+    """
+    Generates the input database of a synthetic network at the given scale:
+    the number of lines and the side of the area grow with the square root
+    of scale, so that the number of stations grows with scale.
+        lines: staircases of axis-aligned and diagonal segments, each with
+            a number of steps of LATTICE_STEP, so that distinct stations
+            are never adjacent;
+        loops: octagons;
+        y-branches: a second staircase leaving a line right after one of
+            its stations;
+        transfers: wherever two lines share a lattice point where a station
+            may be, one of them gets a station there and the other one a
+            station next to it.
+    """
+    LATTICE_STEP = 3
+    BASE_SIZE = (360, 300)
+    BASE_NUM_LINES = 28
+    BASE_NUM_STATIONS = 24
+    LOOP_RATIO = 1 / 14
+    Y_RATIO = 1 / 14
+    MARGIN = 12
+
+    def __init__(self, scale=1.0, seed=0, base_input_dict=None):
+        if base_input_dict is None:
+            base_input_dict = load_dict(os.path.join(consts.FILE_DIR, consts.DEFAULT_PROJECT_CITY_NAME, "input.json"))
+        self.scale = scale
+        self.rng = random.Random(seed)
+        side_factor = math.sqrt(scale)
+        self.width = NetworkGenerator.snap(NetworkGenerator.BASE_SIZE[0] * side_factor)
+        self.height = NetworkGenerator.snap(NetworkGenerator.BASE_SIZE[1] * side_factor)
+        self.num_lines = max(round(NetworkGenerator.BASE_NUM_LINES * side_factor), 3)
+        self.num_stations = max(round(NetworkGenerator.BASE_NUM_STATIONS * side_factor), 4)
+        self.init_name_pools(base_input_dict)
+
+    @staticmethod
+    def snap(val):
+        step = NetworkGenerator.LATTICE_STEP
+        return int(round(val / step)) * step
+
+    @staticmethod
+    def get_simplified_direction(unit_vector):
+        return {
+            (1, 0): 0, (-1, 0): 0,
+            (1, 1): 1, (-1, -1): 1,
+            (0, 1): 2, (0, -1): 2,
+            (-1, 1): 3, (1, -1): 3,
+        }[unit_vector]
+
+    def init_name_pools(self, base_input_dict):
+        self.metro_name_pool = [metro_dict["name"] for metro_dict in base_input_dict["metro_database"]]
+        station_name_pool = []
+        for metro_dict in base_input_dict["metro_database"]:
+            station_data = Constructor.get_stations_data(metro_dict["stations_data"])
+            for name_eng, name_chn in zip(*station_data[5:]):
+                if name_eng is not None and name_chn is not None:
+                    station_name_pool.append((name_eng, name_chn))
+        self.station_name_pool = sorted(set(station_name_pool))
+        self.name_pool_dict = {
+            name_type: [Constructor.get_name_data(name_data_str)[2:] for name_data_str in name_data_strs]
+            for name_type, name_data_strs in base_input_dict["name_database"].items()
+        }
+        self.mark_pool_dict = {
+            mark_type: [Constructor.get_mark_data(mark_data_str)[3] for mark_data_str in mark_data_strs]
+            for mark_type, mark_data_strs in base_input_dict["mark_database"].items()
+        }
+        return self
+
+    def get_random_point(self, margin=MARGIN):
+        return (
+            NetworkGenerator.snap(self.rng.uniform(margin, self.width - margin)),
+            NetworkGenerator.snap(self.rng.uniform(margin, self.height - margin)),
+        )
+
+    def get_staircase_segments(self, begin_point, axis_vector, total_steps, first_on_axis=True,
+            first_diagonal_vector=None):
+        """
+        Segments alternating between axis_vector and a diagonal moving the
+        same way along it, which turns towards the middle of the area when
+        getting close to its border.
+        """
+        segments = []
+        point = begin_point
+        on_axis = first_on_axis
+        remaining_steps = total_steps
+        while remaining_steps > 0:
+            if on_axis:
+                unit_vector = axis_vector
+                num_steps = self.rng.randint(3, 8)
+            else:
+                if first_diagonal_vector is not None and not segments:
+                    unit_vector = first_diagonal_vector
+                else:
+                    unit_vector = self.get_diagonal_vector(point, axis_vector)
+                num_steps = self.rng.randint(2, 4)
+            num_steps = min(num_steps, max(remaining_steps, 2))
+            segments.append((point, unit_vector, num_steps))
+            point = Route.get_point(segments[-1], num_steps)
+            remaining_steps -= num_steps
+            on_axis = not on_axis
+        return segments
+
+    def get_diagonal_vector(self, point, axis_vector):
+        axis_index = 0 if axis_vector[0] != 0 else 1
+        cross_index = 1 - axis_index
+        cross_size = (self.width, self.height)[cross_index]
+        if point[cross_index] < cross_size / 3:
+            cross_sign = 1
+        elif point[cross_index] > cross_size * 2 / 3:
+            cross_sign = -1
+        else:
+            cross_sign = self.rng.choice((-1, 1))
+        diagonal_vector = [0, 0]
+        diagonal_vector[axis_index] = axis_vector[axis_index]
+        diagonal_vector[cross_index] = cross_sign
+        return tuple(diagonal_vector)
+
+    def get_line_route(self):
+        """
+        A horizontal or vertical staircase through the area, starting on
+        one side of it.
+        """
+        total_steps = self.num_stations * 2
+        axis_index = self.rng.randrange(2)
+        axis_sign = self.rng.choice((-1, 1))
+        axis_vector = (axis_sign, 0) if axis_index == 0 else (0, axis_sign)
+        axis_size = (self.width, self.height)[axis_index]
+        begin_point = list(self.get_random_point())
+        max_begin = axis_size - NetworkGenerator.MARGIN - total_steps * NetworkGenerator.LATTICE_STEP
+        begin_val = NetworkGenerator.snap(self.rng.uniform(NetworkGenerator.MARGIN, max(max_begin, NetworkGenerator.MARGIN)))
+        begin_point[axis_index] = begin_val if axis_sign > 0 else axis_size - begin_val
+        return Route(self.get_staircase_segments(tuple(begin_point), axis_vector, total_steps))
+
+    def get_loop_route(self):
+        """
+        An octagon walked counterclockwise from its lower left corner.
+        """
+        side_steps = max(self.num_stations // 4, 3)
+        diagonal_steps = self.rng.randint(2, 3)
+        horizontal_steps = self.rng.randint(side_steps, side_steps * 2)
+        vertical_steps = self.rng.randint(side_steps, side_steps * 2)
+        step = NetworkGenerator.LATTICE_STEP
+        max_x = self.width - NetworkGenerator.MARGIN - (horizontal_steps + 2 * diagonal_steps) * step
+        max_y = self.height - NetworkGenerator.MARGIN - (vertical_steps + 2 * diagonal_steps) * step
+        begin_point = (
+            NetworkGenerator.snap(self.rng.uniform(NetworkGenerator.MARGIN, max(max_x, NetworkGenerator.MARGIN)))
+                + diagonal_steps * step,
+            NetworkGenerator.snap(self.rng.uniform(NetworkGenerator.MARGIN, max(max_y, NetworkGenerator.MARGIN))),
+        )
+        segments = []
+        point = begin_point
+        for unit_vector, num_steps in (
+            ((1, 0), horizontal_steps), ((1, 1), diagonal_steps),
+            ((0, 1), vertical_steps), ((-1, 1), diagonal_steps),
+            ((-1, 0), horizontal_steps), ((-1, -1), diagonal_steps),
+            ((0, -1), vertical_steps), ((1, -1), diagonal_steps),
+        ):
+            segments.append((point, unit_vector, num_steps))
+            point = Route.get_point(segments[-1], num_steps)
+        return Route(segments, loop=True)
+
+    def get_y_routes(self):
+        """
+        A line (main route) and a branch (sub route). One axis-aligned
+        segment of the line keeps its stations at steps 1 and 3 only: the
+        first becomes the branch station, and the branch turns off at
+        step 2 with a diagonal moving the same way along the line. The
+        branch has no station where the line may have one, since a metro
+        cannot have two stations at one point. Return (main route, None,
+        None) if no branch fits.
+        """
+        main_route = self.get_line_route()
+        axis_indexes = [
+            segment_index for segment_index, segment in enumerate(main_route.segments)
+            if 0 < segment_index < len(main_route.segments) - 1 and segment[2] >= 4
+                and 0 in segment[1]
+        ]
+        if not axis_indexes:
+            return main_route, None, None
+        segment_index = self.rng.choice(axis_indexes)
+        segment = main_route.segments[segment_index]
+        main_route.choose_stations(self.rng, {segment_index: set(range(segment[2] + 1))})
+        main_route.add_station(segment_index, 1).add_station(segment_index, 3)
+        main_route.fixed_locations.update([(segment_index, step) for step in range(1, 4)])
+        main_axis_vector = segment[1]
+        turn_point = Route.get_point(segment, 2)
+        main_axis_index = 0 if main_axis_vector[0] != 0 else 1
+        diagonal_vector = list(self.get_diagonal_vector(turn_point, main_axis_vector))
+        sub_axis_vector = [0, 0]
+        sub_axis_vector[1 - main_axis_index] = diagonal_vector[1 - main_axis_index]
+        sub_route = Route(self.get_staircase_segments(
+            turn_point, tuple(sub_axis_vector), self.num_stations, first_on_axis=False,
+            first_diagonal_vector=tuple(diagonal_vector)
+        ), is_branch=True)
+        excluded_steps = sub_route.get_excluded_steps(main_route.get_point_dict())
+        if excluded_steps is None:
+            return main_route, None, None
+        return main_route, sub_route.choose_stations(self.rng, excluded_steps), (segment_index, 1)
+
+    def get_metro_plans(self):
+        """
+        Return [(route type, main route, sub route, branch (segment index,
+        step))], the stations of every route chosen apart from transfers.
+        """
+        num_loops = max(round(self.num_lines * NetworkGenerator.LOOP_RATIO), 1)
+        num_y_lines = max(round(self.num_lines * NetworkGenerator.Y_RATIO), 1)
+        metro_plans = []
+        for metro_index in range(self.num_lines):
+            if metro_index < num_loops:
+                metro_plans.append(("o", self.get_loop_route().choose_stations(self.rng), None, None))
+                continue
+            if metro_index < num_loops + num_y_lines:
+                main_route, sub_route, branch = self.get_y_routes()
+                if sub_route is not None:
+                    metro_plans.append(("y", main_route, sub_route, branch))
+                    continue
+            metro_plans.append(("l", self.get_line_route().choose_stations(self.rng), None, None))
+        return metro_plans
+
+    @staticmethod
+    def add_transfers(metro_plans):
+        """
+        A transfer station is made of adjacent coords of different metros
+        in a row. Every point where a station may be on exactly two metros
+        (on the main route of a y-type metro, if both of its routes pass
+        it) becomes a transfer if one of them may move its station there
+        by a unit along an axis-aligned segment. Stations off the lattice
+        are never adjacent to any other, so transfers never merge.
+        """
+        point_locations = {}
+        for route_type, main_route, sub_route, branch in metro_plans:
+            routes = [main_route] if sub_route is None else [main_route, sub_route]
+            metro_point_dict = {}
+            for route in reversed(routes):
+                for point, location in route.get_point_dict().items():
+                    metro_point_dict[point] = (route, *location)
+            for point, location in metro_point_dict.items():
+                point_locations.setdefault(point, []).append(location)
+        for point, locations in point_locations.items():
+            if len(locations) != 2:
+                continue
+            for moved_location, kept_location in (locations, locations[::-1]):
+                route, segment_index, step = moved_location
+                offset = route.get_transfer_offset(segment_index, step)
+                if offset is None:
+                    continue
+                route.remove_station(segment_index, step).add_station(segment_index, step, offset)
+                kept_route, kept_segment_index, kept_step = kept_location
+                kept_route.add_station(kept_segment_index, kept_step)
+                break
+
+    def get_station_names(self, point):
+        return self.station_name_pool[hash(point) % len(self.station_name_pool)]
+
+    def get_station_row(self, point, direction, lattice_point, sign):
+        """
+        A station moved by a transfer has neither a label nor an english
+        name, like the coords of a transfer in the input.json of Shanghai.
+        """
+        name_eng, name_chn = self.get_station_names(lattice_point)
+        if point != lattice_point:
+            return [*point, direction, None, sign, None, name_chn]
+        return [*point, direction, self.rng.randrange(8), sign, name_eng, name_chn]
+
+    def get_stations_data_strs(self, route_type, main_route, sub_route, branch):
+        rows = []
+        branch_point = None
+        if branch is not None:
+            branch_point = Route.get_point(main_route.segments[branch[0]], branch[1])
+        for point, direction, lattice_point in main_route.get_stations():
+            sign = "#" if point == branch_point else None
+            rows.append(self.get_station_row(point, direction, lattice_point, sign))
+        if sub_route is not None:
+            for k, (point, direction, lattice_point) in enumerate(sub_route.get_stations()):
+                sign = "^" if k == 0 else None
+                rows.append(self.get_station_row(point, direction, lattice_point, sign))
+        return Constructor.format_list_with_strs(rows, (5, 6))
+
+    def get_names_coord(self, main_route, sub_route):
+        step = NetworkGenerator.LATTICE_STEP
+        begin_point, unit_vector, num_steps = main_route.segments[0]
+        names_coord = [[begin_point[0] - 2 * step * unit_vector[0], begin_point[1] - 2 * step * unit_vector[1]]]
+        if main_route.loop:
+            return names_coord
+        end_routes = [main_route] if sub_route is None else [main_route, sub_route]
+        for route in end_routes:
+            end_point = route.get_end_point()
+            unit_vector = route.segments[-1][1]
+            names_coord.append([end_point[0] + 2 * step * unit_vector[0], end_point[1] + 2 * step * unit_vector[1]])
+        return names_coord
+
+    def get_metro_database(self):
+        metro_plans = self.get_metro_plans()
+        NetworkGenerator.add_transfers(metro_plans)
+        metro_database = []
+        for metro_index, (route_type, main_route, sub_route, branch) in enumerate(metro_plans):
+            color = " ".join([str(self.rng.randrange(256)) for k in range(3)])
+            metro_database.append({
+                "name": self.metro_name_pool[metro_index % len(self.metro_name_pool)],
+                "layer_num": metro_index + 1,
+                "color": color,
+                "sub_color": "-",
+                "name_color": "255 255 255",
+                "route_type": route_type,
+                "names_coord": Constructor.format_list_with_strs(self.get_names_coord(main_route, sub_route)),
+                "stations_data": self.get_stations_data_strs(route_type, main_route, sub_route, branch),
+            })
+        return metro_database
+
+    def get_octagon_coords(self, side_steps, diagonal_steps):
+        """
+        A square if diagonal_steps is 0.
+        """
+        step = NetworkGenerator.LATTICE_STEP
+        point = self.get_random_point(NetworkGenerator.MARGIN + (side_steps + 2 * diagonal_steps) * step)
+        coords = []
+        for unit_vector, num_steps in (
+            ((1, 0), side_steps), ((1, 1), diagonal_steps),
+            ((0, 1), side_steps), ((-1, 1), diagonal_steps),
+            ((-1, 0), side_steps), ((-1, -1), diagonal_steps),
+            ((0, -1), side_steps), ((1, -1), diagonal_steps),
+        ):
+            if num_steps == 0:
+                continue
+            coords.append(list(point))
+            point = (point[0] + num_steps * step * unit_vector[0], point[1] + num_steps * step * unit_vector[1])
+        return coords
+
+    def get_geography_database(self):
+        """
+        The land ends at the right of the area, with rivers across it,
+        islands, lakes and inner lakes, in numbers growing with scale.
+        """
+        width, height = self.width, self.height
+        coast = NetworkGenerator.snap(height / 4)
+        land_coords = [
+            [width - coast, height, "-"], [width, height - coast, "-"],
+            [width, coast, "-"], [width - coast, 0, "#"],
+            [-20, 0, "-"], [-20, height, "-"],
+        ]
+        num_small_objs = max(round(self.scale), 1)
+        num_rivers = max(round(2 * math.sqrt(self.scale)), 1)
+        step = NetworkGenerator.LATTICE_STEP
+        rivers = []
+        for river_index in range(num_rivers):
+            begin_point = (-20, NetworkGenerator.snap(self.rng.uniform(coast, height - coast)))
+            total_steps = (width + 20) // step
+            segments = self.get_staircase_segments(begin_point, (1, 0), total_steps)
+            coords = [list(segment[0]) for segment in segments]
+            coords.append(list(Route.get_point(segments[-1], segments[-1][2])))
+            rivers.append({
+                "name": "River_{0}".format(river_index),
+                "arc_radius": 6.0,
+                "river_width": 4.0,
+                "coord_data": Constructor.format_list_with_strs(coords),
+            })
+        islands = [
+            {
+                "name": "Island_{0}".format(k),
+                "arc_radius": 6.0,
+                "coord_data": Constructor.format_list_with_strs(self.get_octagon_coords(5, 4)),
+            }
+            for k in range(num_small_objs)
+        ]
+        lakes = []
+        for k in range(num_small_objs):
+            x, y = self.get_random_point(40)
+            lakes.append({
+                "name": "Lake_{0}".format(k),
+                "arc_radius": 6.0,
+                "coord_data": Constructor.format_list_with_strs([
+                    [x, y, "-"], [x + 12, y + 12, "-"], [x + 33, y + 12, "-"], [x + 33, y - 9, "#"], [x, y - 9, "-"],
+                ]),
+            })
+        inner_lakes = [
+            {
+                "name": "InnerLake_{0}".format(k),
+                "arc_radius": 5.0,
+                "coord_data": Constructor.format_list_with_strs(self.get_octagon_coords(4, 0)),
+            }
+            for k in range(num_small_objs)
+        ]
+        return {
+            "Land": [{
+                "name": "Land",
+                "arc_radius": 10.0,
+                "coord_data": Constructor.format_list_with_strs(land_coords),
+            }],
+            "Island": islands,
+            "River": rivers,
+            "Lake": lakes,
+            "InnerLake": inner_lakes,
+        }
+
+    def get_name_database(self):
+        name_database = {}
+        for name_type, name_pool in self.name_pool_dict.items():
+            num_names = max(round(len(name_pool) * self.scale), 1)
+            name_database[name_type] = Constructor.format_list_with_strs([
+                [*self.get_random_point(), *name_pool[k % len(name_pool)]]
+                for k in range(num_names)
+            ], (2, 3))
+        return name_database
+
+    def get_mark_database(self):
+        mark_database = {}
+        for mark_type, mark_pool in self.mark_pool_dict.items():
+            num_marks = max(round(len(mark_pool) * self.scale), 1)
+            mark_database[mark_type] = Constructor.format_list_with_strs([
+                [*self.get_random_point(), self.rng.randrange(8), mark_pool[k % len(mark_pool)]]
+                for k in range(num_marks)
+            ], (3,))
+        return mark_database
+
+    def get_input_dict(self):
+        return {
+            "metro_database": self.get_metro_database(),
+            "name_database": self.get_name_database(),
+            "geography_database": self.get_geography_database(),
+            "mark_database": self.get_mark_database(),
+        }
+
+    def write(self, file_name):
+        dump_dict(self.get_input_dict(), file_name, indent=4, sort_keys=False)
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    NetworkGenerator(args.scale, args.seed).write(args.output)
+
+
+if __name__ == "__main__":
+    main()
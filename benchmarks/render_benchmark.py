@@ -0,0 +1,60 @@
+"""
+Renders a project into a temporary folder and reports the wall time of
+every run, then the peak of traced python memory of one more traced run.
+Tracked files are not touched.
+    python -m benchmarks.render_benchmark [-p Shanghai] [-s default_style] [-r 3]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import maplib.constants as consts
+
+from benchmarks.bench_tools import measure
+from maplib.svg.main_project import Project
+from maplib.tools.simple_functions import format_table
+from maplib.utils.params_getter import RenderContext
+
+
+def get_temp_context(project_name, style_name, temp_dir):
+    """
+    A context whose output file and tex database live in temp_dir.
+    """
+    context = RenderContext(project_name, style_name)
+    shutil.copy(context.TEX_JSON_DIR, temp_dir)
+    context.TEX_JSON_DIR = os.path.join(temp_dir, "tex.json")
+    context.TEX_STORE_DIR = os.path.join(temp_dir, "tex.bin")
+    context.OUTPUT_SVG_DIR = os.path.join(temp_dir, "output.svg")
+    return context
+
+
+def render_once(project_name, style_name, temp_dir):
+    context = get_temp_context(project_name, style_name, temp_dir)
+    Project(context)
+    context.reset_databases()
+    return os.path.getsize(context.OUTPUT_SVG_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--project", default=consts.DEFAULT_PROJECT_CITY_NAME)
+    parser.add_argument("-s", "--style", default=consts.DEFAULT_STYLE_FILE_NAME)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    args = parser.parse_args()
+    consts.PRINT_TEX_WRITING_PROGRESS_MSG = False
+    consts.PRINT_FILE_MODIFYING_MSG = False
+    rows = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for run_index in range(args.repeat):
+            output_size, seconds, peak_memory = measure(
+                render_once, args.project, args.style, temp_dir, trace=False
+            )
+            rows.append([run_index, "{0:.3f}".format(seconds), "-", output_size])
+        output_size, seconds, peak_memory = measure(render_once, args.project, args.style, temp_dir)
+        rows.append(["traced", "{0:.3f}".format(seconds), peak_memory, output_size])
+    print(format_table(("run", "seconds", "peak traced (KiB)", "output (B)"), rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Renders synthetic networks (see network_generator) at several scales and
+records the time and the peak of traced python memory of every stage:
+    parse: loading input.json;
+    constructor: resolving the metros, stations, names, geography and
+        marks (the input cache is off);
+    web_system: the routes and the stations;
+    geography: the geographic map;
+    tex_layout: the station names, the geographic names, the sign names
+        and the marks;
+    serialize: the glyph paths and the svg bytes.
+Every scale runs in a fresh interpreter, once for the times and the peak
+RSS and once more traced for the memory. The results file keeps the
+commit, so that runs can be compared across commits with --compare.
+Tracked files are not touched.
+    python -m benchmarks.scaling_benchmark [--scales 1 10 100] [--seed 0] [-o results.json] [--compare old.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+
+import numpy as np
+
+import maplib.constants as consts
+
+from benchmarks.bench_tools import get_peak_rss_kb
+from benchmarks.bench_tools import measure
+from benchmarks.bench_tools import run_module_in_subprocess
+from benchmarks.network_generator import NetworkGenerator
+from benchmarks.render_benchmark import get_temp_context
+from maplib.svg.geographic_map import GeographicMap
+from maplib.svg.path_types import OutlinePath
+from maplib.svg.svg_element import Defs
+from maplib.svg.svg_element import Group
+from maplib.svg.svg_element import Svg
+from maplib.svg.svg_writer import SvgWriter
+from maplib.svg.tex_instance import GeographicName
+from maplib.svg.tex_instance import MarkGroup
+from maplib.svg.tex_instance import SignName
+from maplib.svg.tex_instance import StationName
+from maplib.svg.web_system import WebSystem
+from maplib.tools.file_tools import dump_dict
+from maplib.tools.file_tools import load_dict
+from maplib.tools.simple_functions import format_table
+from maplib.tools.simple_functions import sort_dict_by_key
+from maplib.utils.constructor import Constructor
+from maplib.utils.render_registry import RenderRegistry
+
+
+STAGE_NAMES = ("parse", "constructor", "web_system", "geography", "tex_layout", "serialize")
+
+
+def build_tex_layout(constructor):
+    return [
+        StationName("station_name", constructor.station_objs),
+        GeographicName("geographic_name", constructor.name_objs_dict),
+        SignName("sign_name", constructor.metro_objs),
+        MarkGroup("mark_group", constructor.mark_objs_dict),
+    ]
+
+
+def serialize(components, tex_objs):
+    root = Svg()
+    defs = Defs()
+    root.append(defs)
+    canvas = Group("canvas").flip_y()
+    root.append(canvas)
+    path_group = Group("paths")
+    defs.append(path_group)
+    global_tex_outlines_dict = {}
+    for tex_obj in tex_objs:
+        global_tex_outlines_dict.update(tex_obj.tex_outlines_dict)
+    for path_id, outline in sort_dict_by_key(global_tex_outlines_dict).items():
+        path_group.append(OutlinePath(path_id, outline))
+    map_body = Group("map_body")
+    for component in components:
+        map_body.append(component)
+    defs.append(map_body)
+    canvas.use("map_body")
+    return SvgWriter.to_bytes(root)
+
+
+def run_stages(input_file_name, trace):
+    """
+    Prints the seconds and the peak traced memory (None unless traced) of
+    every stage, the counts of the network and the peak RSS, as json.
+    """
+    consts.USE_INPUT_CACHE = False
+    consts.PRINT_TEX_WRITING_PROGRESS_MSG = False
+    consts.PRINT_FILE_MODIFYING_MSG = False
+    stage_dict = {}
+
+    def run_stage(stage_name, func, *args):
+        result, seconds, peak_memory = measure(func, *args, trace=trace)
+        stage_dict[stage_name] = {"seconds": seconds, "peak_kib": peak_memory}
+        return result
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        context = get_temp_context(consts.DEFAULT_PROJECT_CITY_NAME, consts.DEFAULT_STYLE_FILE_NAME, temp_dir)
+        context.INPUT_JSON_DIR = input_file_name
+        render_registry = RenderRegistry()
+        with context.activate(), render_registry.activate():
+            run_stage("parse", lambda: context.INPUT_DATABASE_DICT)
+            constructor = run_stage("constructor", Constructor)
+            web_system = run_stage("web_system", WebSystem, "web_system", constructor.metro_objs, constructor.station_objs)
+            geographic_map = run_stage("geography", GeographicMap, "geographic_map", constructor.geography_objs_dict)
+            tex_components = run_stage("tex_layout", build_tex_layout, constructor)
+            svg_bytes = run_stage(
+                "serialize", serialize, [geographic_map, web_system, *tex_components], render_registry.tex_objs
+            )
+        context.reset_databases()
+    input_dict = load_dict(input_file_name)
+    print(json.dumps({
+        "counts": {
+            "metros": len(constructor.metro_objs),
+            "station_rows": sum([len(metro_dict["stations_data"]) for metro_dict in input_dict["metro_database"]]),
+            "stations": len(constructor.station_objs),
+            "transfer_stations": len([
+                station for station in constructor.station_objs if len(station.parent_metros) > 1
+            ]),
+            "names": sum([len(name_objs) for name_objs in constructor.name_objs_dict.values()]),
+            "marks": sum([len(mark_objs) for mark_objs in constructor.mark_objs_dict.values()]),
+            "output_bytes": len(svg_bytes),
+        },
+        "stages": stage_dict,
+        "peak_rss_kb": get_peak_rss_kb(),
+    }))
+
+
+def get_commit():
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=consts.REPOSITORY_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.decode(consts.UTF_8).strip()
+
+
+def run_scale(scale, seed, temp_dir):
+    input_file_name = os.path.join(temp_dir, "input_{0}.json".format(scale))
+    NetworkGenerator(scale, seed).write(input_file_name)
+    module_name = "benchmarks.scaling_benchmark"
+    result = run_module_in_subprocess(module_name, "--run", input_file_name)
+    traced_result = run_module_in_subprocess(module_name, "--run", input_file_name, "--trace")
+    for stage_name, stage in result["stages"].items():
+        stage["peak_kib"] = traced_result["stages"][stage_name]["peak_kib"]
+    return {"scale": scale, **result}
+
+
+def get_table_rows(results):
+    rows = []
+    for scale_result in results["scales"]:
+        counts = scale_result["counts"]
+        for stage_name in STAGE_NAMES:
+            stage = scale_result["stages"][stage_name]
+            rows.append([
+                scale_result["scale"],
+                "{0}/{1}".format(counts["metros"], counts["stations"]),
+                stage_name,
+                "{0:.3f}".format(stage["seconds"]),
+                stage["peak_kib"],
+            ])
+        rows.append([scale_result["scale"], "", "peak rss (KiB)", "", scale_result["peak_rss_kb"]])
+    return rows
+
+
+def get_compare_rows(results, old_results):
+    """
+    The ratios of the seconds and of the peak traced memory of every stage
+    to the old ones, for the scales in both results.
+    """
+    old_scale_dict = {scale_result["scale"]: scale_result for scale_result in old_results["scales"]}
+    rows = []
+    for scale_result in results["scales"]:
+        old_scale_result = old_scale_dict.get(scale_result["scale"])
+        if old_scale_result is None:
+            continue
+        for stage_name in STAGE_NAMES:
+            stage = scale_result["stages"][stage_name]
+            old_stage = old_scale_result["stages"][stage_name]
+            rows.append([
+                scale_result["scale"],
+                stage_name,
+                "{0:.3f}".format(old_stage["seconds"]),
+                "{0:.3f}".format(stage["seconds"]),
+                "{0:.2f}".format(stage["seconds"] / old_stage["seconds"]),
+                "{0:.2f}".format(stage["peak_kib"] / old_stage["peak_kib"]) if old_stage["peak_kib"] else "-",
+            ])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--run")
+    parser.add_argument("--trace", action="store_true")
+    args = parser.parse_args()
+    if args.run is not None:
+        run_stages(args.run, args.trace)
+        return
+    results = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+        "scales": [],
+    }
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for scale in args.scales:
+            results["scales"].append(run_scale(scale, args.seed, temp_dir))
+    print(format_table(("scale", "metros/stations", "stage", "seconds", "peak traced (KiB)"), get_table_rows(results)))
+    if args.output is not None:
+        dump_dict(results, args.output, indent=1, sort_keys=False)
+    if args.compare is not None:
+        old_results = load_dict(args.compare)
+        print("compared with {0}".format(old_results["commit"]))
+        print(format_table(
+            ("scale", "stage", "old (s)", "new (s)", "time ratio", "memory ratio"),
+            get_compare_rows(results, old_results)
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compares grouping station coords into stations by expanding over a list
+(as Constructor used to) against group_adjacent_coords, on synthetic
+networks of stations of 1 to 3 coords in a row. The list expansion is
+quadratic, it only runs up to --max-reference coords.
+    python -m benchmarks.station_cluster_benchmark [-n 700 2000 7000 20000 100000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import maplib.constants as consts
+
+from maplib.tools.simple_functions import format_table
+from maplib.tools.space_ops import group_adjacent_coords
+
+
+def get_synthetic_coords(num_coords, seed):
+    rng = np.random.default_rng(seed)
+    num_cells = num_coords // 2 + 1
+    grid_size = int(np.ceil(np.sqrt(num_cells))) + 1
+    cell_indexes = rng.choice(grid_size * grid_size, num_cells, replace=False)
+    coords = []
+    for cell_index in cell_indexes.tolist():
+        x, y = 4 * (cell_index % grid_size), 4 * (cell_index // grid_size)
+        dx, dy = (1, 0) if rng.integers(2) else (0, 1)
+        for k in range(rng.integers(1, 4)):
+            coords.append((np.int64(x + k * dx), np.int64(y + k * dy)))
+    coords = coords[:num_coords]
+    return [coords[k] for k in rng.permutation(len(coords)).tolist()]
+
+
+def group_by_list_expansion(coord_tuples):
+    coord_tuples = list(coord_tuples)
+    groups = []
+    while coord_tuples:
+        old_adjacent_coord_set = set()
+        new_adjacent_coord_set = {coord_tuples[0]}
+        while len(new_adjacent_coord_set - old_adjacent_coord_set) != 0:
+            old_adjacent_coord_set = new_adjacent_coord_set.copy()
+            for coord in list(old_adjacent_coord_set):
+                for direction in consts.FOUR_BASE_DIRECTIONS:
+                    extended_coord_tuple = tuple(coord + direction)
+                    if extended_coord_tuple in coord_tuples:
+                        new_adjacent_coord_set.add(extended_coord_tuple)
+        for adjacent_coord in new_adjacent_coord_set:
+            coord_tuples.remove(adjacent_coord)
+        groups.append(new_adjacent_coord_set)
+    return groups
+
+
+def normalize_groups(groups):
+    return [
+        sorted([(int(x), int(y)) for x, y in group], key = lambda coord: sum(coord))
+        for group in groups
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--num-coords", type=int, nargs="+", default=[700, 2000, 7000, 20000, 100000])
+    parser.add_argument("--max-reference", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rows = []
+    for num_coords in args.num_coords:
+        coord_tuples = get_synthetic_coords(num_coords, args.seed)
+        begin = time.perf_counter()
+        groups = [
+            [coord_tuples[k] for k in indexes]
+            for indexes in group_adjacent_coords(coord_tuples)
+        ]
+        seconds = time.perf_counter() - begin
+        reference_str = "-"
+        if num_coords <= args.max_reference:
+            begin = time.perf_counter()
+            reference_groups = group_by_list_expansion(coord_tuples)
+            reference_str = "{0:.3f}".format(time.perf_counter() - begin)
+            if normalize_groups(groups) != normalize_groups(reference_groups):
+                raise ValueError(num_coords)
+        rows.append([num_coords, len(groups), reference_str, "{0:.3f}".format(seconds)])
+    print(format_table(("coords", "stations", "list expansion (s)", "union-find (s)"), rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compares parsing the stations data lines of input.json one line at a time
+with string_to_vals (as Constructor used to) against the bulk
+Constructor.get_stations_data, on synthetic lines.
+    python -m benchmarks.station_parser_benchmark [-n 1000 10000 100000] [-r 5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from maplib.tools.simple_functions import format_table
+from maplib.utils.constructor import Constructor
+
+
+def get_synthetic_lines(num_lines, seed):
+    rng = np.random.default_rng(seed)
+    xs = np.cumsum(rng.integers(2, 5, num_lines)).tolist()
+    ys = np.cumsum(rng.integers(-3, 4, num_lines)).tolist()
+    directions = rng.integers(0, 4, num_lines).tolist()
+    label_directions = rng.integers(-1, 8, num_lines).tolist()
+    return [
+        "{0} {1} {2} {3} {4} {5:<30} {6}".format(
+            x, y, direction, "-" if label_direction < 0 else label_direction,
+            "*" if k % 50 == 0 else "-", "Station Road {0}".format(k), "车站路{0}".format(k)
+        )
+        for k, (x, y, direction, label_direction) in enumerate(zip(xs, ys, directions, label_directions))
+    ]
+
+
+def parse_one_line_at_a_time(lines):
+    return [Constructor.string_to_vals(line, 7, 5, (2, 3)) for line in lines]
+
+
+def parse_in_bulk(lines):
+    return Constructor.get_stations_data(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--num-lines", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rows = []
+    for num_lines in args.num_lines:
+        lines = get_synthetic_lines(num_lines, args.seed)
+        row = [num_lines]
+        results = []
+        for func in (parse_one_line_at_a_time, parse_in_bulk):
+            seconds_list = []
+            for _ in range(args.repeat):
+                begin = time.perf_counter()
+                result = func(lines)
+                seconds_list.append(time.perf_counter() - begin)
+            results.append(result)
+            row.append("{0:.3f}".format(min(seconds_list)))
+        line_rows, columns = results
+        if [list(vals) for vals in zip(*line_rows)][2:] != [list(vals) for vals in columns][2:] \
+                or not np.array_equal([line_row[:2] for line_row in line_rows], np.stack(columns[:2], axis=1)):
+            raise ValueError(num_lines)
+        rows.append(row)
+    print(format_table(("lines", "one at a time (best, s)", "bulk (best, s)"), rows))
+
+
+if __name__ == "__main__":
+    main()
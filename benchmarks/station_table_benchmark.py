@@ -0,0 +1,111 @@
+"""
+Compares digesting the stations data of a synthetic metro into per
+station arrays and dicts of tuples (as Metro used to) against a
+StationTable, in time and in the python memory held by the result.
+    python -m benchmarks.station_table_benchmark [-n 1000 10000 100000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import numpy as np
+
+from maplib.tools.numpy_type_tools import np_float
+from maplib.tools.numpy_type_tools import np_to_tuple
+from maplib.tools.simple_functions import format_table
+from maplib.utils.station_table import NameTable
+from maplib.utils.station_table import StationTable
+
+
+def get_synthetic_stations_data(num_stations, seed):
+    rng = np.random.default_rng(seed)
+    xs = np.cumsum(rng.integers(2, 5, num_stations)).tolist()
+    ys = np.cumsum(rng.integers(-3, 4, num_stations)).tolist()
+    directions = rng.integers(0, 4, num_stations).tolist()
+    label_directions = rng.integers(0, 8, num_stations).tolist()
+    return [
+        [x, y, direction, label_direction, None, "Station {0}".format(k), "站{0}".format(k)]
+        for k, (x, y, direction, label_direction) in enumerate(zip(xs, ys, directions, label_directions))
+    ]
+
+
+def digest_into_dicts(stations_data):
+    station_coords = []
+    signs = []
+    stations_data_dict = {}
+    coord_to_direction_dict = {}
+    real_stations_data_dict = {}
+    for station_data in stations_data:
+        station_x_coord, station_y_coord, simplified_direction, label_simple_direction, \
+            sign, station_name_eng, station_name_chn = station_data
+        station_coord = np_float(station_x_coord, station_y_coord)
+        station_coords.append(station_coord)
+        signs.append(sign)
+        stations_data_dict[np_to_tuple(station_coord)] = (
+            sign,
+            station_name_eng,
+            station_name_chn,
+            label_simple_direction
+        )
+        coord_to_direction_dict[np_to_tuple(station_coord)] = simplified_direction
+    for station_coord in station_coords:
+        station_data = stations_data_dict[np_to_tuple(station_coord)]
+        if station_data[0] != "*":
+            real_station_data = list(station_data)[1:]
+            real_station_data.insert(0, None)
+            real_stations_data_dict[np_to_tuple(station_coord)] = tuple(real_station_data)
+    return station_coords, stations_data_dict, coord_to_direction_dict, real_stations_data_dict
+
+
+def digest_into_table(stations_data):
+    station_table = StationTable.from_stations_data(stations_data, NameTable())
+    station_coords = list(station_table.get_coords())
+    signs = station_table.get_signs()
+    station_keys = station_table.get_keys()
+    coord_to_direction_dict = dict(zip(station_keys, station_table.rows["direction"].tolist()))
+    last_station_indexes_dict = {key: k for k, key in enumerate(station_keys)}
+    real_station_indexes_dict = {}
+    for station_key in station_keys:
+        last_station_index = last_station_indexes_dict[station_key]
+        if signs[last_station_index] != "*":
+            real_station_indexes_dict[station_key] = last_station_index
+    real_station_table = station_table.take(list(real_station_indexes_dict.values()))
+    return station_table, station_coords, coord_to_direction_dict, real_station_table
+
+
+def measure_held(func, *args):
+    """
+    Return (seconds, python memory held by the result in KiB).
+    """
+    gc.collect()
+    tracemalloc.start()
+    begin = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - begin
+    held_memory = tracemalloc.get_traced_memory()[0] // 1024
+    tracemalloc.stop()
+    del result
+    return seconds, held_memory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--num-stations", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rows = []
+    for num_stations in args.num_stations:
+        stations_data = get_synthetic_stations_data(num_stations, args.seed)
+        row = [num_stations]
+        for func in (digest_into_dicts, digest_into_table):
+            seconds, held_memory = measure_held(func, stations_data)
+            row.extend(["{0:.3f}".format(seconds), held_memory])
+        rows.append(row)
+    print(format_table(
+        ("stations", "dicts (s)", "dicts (KiB)", "table (s)", "table (KiB)"), rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measures the memory held by the element tree of a rendered project: the
+traced python memory which is released when the project is dropped.
+Tracked files are not touched.
+    python -m benchmarks.svg_node_benchmark [-p Shanghai] [-s default_style]
+"""
+import argparse
+import collections
+import gc
+import tempfile
+import tracemalloc
+
+import maplib.constants as consts
+
+from benchmarks.render_benchmark import get_temp_context
+from maplib.svg.main_project import Project
+from maplib.tools.simple_functions import format_table
+
+
+def count_nodes(element, counter):
+    counter[type(element).__name__] += 1
+    for subelement in element:
+        count_nodes(subelement, counter)
+    return counter
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--project", default=consts.DEFAULT_PROJECT_CITY_NAME)
+    parser.add_argument("-s", "--style", default=consts.DEFAULT_STYLE_FILE_NAME)
+    parser.add_argument("-n", "--num-rows", type=int, default=5)
+    args = parser.parse_args()
+    consts.PRINT_TEX_WRITING_PROGRESS_MSG = False
+    consts.PRINT_FILE_MODIFYING_MSG = False
+    consts.PRINT_FILE_READY_MSG = False
+    consts.PRINT_TIMER_MSG = False
+    with tempfile.TemporaryDirectory() as temp_dir:
+        context = get_temp_context(args.project, args.style, temp_dir)
+        context.TEX_REGISTRY
+        gc.collect()
+        tracemalloc.start()
+        project = Project(context)
+        gc.collect()
+        held_memory = tracemalloc.get_traced_memory()[0]
+        counter = count_nodes(project.root, collections.Counter())
+        del project
+        gc.collect()
+        tree_memory = held_memory - tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        context.reset_databases()
+    num_nodes = sum(counter.values())
+    rows = [[class_name, num] for class_name, num in counter.most_common(args.num_rows)]
+    print(format_table(("class", "nodes"), rows))
+    print("{0} nodes, {1} KiB held by the project, {2:.0f} B per node".format(
+        num_nodes, tree_memory // 1024, tree_memory / num_nodes
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares compiling tex strings one at a time against batched xelatex runs.
+Requires xelatex and dvisvgm. A temporary tex cache is used.
+    python -m benchmarks.tex_batch_benchmark [-p Shanghai] [-n 64] [-b 16 64]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import maplib.constants as consts
+
+from maplib.svg.tex import TexBatchWriter
+from maplib.svg.tex import TexFileBaseWriter
+from maplib.tools.file_tools import load_dict
+from maplib.tools.simple_functions import format_table
+
+
+def get_tex_strings(project_name, num_strings):
+    global_tex_dict = load_dict(os.path.join(consts.FILE_DIR, project_name, "tex.json"))
+    tex_strings = [
+        "\\{0}{{{1}}}".format(font_type, string)
+        for font_type, font_file_dict in global_tex_dict["file"].items()
+        for string in font_file_dict
+    ]
+    return tex_strings[:num_strings]
+
+
+def compile_one_at_a_time(tex_strings):
+    for tex_string in tex_strings:
+        TexFileBaseWriter(tex_string)
+
+
+def compile_in_batches(tex_strings, batch_size):
+    for begin_index in range(0, len(tex_strings), batch_size):
+        TexBatchWriter(tex_strings[begin_index:begin_index + batch_size])
+
+
+def time_in_empty_cache(func, *args):
+    default_cache_dir = consts.TEX_CACHE_DIR
+    with tempfile.TemporaryDirectory() as temp_dir:
+        consts.TEX_CACHE_DIR = temp_dir
+        try:
+            begin = time.perf_counter()
+            func(*args)
+            return time.perf_counter() - begin
+        finally:
+            consts.TEX_CACHE_DIR = default_cache_dir
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--project", default=consts.DEFAULT_PROJECT_CITY_NAME)
+    parser.add_argument("-n", "--num-strings", type=int, default=64)
+    parser.add_argument("-b", "--batch-sizes", type=int, nargs="+", default=[8, 32, consts.TEX_BATCH_SIZE])
+    args = parser.parse_args()
+    for command in ("xelatex", "dvisvgm"):
+        if shutil.which(command) is None:
+            print("{0} is required to run this benchmark".format(command))
+            return
+    consts.PRINT_TEX_WRITING_PROGRESS_MSG = False
+    tex_strings = get_tex_strings(args.project, args.num_strings)
+    rows = []
+    seconds = time_in_empty_cache(compile_one_at_a_time, tex_strings)
+    rows.append(["one at a time", "{0:.3f}".format(seconds), "{0:.2f}".format(len(tex_strings) / seconds)])
+    for batch_size in args.batch_sizes:
+        seconds = time_in_empty_cache(compile_in_batches, tex_strings, batch_size)
+        rows.append([
+            "batch of {0}".format(batch_size),
+            "{0:.3f}".format(seconds),
+            "{0:.2f}".format(len(tex_strings) / seconds),
+        ])
+    print("{0} strings compiled".format(len(tex_strings)))
+    print(format_table(("mode", "seconds", "strings/s"), rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import maplib
+
+
+if __name__ == "__main__":
+    maplib.build_all()
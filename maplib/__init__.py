@@ -1,35 +1,122 @@
 import os
+import time
 
 import maplib.constants as consts
 
 from maplib.svg.main_project import Project
 from maplib.tools.file_tools import get_file_extension
 from maplib.tools.file_tools import get_relative_path
+from maplib.tools.profiler import Profiler
 from maplib.tools.time_ops import timer_decorator
+from maplib.utils.golden_checker import GoldenChecker
 from maplib.utils.params_getter import Container
+from maplib.utils.params_getter import RenderContext
+from maplib.utils.project_builder import ProjectBuilder
+from maplib.utils.project_watcher import ProjectWatcher
+from maplib.utils.render_server import RenderServer
 
 
 class MakeProject(Container):
-    def __init__(self):
-        Container.__init__(self)
+    """
+    The render is skipped if nothing it depends on has changed since the
+    output svg was last rendered (see RenderCache), unless force is set.
+    """
+    def __init__(self, params, force=False):
+        Container.__init__(self, params)
         output_file_name = self.params.OUTPUT_SVG_DIR
         self.output_file_name = output_file_name
         extension = get_file_extension(output_file_name)
         if extension != ".svg":
             raise NotImplementedError(extension)
-        self.make_project()
+        render_cache = self.params.get_render_cache()
+        if not force and render_cache.load(render_cache.get_fingerprint()) is not None:
+            print(consts.RENDER_CACHE_HIT_MSG.format(get_relative_path(output_file_name)))
+        else:
+            self.make_project()
+            render_cache.dump(render_cache.get_fingerprint())
         if consts.PRINT_FILE_READY_MSG:
             print(consts.FILE_READY_MSG.format(get_relative_path(output_file_name)))
         if consts.OPEN_OUTPUT_FILE_AT_ONCE:
             self.open_output_file()
-    
+
     @timer_decorator()
     def make_project(self):
-        Project()
-    
+        Project(self.params)
+
     def open_output_file(self):
         os.system(self.output_file_name)
 
 
 def main():
-    MakeProject()
+    """
+    Every style given is rendered in turn, the contexts share the network
+    and the glyphs, so that they are only loaded once.
+    With --watch, the process stays alive and renders again on changes.
+    With --profile, the spans and counters of each render are written
+    next to its output, see Profiler.
+    A style is only rendered again if something has changed since its last
+    render, or with --force or --profile. With --watch, it is always
+    rendered, so that the components are kept for the first update.
+    """
+    parser = RenderContext.get_cmd_parser()
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help=consts.CMD_WATCH_HELP_MSG,
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=consts.CMD_PROFILE_HELP_MSG,
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=consts.CMD_FORCE_HELP_MSG,
+    )
+    args = parser.parse_args()
+    if args.profile:
+        consts.ENABLE_PROFILER = True
+    contexts = RenderContext.list_from_cmd(args)
+    project_watcher = ProjectWatcher(contexts) if args.watch else None
+    for context in contexts:
+        if not args.profile:
+            MakeProject(context, args.force or args.watch)
+            continue
+        profiler = Profiler()
+        with profiler.activate():
+            MakeProject(context, True)
+        profiler.dump(context.PROFILE_REPORT_DIR, context.PROFILE_TRACE_DIR)
+    if project_watcher is not None:
+        project_watcher.watch()
+
+
+def build_all():
+    """
+    Renders every style of every project (or of the projects given) in
+    parallel processes.
+    """
+    begin = time.perf_counter()
+    builder = ProjectBuilder.from_cmd().build()
+    builder.print_report(time.perf_counter() - begin)
+    if builder.failures:
+        raise SystemExit(1)
+
+
+def serve():
+    """
+    Serves maps over http, see RenderServer.
+    """
+    RenderServer.from_cmd().serve()
+
+
+def check_golden():
+    """
+    Compares every style of every project (or of the projects given) with
+    its golden svg, see GoldenChecker.
+    """
+    checker = GoldenChecker.from_cmd().check()
+    checker.print_report()
+    if checker.get_failures():
+        raise SystemExit(1)
@@ -28,9 +28,19 @@ LD = LEFT + DOWN
 RD = RIGHT + DOWN
 FOUR_BASE_DIRECTIONS = (RIGHT, UP, LEFT, DOWN)
 EIGHT_BASE_DIRECTIONS = (RIGHT, RU, UP, LU, LEFT, LD, DOWN, RD)
+# lines in simplified directions 0 to 3: a (not normalized) direction vector,
+# and a matrix rotating by the opposite angle, scaled by a positive number
+LINE_DIRECTION_VECTORS = np.array((RIGHT, RU, UP, LU))
+LINE_INVERSE_ROTATION_MATRICES = np.array((
+    ((1, 0), (0, 1)),
+    ((1, 1), (-1, 1)),
+    ((0, 1), (-1, 0)),
+    ((-1, 1), (-1, -1)),
+), dtype="float64")
 
 # string constants
 UTF_8 = "utf-8"
+SVG_ENCODING = "us-ascii"
 HORIZONTAL = "h"
 VERTICAL = "v"
 CHN = "chn"
@@ -61,7 +71,11 @@ LOGO_DIRS = {
 TEMPLATE_TEX_FILE = os.path.join(FILE_DIR, "tex_template.tex")
 with open(TEMPLATE_TEX_FILE, "r") as input_file:
     TEMPLATE_TEX_FILE_BODY = input_file.read()
+TEMPLATE_BATCH_TEX_FILE = os.path.join(FILE_DIR, "tex_batch_template.tex")
+with open(TEMPLATE_BATCH_TEX_FILE, "r") as input_file:
+    TEMPLATE_BATCH_TEX_FILE_BODY = input_file.read()
 TEX_TO_REPLACE = "YourTextHere"
+TEX_BATCH_PAGE = "\\begin{{preview}}{0}\\end{{preview}}"
 
 # tex fonts
 TEX_FONT_CMDS_DICT = {
@@ -71,6 +85,27 @@ TEX_FONT_CMDS_DICT = {
 TEX_FONT_CMDS = reduce(op.add, TEX_FONT_CMDS_DICT.values())
 
 # options
+TEX_BATCH_SIZE = 64
+TEX_MAX_WORKERS = None
+TEX_JOB_TIMEOUT = 120.0
+TEX_JOB_RETRIES = 1
+TEX_JOURNAL_COMPACT_SIZE = 1 << 20
+BUILD_MAX_WORKERS = None
+WATCH_POLL_INTERVAL = 0.2
+FADED_METRO_RATIO = 0.75
+RENDER_SERVER_HOST = "127.0.0.1"
+RENDER_SERVER_PORT = 8000
+RENDER_SERVER_MAX_WORKERS = 4
+RENDER_SERVER_CACHE_SIZE = 64
+RENDER_SERVER_LATENCY_WINDOW = 1000
+PRINT_RENDER_SERVER_LOG = True
+SVG_WRITE_BUFFER_SIZE = 1 << 16
+USE_INPUT_CACHE = True
+ENABLE_PROFILER = False
+ENABLE_TEX_GENERATION = True
+GOLDEN_TOLERANCE = 1e-4
+INPUT_CACHE_VERSION = "1"
+RENDER_CACHE_VERSION = "1"
 OPEN_OUTPUT_FILE_AT_ONCE = True
 PRINT_TEX_WRITING_PROGRESS_MSG = True
 PRINT_FILE_MODIFYING_MSG = True
@@ -79,6 +114,9 @@ PRINT_TIMER_MSG = True
 
 # msgs
 TEX_WRITING_PROGRESS_MSG = "Writing '{0}'"
+TEX_CACHE_HIT_MSG = "Found '{0}' in tex cache"
+TEX_BATCH_WRITING_PROGRESS_MSG = "Writing {0} strings in one batch"
+JOB_FAILED_MSG = "Failed '{0}' - {1}"
 SINGLE_TEX_MSG = "{0} - {1}"
 GENERATE_SUCCESSFULLY_MSG = "Successfully generated"
 GENERATE_UNSUCCESSFULLY_MSG = "Already existed"
@@ -88,10 +126,37 @@ TEX_GENERATE_MEG = "Generating tex..."
 TEX_REMOVE_MEG = "Removing tex..."
 FORMAT_MSG = "Formatting {0}..."
 COPY_MSG = "Copying {0}..."
+COMPACT_MSG = "Compacting {0} into {1}..."
+STATION_DATA_ERROR_MSG = "Invalid station data in {0}, line {1}: '{2}'"
+STATION_SIGN_ERROR_MSG = "Invalid sign '{0}' of station {1}, a sign is a single character"
 COPY_FINISH_MSG = "Successfully copied to {0}"
 FILE_READY_MSG = "File ready at {0}"
+RENDER_CACHE_HIT_MSG = "Nothing changed since {0} was rendered, skipped the render (use --force to render anyway)"
 TIMER_MSG = "Consumed time of function {0}: {1:.3f} second(s)"
+BUILD_FAILED_MSG = "Failed {0} - {1}"
+BUILD_SUMMARY_MSG = "Built {0} of {1} target(s) in {2:.3f} second(s)"
+WATCH_START_MSG = "Watching {0} for changes, press Ctrl+C to stop"
+WATCH_CHANGE_MSG = "Changed {0}"
+WATCH_RENDER_MSG = "Rendered {0} in {1:.3f} second(s), {2} of {3} component(s) reused"
+WATCH_CYCLE_MSG = "Updated in {0:.3f} second(s)"
+WATCH_ERROR_MSG = "Failed {0} - {1}"
+RENDER_SERVER_START_MSG = "Serving maps at http://{0}:{1}/render, press Ctrl+C to stop"
+TEX_GENERATION_DISABLED_MSG = "not in tex.json, and tex generation is disabled"
+GOLDEN_DIFFERENCE_MSG = "Differs from {0} at {1}\n    {2}"
+GOLDEN_SUMMARY_MSG = "{0} of {1} target(s) match their golden svg"
+NO_ACTIVE_CONTEXT_MSG = "No render context is active, call RenderContext.activate() or pass params explicitly"
+UNKNOWN_METROS_MSG = "Unknown lines: {0}"
 
 # help msgs
 CMD_PROJECT_HELP_MSG = "name of your target project file"
-CMD_STYLE_HELP_MSG = "name of the style file (ignore '.py')"
+CMD_STYLE_HELP_MSG = "names of the style files (ignore '.py')"
+CMD_WATCH_HELP_MSG = "render again whenever input.json, a logo or a style file changes"
+CMD_BUILD_PROJECT_HELP_MSG = "names of the projects to build (all of them by default)"
+CMD_JOBS_HELP_MSG = "number of worker processes (the number of cpus by default)"
+CMD_RENDER_JOBS_HELP_MSG = "number of render threads"
+CMD_PROFILE_HELP_MSG = "write a json report and a chrome trace of the spans and counters of each render"
+CMD_FORCE_HELP_MSG = "render even if nothing has changed since the last render"
+CMD_CACHE_SIZE_HELP_MSG = "number of rendered svgs kept in memory"
+CMD_CHECK_PROJECT_HELP_MSG = "names of the projects to check (all of them by default)"
+CMD_TOLERANCE_HELP_MSG = "largest difference allowed between two numbers"
+CMD_UPDATE_GOLDEN_HELP_MSG = "store the rendered svgs as the golden ones instead of comparing"
@@ -1,23 +1,38 @@
-import xml.etree.ElementTree as ElementTree
-
 from maplib.svg.svg_element import Defs
 from maplib.svg.svg_element import Group
 from maplib.svg.svg_element import Svg
-from maplib.svg.path_types import CommandPath
+from maplib.svg.svg_writer import SvgWriter
+from maplib.svg.path_types import OutlinePath
 from maplib.tools.json_file_tools import JsonTools
+from maplib.tools.profiler import add_count
+from maplib.tools.profiler import profile_span
 from maplib.tools.simple_functions import sort_dict_by_key
 from maplib.utils.params_getter import Container
+from maplib.utils.render_registry import RenderRegistry
 
 
 class Canvas(Container):
-    def __init__(self):
-        Container.__init__(self)
-        self.init_background()
-        self.init_tex_objs_list()
-        self.construct()
-        self.define_path()
-        self.modify_json()
-        self.write_to_file(self.params.OUTPUT_SVG_DIR)
+    """
+    Rendered at once and written to OUTPUT_SVG_DIR, unless write_file is
+    False (see SvgWriter.to_bytes). The tex journal is compacted beyond
+    tex_journal_compact_size, see JsonTools.update_generated_tex_in_json.
+    """
+    def __init__(self, params=None, write_file=True, tex_journal_compact_size=None):
+        Container.__init__(self, params)
+        self.tex_journal_compact_size = tex_journal_compact_size
+        self.render_registry = RenderRegistry()
+        with self.params.activate(), self.render_registry.activate():
+            self.init_background()
+            self.init_tex_objs_list()
+            with profile_span("element_build"):
+                self.construct()
+            with profile_span("glyph_paths"):
+                self.define_path()
+            with profile_span("json_update"):
+                self.modify_json()
+        if write_file:
+            with profile_span("serialize"):
+                self.write_to_file(self.params.OUTPUT_SVG_DIR)
 
     def construct(self):
         """
@@ -39,11 +54,9 @@ class Canvas(Container):
         self.define(path_group)
 
     def init_tex_objs_list(self):
-        self.global_tex_objs = []
+        self.global_tex_objs = self.render_registry.tex_objs
 
     def define(self, component):
-        if hasattr(component, "tex_objs"):
-            self.global_tex_objs.extend(component.tex_objs)
         if hasattr(component, "template"):
             self.define(component.template)
         self.defs.append(component)
@@ -52,33 +65,24 @@ class Canvas(Container):
         self.canvas.use(id_name)
 
     def define_path(self):
-        global_tex_paths_cmd_dict = {}
+        global_tex_outlines_dict = {}
         for tex_obj in self.global_tex_objs:
-            global_tex_paths_cmd_dict.update(tex_obj.tex_paths_cmd_dict)
-        global_tex_paths_cmd_dict = sort_dict_by_key(global_tex_paths_cmd_dict)
-        for path_id, path_cmd in global_tex_paths_cmd_dict.items():
-            path_obj = CommandPath(path_id, path_cmd)
+            global_tex_outlines_dict.update(tex_obj.tex_outlines_dict)
+        global_tex_outlines_dict = sort_dict_by_key(global_tex_outlines_dict)
+        add_count("glyphs_emitted", len(global_tex_outlines_dict))
+        for path_id, outline in global_tex_outlines_dict.items():
+            path_obj = OutlinePath(path_id, outline)
             self.path_group.append(path_obj)
 
     def modify_json(self):
-        tool = JsonTools()
-        tool.update_generated_tex_in_json(self.global_tex_objs)
-
-    @staticmethod
-    def modify_svg_str(string):
-        string = string.replace(" />", "/>")
-        string = string.replace("><", ">\n<")
-        return string
-
-    @staticmethod
-    def modify_svg_file(file_name):
-        with open(file_name, "r") as input_file:
-            string = "".join(input_file.readlines())
-        result = Canvas.modify_svg_str(string)
-        with open(file_name, "w") as output_file:
-            output_file.write(result)
+        tool = JsonTools(self.params)
+        self.generated_tex_objs = tool.update_generated_tex_in_json(
+            self.global_tex_objs, self.tex_journal_compact_size
+        )
 
     def write_to_file(self, file_name):
-        file_body = ElementTree.ElementTree(self.root)
-        file_body.write(file_name)
-        Canvas.modify_svg_file(file_name)
+        SvgWriter.write_file(self.root, file_name)
+
+    def to_bytes(self):
+        with profile_span("serialize"):
+            return SvgWriter.to_bytes(self.root)
@@ -15,13 +15,16 @@ from maplib.svg.misc import MaskRectangle
 from maplib.svg.misc import SidePart
 from maplib.svg.svg_element import Group
 from maplib.svg.web_system import WebSystem
+from maplib.tools.profiler import profile_span
 from maplib.utils.constructor import Constructor
+from maplib.utils.render_registry import register_metro_objs
 
 
 class MapBody(Group, Constructor):
     def __init__(self, id_name):
         Constructor.__init__(self)
         Group.__init__(self, id_name)
+        register_metro_objs(self.get_metro_objs_in_input_order())
         self.shift(self.params.MAP_BODY_SHIFT_VECTOR)
         components = self.get_components()
         for component in components:
@@ -29,15 +32,27 @@ class MapBody(Group, Constructor):
 
     def get_components(self):
         return (
-            GeographicMap("geographic_map", self.geography_objs_dict),
-            GeographicName("geographic_name", self.name_objs_dict),
-            WebSystem("web_system", self.metro_objs, self.station_objs),
-            StationName("station_name", self.station_objs),
-            SignName("sign_name", self.metro_objs),
-            MarkGroup("mark_group", self.mark_objs_dict),
-            Compass("compass"),
+            self.get_component(GeographicMap, "geographic_map", ("geography",), self.geography_objs_dict),
+            self.get_component(GeographicName, "geographic_name", ("names",), self.name_objs_dict),
+            self.get_component(WebSystem, "web_system", ("metros", "stations"), self.metro_objs, self.station_objs),
+            self.get_component(StationName, "station_name", ("metros", "stations"), self.station_objs),
+            self.get_component(SignName, "sign_name", ("metros",), self.metro_objs),
+            self.get_component(MarkGroup, "mark_group", ("marks",), self.mark_objs_dict),
+            self.get_component(Compass, "compass", ()),
         )
 
+    def get_component(self, ClassName, id_name, section_names, *args):
+        """
+        With a component cache (see watch mode), a component is only built
+        again if a part of the network it depends on has changed.
+        """
+        component_cache = self.params.component_cache
+        with profile_span(id_name):
+            if component_cache is None:
+                return ClassName(id_name, *args)
+            fingerprint = tuple([self.section_fingerprints[section_name] for section_name in section_names])
+            return component_cache.get_component(id_name, fingerprint, lambda: ClassName(id_name, *args))
+
 
 class MapGroup(Group):
     def __init__(self, id_name):
@@ -2,10 +2,7 @@ import numpy as np
 
 from maplib.svg.svg_element import Path
 from maplib.tools.assertions import assert_is_standard_route
-from maplib.tools.simple_functions import adjacent_n_tuples
-from maplib.tools.space_ops import abs_arg_pair
-from maplib.tools.space_ops import arg
-from maplib.tools.space_ops import get_angle
+from maplib.tools.space_ops import get_corner_arcs
 
 
 class CommandPath(Path):
@@ -15,6 +12,17 @@ class CommandPath(Path):
         self.finish_path()
 
 
+class OutlinePath(Path):
+    """
+    Written straight from a GlyphOutline, which has been checked when it
+    was parsed.
+    """
+    def __init__(self, id_name, outline):
+        Path.__init__(self, id_name)
+        self.path_strings.append(outline.to_path_string())
+        self.finish_path()
+
+
 class LineArcPath(Path):
     def __init__(self, id_name, control_points, arc_radius, loop):
         self.control_points = control_points
@@ -28,20 +36,19 @@ class LineArcPath(Path):
         self.create_path()
 
     def create_path(self):
-        before_arc_points = []
-        after_arc_points = []
-        sweep_flags = []
-        for a, b, c in adjacent_n_tuples(self.control_points, 3, self.loop):
-            theta = get_angle(a, b, c)
-            sweep_flag = 0 if theta >= 0 else 1
-            cut_off_length = self.arc_radius / np.tan(abs(theta) / 2)
-            h1, h2 = [
-                (b + abs_arg_pair(cut_off_length, arg(p - b)))
-                for p in [a, c]
-            ]
-            before_arc_points.append(h1)
-            after_arc_points.append(h2)
-            sweep_flags.append(sweep_flag)
+        control_points = np.array(self.control_points, dtype="float64")
+        if self.loop:
+            a = control_points
+            b = np.roll(control_points, -1, axis=0)
+            c = np.roll(control_points, -2, axis=0)
+        else:
+            a = control_points[:-2]
+            b = control_points[1:-1]
+            c = control_points[2:]
+        before_arc_points, after_arc_points, sweep_flags = get_corner_arcs(a, b, c, self.arc_radius)
+        before_arc_points = list(before_arc_points)
+        after_arc_points = list(after_arc_points)
+        sweep_flags = sweep_flags.tolist()
         if not self.loop:
             before_arc_points.append(self.control_points[-1])
             after_arc_points.append(self.control_points[0])
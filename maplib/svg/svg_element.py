@@ -1,10 +1,11 @@
 import re
-import xml.etree.ElementTree as ElementTree
 
 import maplib.constants as consts
 
 from maplib.tools.assertions import assert_length
 from maplib.tools.assertions import assert_type
+from maplib.tools.glyph_outline import GlyphOutline
+from maplib.tools.profiler import add_count
 from maplib.tools.simple_functions import modify_num
 from maplib.tools.simple_functions import nums_to_string
 from maplib.tools.simple_functions import string_to_nums
@@ -15,54 +16,47 @@ from maplib.utils.color import Color
 from maplib.utils.params_getter import Container
 
 
-class ETElement(ElementTree.Element, Container):
+class SvgNode(object):
+    """
+    The tree data of an svg element, read by SvgWriter the way it would
+    read an ElementTree.Element. Kept in slots, since a map builds tens
+    of thousands of nodes, most of them leaves such as Use.
+    """
+    __slots__ = ("attrib", "subelements")
     tag_name = ""
     attr_names = ()
     allow_append = True
+    text = None
+    tail = None
 
     def __init__(self):
-        Container.__init__(self)
-        self.init_attrib_dict()
-        ElementTree.Element.__init__(self, self.tag_name, attrib=self.attrib)
-
-    def init_attrib_dict(self):
+        if consts.ENABLE_PROFILER:
+            add_count("elements_created")
         self.attrib = {}
-        return self
+        if self.allow_append:
+            self.subelements = []
+        else:
+            self.subelements = ()
 
+    @property
+    def tag(self):
+        return self.tag_name
 
-class Element(ETElement):
-    def __init__(self, id_name):
-        ETElement.__init__(self)
-        self.init_id(id_name)
-        self.init_attrs()
+    def __len__(self):
+        return len(self.subelements)
+
+    def __iter__(self):
+        return iter(self.subelements)
+
+    def __getitem__(self, index):
+        return self.subelements[index]
 
     def append(self, subelement):
         if not self.allow_append:
             raise NotImplementedError
-        ETElement.append(self, subelement)
-        if hasattr(subelement, "tex_objs"):
-            if not hasattr(self, "tex_objs"):
-                self.tex_objs = []
-            self.tex_objs.extend(subelement.tex_objs)
-        if hasattr(subelement, "template"):
-            if not hasattr(self, "template"):
-                self.init_template()
-            self.template.append(subelement.template)
+        self.subelements.append(subelement)
         return self
 
-    def init_template(self):
-        self.template = Group(None)
-        return self
-
-    def init_id(self, id_name):
-        if id_name is not None:
-            self.id_name = id_name
-            self.set_attr_val("id", id_name)
-        return self
-
-    def init_attrs(self):
-        pass
-
     @staticmethod
     def attr_val_to_str(val):
         if val is None:
@@ -72,13 +66,15 @@ class Element(ETElement):
         if isinstance(val, Style):
             return val.get_style_xml_str()
         if isinstance(val, float):
+            if consts.ENABLE_PROFILER:
+                add_count("floats_formatted")
             return str(modify_num(val))
         raise TypeError(val)
 
     def set_attr_val(self, key, val):
         if key not in self.attr_names:
             raise NotImplementedError(key)
-        self.attrib[key] = Element.attr_val_to_str(val)
+        self.attrib[key] = SvgNode.attr_val_to_str(val)
         return self
 
     def set_style(self, style_dict):
@@ -86,6 +82,43 @@ class Element(ETElement):
         return self
 
 
+class ETElement(SvgNode, Container):
+    """
+    A node which may carry other attributes, including the context.
+    """
+    def __init__(self):
+        Container.__init__(self)
+        SvgNode.__init__(self)
+
+
+class Element(ETElement):
+    def __init__(self, id_name):
+        ETElement.__init__(self)
+        self.init_id(id_name)
+        self.init_attrs()
+
+    def append(self, subelement):
+        SvgNode.append(self, subelement)
+        if hasattr(subelement, "template"):
+            if not hasattr(self, "template"):
+                self.init_template()
+            self.template.append(subelement.template)
+        return self
+
+    def init_template(self):
+        self.template = Group(None)
+        return self
+
+    def init_id(self, id_name):
+        if id_name is not None:
+            self.id_name = id_name
+            self.set_attr_val("id", id_name)
+        return self
+
+    def init_attrs(self):
+        pass
+
+
 class Style(object):
     key_to_types_dict = {
         "fill": (Color, None, Element),
@@ -122,6 +155,8 @@ class Style(object):
         if isinstance(val, Element) and Element in valid_types:
             return "url(#{0})".format(val.id_name)
         if isinstance(val, float) and float in valid_types:
+            if consts.ENABLE_PROFILER:
+                add_count("floats_formatted")
             return str(modify_num(val))
         if isinstance(val, str) and str in valid_types:
             return val
@@ -234,18 +269,7 @@ class Path(Element):
     tag_name = "path"
     attr_names = ("id", "d", "style")
     allow_append = False
-    command_num_dict = {
-        "M": 2,  # moveto
-        "L": 2,  # lineto
-        "H": 1,  # horizontal lineto
-        "V": 1,  # vertical lineto
-        "C": 6,  # curveto
-        "S": 4,  # smooth curveto
-        "Q": 4,  # quadratic Bezier curve
-        "T": 2,  # smooth quadratic Bezier curveto
-        "A": 7,  # elliptical Arc
-        "Z": 0,  # closepath
-    }
+    command_num_dict = GlyphOutline.command_num_dict
     command_keys = list(command_num_dict.keys())
 
     def init_attrs(self):
@@ -395,13 +419,14 @@ class Rectangle(Alignable, Element):
         return self
 
 
-class Use(Element):
+class Use(SvgNode):
+    __slots__ = ()
     tag_name = "use"
     attr_names = ("xlink:href", "x", "y", "style")
     allow_append = False
 
     def __init__(self, href_id_name, relative_coord=None):
-        ETElement.__init__(self)
+        SvgNode.__init__(self)
         self.init_href_id_name(href_id_name)
         self.set_relative_coord(relative_coord)
 
@@ -417,13 +442,14 @@ class Use(Element):
         return self
 
 
-class Stop(Element):
+class Stop(SvgNode):
+    __slots__ = ()
     tag_name = "stop"
     attr_names = ("offset", "style")
     allow_append = False
 
     def __init__(self, offset, stop_color, stop_opacity):
-        ETElement.__init__(self)
+        SvgNode.__init__(self)
         self.set_attr_val("offset", offset)
         self.set_style({
             "stop-color": stop_color,
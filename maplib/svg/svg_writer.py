@@ -0,0 +1,89 @@
+from xml.sax.saxutils import escape
+import io
+
+import maplib.constants as consts
+
+from maplib.tools.file_tools import open_replacing_file
+
+
+class SvgWriter(object):
+    """
+    Writes an element tree straight into a file in one pass, in the format
+    of ElementTree.write followed by
+        string.replace(" />", "/>").replace("><", ">\\n<")
+    i.e. empty elements are closed by "/>" and adjacent tags are split
+    by a newline. Characters out of ascii become character references.
+    Only the tags on the current branch are kept in memory.
+    """
+    attr_entities = {
+        "\"": "&quot;",
+        "\r": "&#13;",
+        "\n": "&#10;",
+        "\t": "&#09;",
+    }
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.after_tag = False
+
+    @staticmethod
+    def write_file(element, file_name):
+        """
+        The file is replaced atomically.
+        """
+        with open_replacing_file(
+            file_name, "w",
+            encoding=consts.SVG_ENCODING,
+            errors="xmlcharrefreplace",
+            buffering=consts.SVG_WRITE_BUFFER_SIZE,
+        ) as output_file:
+            SvgWriter(output_file).write_element(element)
+
+    @staticmethod
+    def to_bytes(element):
+        """
+        The content write_file would write.
+        """
+        output_buffer = io.BytesIO()
+        with io.TextIOWrapper(
+            output_buffer,
+            encoding=consts.SVG_ENCODING,
+            errors="xmlcharrefreplace",
+            write_through=False,
+        ) as output_file:
+            SvgWriter(output_file).write_element(element)
+            output_file.flush()
+            return output_buffer.getvalue()
+
+    def write_tag(self, tag_str):
+        if self.after_tag:
+            self.output_file.write("\n")
+        self.output_file.write(tag_str)
+        self.after_tag = True
+        return self
+
+    def write_text(self, text):
+        if text:
+            self.output_file.write(escape(text))
+            self.after_tag = False
+        return self
+
+    @staticmethod
+    def get_attrs_str(element):
+        return "".join([
+            " {0}=\"{1}\"".format(key, escape(val, SvgWriter.attr_entities))
+            for key, val in element.attrib.items()
+        ])
+
+    def write_element(self, element):
+        start_tag_str = "<" + element.tag + SvgWriter.get_attrs_str(element)
+        if element.text or len(element):
+            self.write_tag(start_tag_str + ">")
+            self.write_text(element.text)
+            for subelement in element:
+                self.write_element(subelement)
+            self.write_tag("</" + element.tag + ">")
+        else:
+            self.write_tag(start_tag_str + "/>")
+        self.write_text(element.tail)
+        return self
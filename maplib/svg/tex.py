@@ -1,11 +1,18 @@
 from xml.dom import minidom
+import hashlib
 import os
+import threading
 
 import maplib.constants as consts
 
 from maplib.svg.svg_element import Group
 from maplib.tools.assertions import assert_type
+from maplib.tools.glyph_outline import GlyphOutline
+from maplib.tools.job_scheduler import CommandError
+from maplib.tools.job_scheduler import JobScheduler
+from maplib.tools.job_scheduler import run_command
 from maplib.tools.numpy_type_tools import np_float
+from maplib.tools.profiler import profile_span
 from maplib.tools.simple_functions import get_path_id_name
 from maplib.tools.simple_functions import get_path_id_num_str
 from maplib.tools.simple_functions import nums_to_string
@@ -18,18 +25,69 @@ from maplib.utils.params_getter import Container
 class TexFileBaseWriter(object):
     """
     Inspired by 3b1b/manim.
+    The svg outputs are kept in the tex cache, named after a digest of
+    the whole tex body, so they are reused across runs and projects. A
+    page compiled by TexBatchWriter is stored under the same key, since it
+    is compiled with the same preamble.
     """
     def __init__(self, tex_string):
-        new_body = consts.TEMPLATE_TEX_FILE_BODY.replace(consts.TEX_TO_REPLACE, tex_string)
+        new_body = TexFileBaseWriter.get_new_body(tex_string)
         self.tex_string = tex_string
         self.new_body = new_body
-        file_name_body = os.path.join(consts.TEX_CACHE_DIR, str(hash(tex_string)))
-        svg_file_name = file_name_body + ".svg"
-        tex_file = self.generate_tex_file(svg_file_name)
-        dvi_file = TexFileBaseWriter.tex_to_dvi(tex_file)
-        self.svg_file = TexFileBaseWriter.dvi_to_svg(dvi_file)
+        svg_file_name = TexFileBaseWriter.get_existing_svg_file_name(tex_string)
+        if svg_file_name is not None:
+            if consts.PRINT_TEX_WRITING_PROGRESS_MSG:
+                print(consts.TEX_CACHE_HIT_MSG.format(self.tex_string))
+        else:
+            svg_file_name = TexFileBaseWriter.get_cached_svg_file_name(new_body)
+            self.compile_svg_file(svg_file_name)
+        self.svg_file = svg_file_name
+
+    @staticmethod
+    def get_new_body(tex_string):
+        return consts.TEMPLATE_TEX_FILE_BODY.replace(consts.TEX_TO_REPLACE, tex_string)
+
+    @staticmethod
+    def get_existing_svg_file_name(tex_string):
+        """
+        The cached svg of the string, None if there is none.
+        """
+        svg_file_name = TexFileBaseWriter.get_cached_svg_file_name(TexFileBaseWriter.get_new_body(tex_string))
+        if os.path.exists(svg_file_name):
+            return svg_file_name
+        return None
+
+    @staticmethod
+    def get_scratch_file_name_body(file_name_body):
+        return "-".join([file_name_body, str(os.getpid()), str(threading.get_ident())])
+
+    @staticmethod
+    def remove_scratch_files(file_name_body):
         for extension in (".tex", ".xdv", ".log", ".aux"):
-            os.remove(file_name_body + extension)
+            if os.path.exists(file_name_body + extension):
+                os.remove(file_name_body + extension)
+
+    @staticmethod
+    def get_cache_key(new_body):
+        return hashlib.sha256(new_body.encode(consts.UTF_8)).hexdigest()
+
+    @staticmethod
+    def get_cached_svg_file_name(new_body):
+        return os.path.join(consts.TEX_CACHE_DIR, TexFileBaseWriter.get_cache_key(new_body) + ".svg")
+
+    def compile_svg_file(self, svg_file_name):
+        """
+        Scratch files get a name unique to this thread, the svg file is
+        only moved to its cached name once it is complete.
+        """
+        file_name_body = TexFileBaseWriter.get_scratch_file_name_body(svg_file_name[:-len(".svg")])
+        tex_file = self.generate_tex_file(file_name_body + ".svg")
+        try:
+            dvi_file = TexFileBaseWriter.tex_to_dvi(tex_file)
+            scratch_svg_file = TexFileBaseWriter.dvi_to_svg(dvi_file)
+            os.replace(scratch_svg_file, svg_file_name)
+        finally:
+            TexFileBaseWriter.remove_scratch_files(file_name_body)
 
     def generate_tex_file(self, svg_file_name):
         result = svg_file_name.replace(".svg", ".tex")
@@ -41,6 +99,9 @@ class TexFileBaseWriter(object):
     
     @staticmethod
     def tex_to_dvi(tex_file):
+        """
+        If xelatex fails, the error carries the content of its log file.
+        """
         result = tex_file.replace(".tex", ".xdv")
         file_dir = os.path.dirname(tex_file)
         commands = [
@@ -50,12 +111,15 @@ class TexFileBaseWriter(object):
             "-halt-on-error",
             "-output-directory=" + file_dir,
             tex_file,
-            ">",
-            os.devnull
         ]
-        exit_code = os.system(" ".join(commands))
-        if exit_code != 0:
-            raise OSError
+        try:
+            run_command(commands)
+        except CommandError as error:
+            log_file = tex_file.replace(".tex", ".log")
+            if os.path.exists(log_file):
+                with open(log_file, "r", encoding=consts.UTF_8, errors="replace") as input_file:
+                    error.log = input_file.read()
+            raise
         return result
     
     @staticmethod
@@ -75,15 +139,108 @@ class TexFileBaseWriter(object):
             "0",
             "-o",
             result,
-            ">",
-            os.devnull
         ]
-        os.system(" ".join(commands))
+        run_command(commands)
         return result
 
 
+class TexBatchWriter(object):
+    """
+    Compiles many tex strings with a single xelatex run. Every string is
+    put in its own preview environment, which standalone (multi=preview)
+    crops into its own page, with the preamble of a single run, and
+    dvisvgm splits the pages into svg files. So a page is the svg of a
+    single run of its string, and is moved into the tex cache under the
+    same key.
+    """
+    def __init__(self, tex_strings):
+        self.tex_strings = tex_strings
+        pages = [consts.TEX_BATCH_PAGE.format(tex_string) for tex_string in tex_strings]
+        self.new_body = consts.TEMPLATE_BATCH_TEX_FILE_BODY.replace(
+            consts.TEX_TO_REPLACE, "\n".join(pages)
+        )
+        file_name_body = TexFileBaseWriter.get_scratch_file_name_body(os.path.join(
+            consts.TEX_CACHE_DIR, "batch-" + TexFileBaseWriter.get_cache_key(self.new_body)
+        ))
+        tex_file = self.generate_tex_file(file_name_body)
+        try:
+            dvi_file = TexFileBaseWriter.tex_to_dvi(tex_file)
+            page_svg_files = TexBatchWriter.dvi_to_svg_pages(dvi_file)
+            if len(page_svg_files) != len(tex_strings):
+                for page_svg_file in page_svg_files:
+                    os.remove(page_svg_file)
+                raise OSError(dvi_file)
+            for tex_string, page_svg_file in zip(tex_strings, page_svg_files):
+                new_body = TexFileBaseWriter.get_new_body(tex_string)
+                os.replace(page_svg_file, TexFileBaseWriter.get_cached_svg_file_name(new_body))
+        finally:
+            TexFileBaseWriter.remove_scratch_files(file_name_body)
+
+    def generate_tex_file(self, file_name_body):
+        result = file_name_body + ".tex"
+        if consts.PRINT_TEX_WRITING_PROGRESS_MSG:
+            print(consts.TEX_BATCH_WRITING_PROGRESS_MSG.format(len(self.tex_strings)))
+        with open(result, "w", encoding=consts.UTF_8) as outfile:
+            outfile.write(self.new_body)
+        return result
+
+    @staticmethod
+    def dvi_to_svg_pages(dvi_file):
+        """
+        Return the svg files of all pages, sorted by page number.
+        """
+        file_name_body = dvi_file.replace(".xdv", "")
+        commands = [
+            "dvisvgm",
+            dvi_file,
+            "--page=1-",
+            "-n",
+            "-v",
+            "0",
+            "-o",
+            file_name_body + "-p%p.svg",
+        ]
+        run_command(commands)
+        file_dir, base_name = os.path.split(file_name_body)
+        prefix = base_name + "-p"
+        page_svg_files = [
+            (int(file_name[len(prefix):-len(".svg")]), os.path.join(file_dir, file_name))
+            for file_name in os.listdir(file_dir)
+            if file_name.startswith(prefix) and file_name.endswith(".svg")
+        ]
+        page_svg_files.sort()
+        return [page_svg_file for page_num, page_svg_file in page_svg_files]
+
+    @staticmethod
+    def write_missing_tex_files(tex_writers, batch_size=consts.TEX_BATCH_SIZE):
+        """
+        Compiles the strings of tex_writers which are neither in the
+        database nor in the tex cache, batch_size strings per xelatex run.
+        Batches run in parallel. If a batch fails, its strings are left to
+        TexFileBaseWriter, which compiles them one by one.
+        """
+        missing_tex_strings = remove_list_redundancies([
+            tex_writer.tex_string
+            for tex_writer in tex_writers
+            if tex_writer.get_file_dict_if_existed() is None
+        ])
+        missing_tex_strings = [
+            tex_string
+            for tex_string in missing_tex_strings
+            if TexFileBaseWriter.get_existing_svg_file_name(tex_string) is None
+        ]
+        if len(missing_tex_strings) <= 1 or not consts.ENABLE_TEX_GENERATION:
+            return
+        batches = [
+            missing_tex_strings[begin_index:begin_index + batch_size]
+            for begin_index in range(0, len(missing_tex_strings), batch_size)
+        ]
+        with profile_span("tex_generation"):
+            JobScheduler().map(TexBatchWriter, batches)
+
+
 class TexFileWriter(Container):
-    def __init__(self, string, font_type, tex_dict_cache=None):
+    def __init__(self, string, font_type, tex_registry=None):
         assert_type(string, str)
         Container.__init__(self)
         if font_type not in consts.TEX_FONT_CMDS:
@@ -91,8 +248,9 @@ class TexFileWriter(Container):
         self.string = string
         self.font_type = font_type
         self.tex_string = "\\{0}{{{1}}}".format(font_type, string)
-        if tex_dict_cache is not None:
-            self.tex_dict_cache = tex_dict_cache
+        if tex_registry is None:
+            tex_registry = self.params.TEX_REGISTRY
+        self.tex_registry = tex_registry
 
     def __eq__(self, obj):
         return isinstance(obj, TexFileWriter) and self.tex_string == obj.tex_string
@@ -149,7 +307,7 @@ class TexFileWriter(Container):
             id_name = path.getAttribute("id")
             path_string = path.getAttribute("d")
             id_num = get_path_id_num_str(id_name)
-            tex_path_dict[id_num] = path_string
+            tex_path_dict[id_num] = GlyphOutline.from_path_string(path_string)
         uses = doc.getElementsByTagName("use")
         href_num_list = []
         x_list = []
@@ -163,29 +321,25 @@ class TexFileWriter(Container):
             x_list.append(x)
             y_list.append(y)
         doc.unlink()
-        os.remove(svg_file)
         tex_file_dict = TexFileWriter.tex_file_lists_to_dict(viewbox_list, href_num_list, x_list, y_list)
         return tex_file_dict, tex_path_dict
 
-    def get_source_dict(self):
-        if hasattr(self, "tex_dict_cache"):
-            return self.tex_dict_cache
-        return self.params.GLOBAL_TEX_DICT.copy()
-
     def get_file_dict_if_existed(self):
-        source_dict = self.get_source_dict()
-        font_file_dict = source_dict["file"][self.font_type]
-        if self.string in font_file_dict:
-            return font_file_dict[self.string]
-        return None
+        return self.tex_registry.get_file_dict(self.font_type, self.string)
+
+    def get_outline(self, path_id_num):
+        return self.tex_registry.get_outline(self.font_type, path_id_num)
 
     def write_tex_file(self, tex_file_dict):
+        """
+        If tex generation is disabled, a string missing from the database
+        fails (and is left empty, see write_empty).
+        """
         if tex_file_dict:
-            source_dict = self.get_source_dict()
-            global_path_dict = source_dict["path"]
-            font_path_dict = global_path_dict[self.font_type]
             href_num_list = tex_file_dict["h"].split()
-            tex_path_dict = {key: font_path_dict[key] for key in href_num_list}
+            tex_path_dict = {key: self.get_outline(key) for key in href_num_list}
+        elif not consts.ENABLE_TEX_GENERATION:
+            raise OSError(consts.TEX_GENERATION_DISABLED_MSG)
         else:
             base_writer = TexFileBaseWriter(self.tex_string)
             svg_file = base_writer.svg_file
@@ -199,11 +353,52 @@ class TexFileWriter(Container):
         self.write_tex_file(tex_file_dict)
         return self
 
+    @staticmethod
+    def write_all(tex_writers):
+        """
+        The strings in the database are written inline, since those are
+        only lookups. The others are compiled in batches first, then
+        written (i.e. parsed, or compiled one by one, e.g. the strings of
+        a failed batch) in a JobScheduler. A string which fails is left
+        empty, see write_empty, and reported.
+        Return the failures of the scheduler.
+        """
+        missing_tex_writers = []
+        with profile_span("tex_lookup"):
+            for tex_writer in tex_writers:
+                tex_file_dict = tex_writer.get_file_dict_if_existed()
+                if tex_file_dict is None:
+                    missing_tex_writers.append(tex_writer)
+                else:
+                    tex_writer.write_tex_file(tex_file_dict)
+        if not missing_tex_writers:
+            return []
+        TexBatchWriter.write_missing_tex_files(missing_tex_writers)
+        scheduler = JobScheduler()
+        with profile_span("tex_generation"):
+            scheduler.map(TexFileWriter.write_directly, missing_tex_writers)
+        for tex_writer, error in scheduler.failures:
+            tex_writer.write_empty()
+        scheduler.print_report(lambda tex_writer: tex_writer.tex_string)
+        return scheduler.failures
+
+    def write_empty(self):
+        """
+        Used in place of a string which failed to compile, so that the
+        rest of the map can still be rendered.
+        """
+        self.tex_file_dict = TexFileWriter.tex_file_lists_to_dict([0, 0, 0, 0], [], [], [])
+        self.tex_path_dict = {}
+        return self
+
+    def is_empty(self):
+        return not self.tex_file_dict["h"]
+
 
 class Tex(TexFileWriter, Alignable, Group):
-    def __init__(self, string, font_type, additional_scale_factor, tex_dict_cache):
+    def __init__(self, string, font_type, additional_scale_factor, tex_registry):
         self.additional_scale_factor = additional_scale_factor
-        TexFileWriter.__init__(self, string, font_type, tex_dict_cache)
+        TexFileWriter.__init__(self, string, font_type, tex_registry)
         Alignable.__init__(self)
         Group.__init__(self, None)
         self.write_directly()
@@ -212,16 +407,15 @@ class Tex(TexFileWriter, Alignable, Group):
 
     def parse_dict(self):
         viewbox_list, href_num_list, x_list, y_list = TexFileWriter.tex_file_dict_to_lists(self.tex_file_dict)
-        tex_paths_cmd_dict = {}
+        tex_outlines_dict = {}
         tex_uses_list = []
         for path_id_num, x, y in zip(href_num_list, x_list, y_list):
             href_id_name = get_path_id_name(path_id_num, self.font_type)
-            path_string = self.tex_path_dict[path_id_num]
-            tex_paths_cmd_dict[href_id_name] = path_string
+            tex_outlines_dict[href_id_name] = self.tex_path_dict[path_id_num]
             relative_coord = np_float(x, y)
             tex_uses_list.append((href_id_name, relative_coord))
         self.viewbox_list = viewbox_list
-        self.tex_paths_cmd_dict = tex_paths_cmd_dict
+        self.tex_outlines_dict = tex_outlines_dict
         self.tex_uses_list = tex_uses_list
         return self
 
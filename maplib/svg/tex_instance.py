@@ -1,5 +1,3 @@
-import concurrent.futures as ft
-
 import maplib.constants as consts
 
 from maplib.svg.misc import NumberNameFrame
@@ -10,7 +8,6 @@ from maplib.svg.svg_element import Path
 from maplib.svg.tex import Tex
 from maplib.svg.tex import TexFileWriter
 from maplib.svg.tex import TexGroup
-from maplib.tools.json_file_tools import JsonTools
 from maplib.tools.numpy_type_tools import np_float
 from maplib.tools.simple_functions import remove_list_redundancies
 from maplib.tools.space_ops import get_simplified_direction
@@ -26,6 +23,8 @@ from maplib.utils.models import MetroName
 from maplib.utils.models import SimpleMetro
 from maplib.utils.models import Title
 from maplib.utils.params_getter import Container
+from maplib.utils.render_registry import get_registered_metro_objs
+from maplib.utils.render_registry import register_tex_objs
 
 
 class TexTemplate(Group):
@@ -89,14 +88,7 @@ class TexTemplate(Group):
         tex_group = TexGroup(self.body_group_id_name, partial_groups)
         return tex_group
 
-    @staticmethod
-    def construct_tex(string_and_cmd):
-        string, cmd = string_and_cmd
-        writer = TexFileWriter(string, cmd)
-        writer.write_directly()
-        return writer
-
-    def get_tex_obj_list(self, obj, tex_dict_cache):
+    def get_tex_obj_list(self, obj, tex_registry):
         tex_obj_list = []
         for language in self.sorted_languages:
             language_style = self.get_language_style(language)
@@ -104,7 +96,7 @@ class TexTemplate(Group):
                 obj.name_dict[language],
                 language_style["font_type"],
                 language_style["scale_factor"],
-                tex_dict_cache
+                tex_registry
             )
             if not self.same_color:
                 color = self.get_special_color(language, obj)
@@ -114,16 +106,7 @@ class TexTemplate(Group):
             tex_obj_list.append(tex_obj)
         return tex_obj_list
 
-    @staticmethod
-    def get_dict_from_tex_cache(tex_cache):
-        empty_dict = JsonTools.get_empty_font_type_dict()
-        tex_dict_cache = {
-            "file": empty_dict,
-            "path": empty_dict,
-        }
-        return JsonTools.generate_tex_in_json(tex_cache, tex_dict_cache)
-
-    def get_tex_dict_cache(self):
+    def get_tex_registry(self):
         string_and_cmd_list = []
         for language in self.sorted_languages:
             language_style = self.get_language_style(language)
@@ -133,19 +116,21 @@ class TexTemplate(Group):
                 string = tex_str_dict[language]
                 string_and_cmd_list.append((string, font_type))
         filtered_string_and_cmd_list = remove_list_redundancies(string_and_cmd_list)
-        with ft.ThreadPoolExecutor() as executor:
-            tex_cache = list(executor.map(TexTemplate.construct_tex, filtered_string_and_cmd_list))
-        tex_dict_cache = TexTemplate.get_dict_from_tex_cache(tex_cache)
-        return tex_dict_cache
+        tex_writers = [
+            TexFileWriter(string, cmd)
+            for string, cmd in filtered_string_and_cmd_list
+        ]
+        TexFileWriter.write_all(tex_writers)
+        return self.params.TEX_REGISTRY.with_overlay(tex_writers)
 
     def add_body_tex(self):
         tex_group = self.get_tex_group()
-        tex_dict_cache = self.get_tex_dict_cache()
+        tex_registry = self.get_tex_registry()
         box_format = self.tex_style["tex_box_format"]
         buff = self.tex_style["tex_buff"]
         tex_objs = []
         for obj in self.objs:
-            tex_obj_list = self.get_tex_obj_list(obj, tex_dict_cache)
+            tex_obj_list = self.get_tex_obj_list(obj, tex_registry)
             aligned_point, aligned_direction = self.get_aligning_information(obj)
             tex_box = Box(tex_obj_list, aligned_point, aligned_direction, buff, box_format)
             tex_group.append_tex_box(tex_box)
@@ -153,6 +138,7 @@ class TexTemplate(Group):
                 tex_objs.append(tex_obj)
         self.append(tex_group)
         self.tex_objs = tex_objs
+        register_tex_objs(tex_objs)
         return self
 
     def add_shadow_tex(self):
@@ -189,7 +175,7 @@ class AlignedTexTemplate(TexTemplate):
 class ListTexTemplate(TexTemplate):
     def add_body_tex(self):
         tex_group = self.get_tex_group()
-        tex_dict_cache = self.get_tex_dict_cache()
+        tex_registry = self.get_tex_registry()
         box_format = self.tex_style["tex_box_format"]
         buff = self.tex_style["tex_buff"]
         item_buff = self.tex_style["item_buff"]
@@ -201,14 +187,15 @@ class ListTexTemplate(TexTemplate):
             self.objs.reverse()
         tex_objs = []
         for obj in self.objs:
-            tex_obj_list = self.get_tex_obj_list(obj, tex_dict_cache)
+            tex_obj_list = self.get_tex_obj_list(obj, tex_registry)
             tex_box = Box(tex_obj_list, aligned_point, aligned_direction, buff, box_format)
             tex_group.append_tex_box(tex_box)
             for tex_obj in tex_obj_list:
                 tex_objs.append(tex_obj)
-            aligned_point -= (tex_box.box_size + item_buff * consts.RU) * aligned_direction
+            aligned_point = aligned_point - (tex_box.box_size + item_buff * consts.RU) * aligned_direction
         self.append(tex_group)
         self.tex_objs = tex_objs
+        register_tex_objs(tex_objs)
         return self
 
 
@@ -259,14 +246,14 @@ class SingleSignName(CenterAlignedTexTemplate):
 
     def add_body_tex(self):
         tex_group = self.get_tex_group()
-        tex_dict_cache = self.get_tex_dict_cache()
+        tex_registry = self.get_tex_registry()
         box_format = self.tex_style["tex_box_format"]
         buff = self.tex_style["tex_buff"]
         tex_objs = []
         tex_box_size_dict = {}
         for metro in self.metro_list:
             for obj in self.metro_name_list_dict[metro.layer_num]:
-                tex_obj_list = self.get_tex_obj_list(obj, tex_dict_cache)
+                tex_obj_list = self.get_tex_obj_list(obj, tex_registry)
                 aligned_point, aligned_direction = self.get_aligning_information(obj)
                 tex_box = Box(tex_obj_list, aligned_point, aligned_direction, buff, box_format)
                 tex_group.append_tex_box(tex_box)
@@ -275,6 +262,7 @@ class SingleSignName(CenterAlignedTexTemplate):
                     tex_objs.append(tex_obj)
         self.append(tex_group)
         self.tex_objs = tex_objs
+        register_tex_objs(tex_objs)
         self.tex_box_size_dict = tex_box_size_dict
         return self
 
@@ -442,13 +430,13 @@ class LinesGroup(Group, Alignable):
     def __init__(self, id_name):
         Group.__init__(self, id_name)
         self.init_template()
-        metro_data_list = self.params.INPUT_DATABASE_DICT["metro_database"]
-        simple_metro_list = []
-        for metro_dict in metro_data_list:
-            layer_num, metro_name_dict, main_color, sub_color, route_type, name_color, \
-                names_coord, stations_data = Constructor.get_metro_data(metro_dict)
-            simple_metro = SimpleMetro(layer_num, metro_name_dict, main_color, sub_color)
-            simple_metro_list.append(simple_metro)
+        metro_objs = get_registered_metro_objs()
+        if metro_objs is None:
+            metro_objs = Constructor().get_metro_objs_in_input_order()
+        simple_metro_list = [
+            SimpleMetro(metro.layer_num, metro.metro_name_dict, metro.main_color, metro.sub_color)
+            for metro in metro_objs
+        ]
         num_rows = self.params.LINES_STYLE["lines_per_column"]
         num_columns = len(simple_metro_list) // num_rows + 1
         mark_frames, tex_frames = self.get_table_frames(num_columns, num_rows, self.params.LINES_STYLE)
@@ -1,5 +1,7 @@
+from contextlib import contextmanager
 import json
 import os
+import tempfile
 
 import maplib.constants as consts
 
@@ -16,12 +18,46 @@ def get_relative_path(file_name):
     return os.path.relpath(file_name, consts.REPOSITORY_DIR)
 
 
+def load_dict(file_name):
+    with open(file_name, "r", encoding=consts.UTF_8) as input_file:
+        return json.load(input_file)
+
+
+@contextmanager
+def open_replacing_file(file_name, mode="wb", **kwargs):
+    """
+    Writes into a temporary file in the same folder, then renames it,
+    so that an interrupted run never leaves a broken file behind, and a
+    reader never sees a half written one.
+    """
+    file_dir, base_name = os.path.split(file_name)
+    file_descriptor, temp_file_name = tempfile.mkstemp(prefix=base_name, suffix=".tmp", dir=file_dir)
+    try:
+        with open(file_descriptor, mode, **kwargs) as output_file:
+            yield output_file
+        if os.path.exists(file_name):
+            os.chmod(temp_file_name, os.stat(file_name).st_mode & 0o777)
+        else:
+            os.chmod(temp_file_name, 0o644)
+        os.replace(temp_file_name, file_name)
+    except BaseException:
+        if os.path.exists(temp_file_name):
+            os.remove(temp_file_name)
+        raise
+
+
+def replace_file(file_name, file_bytes):
+    with open_replacing_file(file_name) as output_file:
+        output_file.write(file_bytes)
+
+
 def dump_dict(obj, file_name, indent=0, sort_keys=True):
     """
     Be careful that this function can cover json data.
+    The file is replaced atomically.
     """
-    with open(file_name, "w", encoding=consts.UTF_8) as output_file:
-        json.dump(obj, output_file, indent=indent, sort_keys=sort_keys, ensure_ascii=False)
+    json_str = json.dumps(obj, indent=indent, sort_keys=sort_keys, ensure_ascii=False)
+    replace_file(file_name, json_str.encode(consts.UTF_8))
 
 
 def copy_file(old_file_name, new_file_name):
@@ -0,0 +1,109 @@
+import re
+import struct
+
+import numpy as np
+
+import maplib.constants as consts
+
+from maplib.tools.profiler import add_count
+from maplib.tools.simple_functions import modify_num
+
+
+class GlyphOutline(object):
+    """
+    A path command string held as numbers:
+        opcodes: the command letters, one byte each (bytes)
+        coords: the values of all commands in order (float64 array)
+    The values are already passed through modify_num, so that writing
+    them back needs no parsing and no checking.
+    Binary layout (see to_bytes):
+        num_opcodes (I), num_coords (I), opcodes, coords (little-endian f8)
+    """
+    command_num_dict = {
+        "M": 2,  # moveto
+        "L": 2,  # lineto
+        "H": 1,  # horizontal lineto
+        "V": 1,  # vertical lineto
+        "C": 6,  # curveto
+        "S": 4,  # smooth curveto
+        "Q": 4,  # quadratic Bezier curve
+        "T": 2,  # smooth quadratic Bezier curveto
+        "A": 7,  # elliptical Arc
+        "Z": 0,  # closepath
+    }
+    command_pattern = re.compile("[{0}]".format("".join(command_num_dict.keys())))
+    header_struct = struct.Struct("<II")
+    coords_dtype = np.dtype("<f8")
+
+    def __init__(self, opcodes, coords):
+        self.opcodes = opcodes
+        self.coords = coords
+        self.path_string = None
+
+    @staticmethod
+    def from_path_string(path_string):
+        """
+        Parses and checks a path string, e.g. one written by dvisvgm.
+        """
+        commands = GlyphOutline.command_pattern.findall(path_string)
+        val_strs = GlyphOutline.command_pattern.split(path_string)[1:]
+        coords = []
+        last_command = None
+        for command, val_str in zip(commands, val_strs):
+            if command != "M" and (last_command is None or last_command == "Z"):
+                raise ValueError(path_string)
+            cmd_vals = [modify_num(float(val)) for val in val_str.split()]
+            if len(cmd_vals) != GlyphOutline.command_num_dict[command]:
+                raise ValueError(path_string)
+            coords.extend(cmd_vals)
+            last_command = command
+        return GlyphOutline(
+            "".join(commands).encode(consts.UTF_8),
+            np.array(coords, dtype=GlyphOutline.coords_dtype),
+        )
+
+    @staticmethod
+    def num_to_string(val):
+        """
+        Equals str(modify_num(val)) for a value which has been through
+        modify_num already.
+        """
+        if val.is_integer():
+            return str(int(val))
+        return repr(val)
+
+    def to_path_string(self):
+        """
+        Computed once, an outline is never modified.
+        """
+        if self.path_string is None:
+            self.path_string = self.get_path_string()
+        return self.path_string
+
+    def get_path_string(self):
+        command_num_dict = GlyphOutline.command_num_dict
+        val_strs = list(map(GlyphOutline.num_to_string, self.coords.tolist()))
+        if consts.ENABLE_PROFILER:
+            add_count("floats_formatted", len(val_strs))
+        partial_strs = []
+        begin_index = 0
+        for command in self.opcodes.decode(consts.UTF_8):
+            end_index = begin_index + command_num_dict[command]
+            partial_strs.append(command)
+            partial_strs.append(" ".join(val_strs[begin_index:end_index]))
+            begin_index = end_index
+        return "".join(partial_strs)
+
+    def to_bytes(self):
+        header = GlyphOutline.header_struct.pack(len(self.opcodes), len(self.coords))
+        return b"".join([header, self.opcodes, self.coords.astype(GlyphOutline.coords_dtype).tobytes()])
+
+    @staticmethod
+    def from_bytes(buffer):
+        num_opcodes, num_coords = GlyphOutline.header_struct.unpack_from(buffer, 0)
+        opcodes_offset = GlyphOutline.header_struct.size
+        coords_offset = opcodes_offset + num_opcodes
+        return GlyphOutline(
+            bytes(buffer[opcodes_offset:coords_offset]),
+            np.frombuffer(buffer, dtype=GlyphOutline.coords_dtype, count=num_coords, offset=coords_offset),
+        )
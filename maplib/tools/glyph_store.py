@@ -0,0 +1,242 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+import maplib.constants as consts
+
+from maplib.tools.file_tools import replace_file
+from maplib.tools.glyph_outline import GlyphOutline
+
+
+class GlyphStore(object):
+    """
+    A read-only binary image of tex.json, read through mmap.
+    Layout of the file:
+        header: magic (8s), source_hash (32s), num_records (I),
+            index_offset (I), where source_hash is the sha256 digest of
+            the tex.json the store was built from
+        data: key bytes and value bytes of all records
+        index: num_records entries of
+            (key_offset (I), key_len (I), val_offset (I), val_len (I)),
+            sorted by key bytes so that a lookup is a binary search.
+    A record is keyed by (record_type, font_type, key_string), where
+    record_type is "f" for a tex_file_dict (value: compact json) and "p"
+    for a path (value: the bytes of a GlyphOutline, so that paths are only
+    parsed and checked when the store is built).
+    Only the records which are looked up are decoded, and the binary
+    search reads its keys from the map.
+    """
+    magic = b"MMLTEX03"
+    header_struct = struct.Struct("<8s32sII")
+    index_struct = struct.Struct("<IIII")
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.input_file = open(file_name, "rb")
+        try:
+            self.buffer = mmap.mmap(self.input_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, source_hash, num_records, index_offset = GlyphStore.header_struct.unpack_from(self.buffer, 0)
+        except (ValueError, struct.error):
+            self.close()
+            raise ValueError(file_name)
+        index_end = index_offset + num_records * GlyphStore.index_struct.size
+        if magic != GlyphStore.magic or index_end != len(self.buffer):
+            self.close()
+            raise ValueError(file_name)
+        self.source_hash = source_hash
+        self.num_records = num_records
+        self.index_offset = index_offset
+
+    def close(self):
+        if hasattr(self, "buffer") and not self.buffer.closed:
+            self.buffer.close()
+        self.input_file.close()
+
+    @staticmethod
+    def get_key_bytes(record_type, font_type, key_string):
+        return "\0".join([record_type, font_type, key_string]).encode(consts.UTF_8)
+
+    def get_index_entry(self, index_num):
+        return GlyphStore.index_struct.unpack_from(
+            self.buffer, self.index_offset + index_num * GlyphStore.index_struct.size
+        )
+
+    def get_record_bytes(self, key_bytes):
+        low = 0
+        high = self.num_records
+        while low < high:
+            index_num = (low + high) // 2
+            key_offset, key_len, val_offset, val_len = self.get_index_entry(index_num)
+            index_key_bytes = self.buffer[key_offset:key_offset + key_len]
+            if index_key_bytes == key_bytes:
+                return self.buffer[val_offset:val_offset + val_len]
+            if index_key_bytes < key_bytes:
+                low = index_num + 1
+            else:
+                high = index_num
+        return None
+
+    def get_file_dict(self, font_type, string):
+        val_bytes = self.get_record_bytes(GlyphStore.get_key_bytes("f", font_type, string))
+        if val_bytes is None:
+            return None
+        return json.loads(val_bytes.decode(consts.UTF_8))
+
+    def get_outline(self, font_type, path_id_num):
+        val_bytes = self.get_record_bytes(GlyphStore.get_key_bytes("p", font_type, path_id_num))
+        if val_bytes is None:
+            return None
+        return GlyphOutline.from_bytes(val_bytes)
+
+    def get_path_string(self, font_type, path_id_num):
+        outline = self.get_outline(font_type, path_id_num)
+        if outline is None:
+            return None
+        return outline.to_path_string()
+
+    def iter_records(self):
+        for index_num in range(self.num_records):
+            key_offset, key_len, val_offset, val_len = self.get_index_entry(index_num)
+            key_bytes = self.buffer[key_offset:key_offset + key_len]
+            record_type, font_type, key_string = key_bytes.decode(consts.UTF_8).split("\0", 2)
+            val_bytes = self.buffer[val_offset:val_offset + val_len]
+            if record_type == "f":
+                val = json.loads(val_bytes.decode(consts.UTF_8))
+            else:
+                val = GlyphOutline.from_bytes(val_bytes).to_path_string()
+            yield record_type, font_type, key_string, val
+
+    def to_dict(self):
+        """
+        Rebuilds global_tex_dict in the schema of JsonTools.format_tex_json.
+        """
+        global_tex_dict = {
+            "file": {font_type: {} for font_type in consts.TEX_FONT_CMDS},
+            "path": {font_type: {} for font_type in consts.TEX_FONT_CMDS},
+        }
+        dict_keys = {"f": "file", "p": "path"}
+        for record_type, font_type, key_string, val in self.iter_records():
+            global_tex_dict[dict_keys[record_type]][font_type][key_string] = val
+        return global_tex_dict
+
+    @staticmethod
+    def get_records(global_tex_dict):
+        records = []
+        for font_type, font_file_dict in global_tex_dict["file"].items():
+            for string, tex_file_dict in font_file_dict.items():
+                val_str = json.dumps(
+                    tex_file_dict, separators=(",", ":"), sort_keys=True, ensure_ascii=False
+                )
+                records.append((GlyphStore.get_key_bytes("f", font_type, string), val_str.encode(consts.UTF_8)))
+        for font_type, font_path_dict in global_tex_dict["path"].items():
+            for path_id_num, path_string in font_path_dict.items():
+                val_bytes = GlyphOutline.from_path_string(path_string).to_bytes()
+                records.append((GlyphStore.get_key_bytes("p", font_type, path_id_num), val_bytes))
+        records.sort(key = lambda record: record[0])
+        return records
+
+    @staticmethod
+    def write(global_tex_dict, file_name, source_hash=bytes(32)):
+        """
+        Converts global_tex_dict (see JsonTools.format_tex_json) into a store file.
+        The file is replaced atomically.
+        """
+        records = GlyphStore.get_records(global_tex_dict)
+        data_parts = []
+        index_entries = []
+        offset = GlyphStore.header_struct.size
+        for key_bytes, val_bytes in records:
+            data_parts.append(key_bytes)
+            data_parts.append(val_bytes)
+            index_entries.append((offset, len(key_bytes), offset + len(key_bytes), len(val_bytes)))
+            offset += len(key_bytes) + len(val_bytes)
+        header = GlyphStore.header_struct.pack(GlyphStore.magic, source_hash, len(records), offset)
+        index_bytes = b"".join([
+            GlyphStore.index_struct.pack(*index_entry)
+            for index_entry in index_entries
+        ])
+        replace_file(file_name, b"".join([header, *data_parts, index_bytes]))
+
+    @staticmethod
+    def get_source_hash(json_file_name):
+        with open(json_file_name, "rb") as input_file:
+            return hashlib.sha256(input_file.read()).digest()
+
+    @staticmethod
+    def convert_json_file(json_file_name, file_name):
+        with open(json_file_name, "rb") as input_file:
+            json_bytes = input_file.read()
+        global_tex_dict = json.loads(json_bytes.decode(consts.UTF_8))
+        GlyphStore.write(global_tex_dict, file_name, hashlib.sha256(json_bytes).digest())
+
+    @staticmethod
+    def open_from_json_file(file_name, json_file_name):
+        """
+        The store is rebuilt from tex.json whenever it was built from
+        another tex.json (by the hash of its content, so that neither a
+        checkout nor a copy which keeps the times can leave it stale), or
+        the store was written in another format.
+        """
+        if os.path.exists(file_name):
+            try:
+                store = GlyphStore(file_name)
+            except ValueError:
+                store = None
+            if store is not None:
+                if store.source_hash == GlyphStore.get_source_hash(json_file_name):
+                    return store
+                store.close()
+        GlyphStore.convert_json_file(json_file_name, file_name)
+        return GlyphStore(file_name)
+
+
+class GlyphRegistry(object):
+    """
+    A read-only view of the glyphs of a project, shared by all tex objs.
+    Records are looked up in the overlay layers first (newest first),
+    then in the base store. Pending additions never touch an existing
+    registry, with_overlay returns a new registry on top of it instead.
+    The outlines read from a store are kept, so that every style rendered
+    with the registry gets the same outline objs (and their path strings).
+    """
+    def __init__(self, base, layer=None):
+        self.base = base
+        self.file_layer = {}
+        self.path_layer = {}
+        self.outline_dict = {}
+        if layer is not None:
+            self.file_layer, self.path_layer = layer
+
+    def get_file_dict(self, font_type, string):
+        key = (font_type, string)
+        if key in self.file_layer:
+            return self.file_layer[key]
+        return self.base.get_file_dict(font_type, string)
+
+    def get_outline(self, font_type, path_id_num):
+        key = (font_type, path_id_num)
+        if key in self.path_layer:
+            return self.path_layer[key]
+        if isinstance(self.base, GlyphRegistry):
+            return self.base.get_outline(font_type, path_id_num)
+        outline = self.outline_dict.get(key)
+        if outline is None:
+            outline = self.base.get_outline(font_type, path_id_num)
+            if outline is not None:
+                outline = self.outline_dict.setdefault(key, outline)
+        return outline
+
+    def with_overlay(self, tex_objs):
+        """
+        Every tex_obj should have been written, i.e. own tex_file_dict
+        and tex_path_dict.
+        """
+        file_layer = {}
+        path_layer = {}
+        for tex_obj in tex_objs:
+            file_layer[(tex_obj.font_type, tex_obj.string)] = tex_obj.tex_file_dict
+            for path_id_num, outline in tex_obj.tex_path_dict.items():
+                path_layer[(tex_obj.font_type, path_id_num)] = outline
+        return GlyphRegistry(self, (file_layer, path_layer))
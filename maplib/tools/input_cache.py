@@ -0,0 +1,85 @@
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+
+import maplib.constants as consts
+
+from maplib.tools.file_tools import replace_file
+
+
+class InputCache(object):
+    """
+    What Constructor resolves from input.json (apart from anything which
+    depends on the style), kept next to input.json in an npz file:
+        header: json (as uint8) of the fingerprint and of the strings and
+            small values of the network;
+        other arrays: the coords (control points, station centers) and
+            indexes, in binary.
+    The fingerprint is a hash of the source files (input.json and the
+    logos), the cache is only used if they are unchanged.
+    """
+    def __init__(self, file_name, source_file_names):
+        self.file_name = file_name
+        self.source_file_names = source_file_names
+
+    def get_fingerprint(self):
+        file_hash = hashlib.sha256(consts.INPUT_CACHE_VERSION.encode(consts.UTF_8))
+        for source_file_name in self.source_file_names:
+            file_hash.update(os.path.basename(source_file_name).encode(consts.UTF_8))
+            with open(source_file_name, "rb") as input_file:
+                file_hash.update(hashlib.sha256(input_file.read()).digest())
+        return file_hash.hexdigest()
+
+    def load(self, fingerprint):
+        """
+        Return (header, arrays), or None if the cache is missing, broken
+        or out of date.
+        """
+        if not os.path.exists(self.file_name):
+            return None
+        try:
+            with np.load(self.file_name, allow_pickle=False) as npz_file:
+                arrays = {key: npz_file[key] for key in npz_file.files}
+            header = json.loads(arrays.pop("header").tobytes().decode(consts.UTF_8))
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        if header.get("fingerprint") != fingerprint:
+            return None
+        return header, arrays
+
+    def dump(self, fingerprint, header, arrays):
+        header = dict(header, fingerprint=fingerprint)
+        header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode(consts.UTF_8)
+        output_buffer = io.BytesIO()
+        np.savez(output_buffer, header=np.frombuffer(header_bytes, dtype="uint8"), **arrays)
+        replace_file(self.file_name, output_buffer.getvalue())
+        return self
+
+    @staticmethod
+    def get_section_fingerprints(header, arrays):
+        """
+        A hash for each part of the network, which tells the components
+        depending on it whether it changed (see ComponentCache).
+        """
+        sections = {
+            "metros": ([header["metros"]], [arrays["control_points"], arrays["route_sizes"]]),
+            "stations": ([header["stations"]], [
+                arrays["station_centers"], arrays["station_sizes"], arrays["station_metro_indexes"]
+            ]),
+            "names": ([header["names"]], []),
+            "geography": ([header["geography"]], []),
+            "marks": ([header["marks"], header["logo_box_sizes"]], []),
+        }
+        section_fingerprints = {}
+        for section_name, (vals, section_arrays) in sections.items():
+            section_hash = hashlib.sha256(json.dumps(
+                vals, ensure_ascii=False, separators=(",", ":"), sort_keys=True
+            ).encode(consts.UTF_8))
+            for array in section_arrays:
+                section_hash.update(np.ascontiguousarray(array).tobytes())
+            section_fingerprints[section_name] = section_hash.hexdigest()
+        return section_fingerprints
@@ -0,0 +1,98 @@
+import concurrent.futures as ft
+import os
+import subprocess
+
+import maplib.constants as consts
+
+
+class CommandError(OSError):
+    """
+    Raised when an external command fails or times out. The captured
+    output of the last attempt is kept in the log attribute.
+    """
+    def __init__(self, commands, reason, log=""):
+        OSError.__init__(self, "{0}: {1}".format(commands[0], reason))
+        self.commands = commands
+        self.reason = reason
+        self.log = log
+
+
+def run_command(commands, timeout=consts.TEX_JOB_TIMEOUT, retries=consts.TEX_JOB_RETRIES):
+    """
+    Runs commands (a list, no shell involved) and captures its output.
+    A command which times out or cannot be started is tried again up to
+    retries times. A nonzero exit code is raised at once, since xelatex
+    fails the same way on every try for a bad string.
+    """
+    for attempt in range(retries + 1):
+        try:
+            completed = subprocess.run(
+                commands,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired as timeout_error:
+            error = CommandError(commands, "timed out after {0} s".format(timeout),
+                get_output_str(timeout_error.output))
+            continue
+        except FileNotFoundError:
+            raise CommandError(commands, "not found")
+        except OSError as os_error:
+            error = CommandError(commands, os_error)
+            continue
+        if completed.returncode == 0:
+            return get_output_str(completed.stdout)
+        raise CommandError(commands, "exit code {0}".format(completed.returncode),
+            get_output_str(completed.stdout))
+    raise error
+
+
+def get_output_str(output):
+    if output is None:
+        return ""
+    return output.decode(consts.UTF_8, errors="replace")
+
+
+class JobScheduler(object):
+    """
+    Runs jobs in a thread pool of at most max_workers threads (the number
+    of cpus by default). A job failing with one of error_types (OSError by
+    default, e.g. a failing command) is recorded in failures instead of
+    stopping the other jobs. Any other error is raised.
+    """
+    def __init__(self, max_workers=consts.TEX_MAX_WORKERS, error_types=(OSError,)):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.error_types = error_types
+        self.failures = []
+
+    def map(self, func, jobs):
+        """
+        Return the results in the order of jobs, None for a failed job.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        with ft.ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+            futures = [executor.submit(func, job) for job in jobs]
+            results = []
+            for job, future in zip(jobs, futures):
+                try:
+                    results.append(future.result())
+                except self.error_types as error:
+                    self.failures.append((job, error))
+                    results.append(None)
+        return results
+
+    def get_report(self, job_to_str=str):
+        return [
+            consts.JOB_FAILED_MSG.format(job_to_str(job), error)
+            for job, error in self.failures
+        ]
+
+    def print_report(self, job_to_str=str):
+        for line in self.get_report(job_to_str):
+            print(line)
@@ -1,13 +1,15 @@
 from functools import reduce
-import concurrent.futures as ft
 import operator as op
 
 import maplib.constants as consts
 
+from maplib.svg.tex import TexBatchWriter
 from maplib.svg.tex import TexFileWriter
 from maplib.tools.file_tools import copy_file
 from maplib.tools.file_tools import dump_dict
 from maplib.tools.file_tools import get_relative_path
+from maplib.tools.glyph_store import GlyphStore
+from maplib.tools.job_scheduler import JobScheduler
 from maplib.tools.simple_functions import remove_list_redundancies
 from maplib.tools.time_ops import timer_decorator
 from maplib.utils.constructor import Constructor
@@ -20,19 +22,56 @@ class JsonTools(Container):
         return {font_type: {} for font_type in consts.TEX_FONT_CMDS}
 
     def get_global_tex_dict(self):
-        return self.params.GLOBAL_TEX_DICT.copy()
+        """
+        A copy down to the font dicts, which callers modify in place, so
+        that the database shared by the contexts of the project is never
+        changed under them.
+        """
+        return {
+            dict_key: {
+                font_type: font_dict.copy()
+                for font_type, font_dict in font_type_dict.items()
+            }
+            for dict_key, font_type_dict in self.params.GLOBAL_TEX_DICT.items()
+        }
 
     def get_input_dict(self):
-        return self.params.INPUT_DATABASE_DICT.copy()
+        return self.params.INPUT_DATABASE_DICT
 
     def dump_tex_dict(self, global_tex_dict):
+        """
+        global_tex_dict already contains the journal (see
+        RenderContext.load_global_tex_dict), which is dropped afterwards.
+        """
         dump_dict(global_tex_dict, self.params.TEX_JSON_DIR)
+        self.params.reset_databases("GLOBAL_TEX_DICT", "TEX_STORE", "TEX_REGISTRY")
+        GlyphStore.write(
+            global_tex_dict, self.params.TEX_STORE_DIR, GlyphStore.get_source_hash(self.params.TEX_JSON_DIR)
+        )
+        self.params.get_tex_journal().remove()
+
+    def compact_tex_json(self):
+        """
+        Folds the journal of newly generated tex into tex.json.
+        """
+        tex_journal = self.params.get_tex_journal()
+        if not tex_journal.exists():
+            return
+        if consts.PRINT_FILE_MODIFYING_MSG:
+            print(consts.COMPACT_MSG.format(
+                get_relative_path(tex_journal.file_name),
+                get_relative_path(self.params.TEX_JSON_DIR)
+            ))
+        self.dump_tex_dict(self.get_global_tex_dict())
 
     @staticmethod
     def generate_tex_in_json(generated_tex_objs, global_tex_dict):
         for tex_obj in generated_tex_objs:
             global_tex_dict["file"][tex_obj.font_type][tex_obj.string] = tex_obj.tex_file_dict
-            global_tex_dict["path"][tex_obj.font_type].update(tex_obj.tex_path_dict)
+            global_tex_dict["path"][tex_obj.font_type].update({
+                path_id_num: outline.to_path_string()
+                for path_id_num, outline in tex_obj.tex_path_dict.items()
+            })
         return global_tex_dict
 
     @staticmethod
@@ -57,13 +96,31 @@ class JsonTools(Container):
                 global_tex_dict["path"][tex_obj.font_type].pop(path_num)
         return global_tex_dict
 
-    def update_generated_tex_in_json(self, global_tex_objs):
-        generated_tex_objs = remove_list_redundancies(global_tex_objs)
-        global_tex_dict = self.get_global_tex_dict()
-        new_global_tex_dict = JsonTools.generate_tex_in_json(
-            generated_tex_objs, global_tex_dict
-        )
-        self.dump_tex_dict(new_global_tex_dict)
+    def update_generated_tex_in_json(self, global_tex_objs, compact_size=None):
+        """
+        Only tex which is not stored yet is appended to the journal, so
+        that a render which generates nothing writes nothing.
+        Empty tex objs, which stand in for failed strings, are not stored.
+        The journal is compacted once it grows beyond compact_size
+        (TEX_JOURNAL_COMPACT_SIZE by default), never if it is inf.
+        Return the tex objs appended.
+        """
+        tex_registry = self.params.TEX_REGISTRY
+        generated_tex_objs = remove_list_redundancies([
+            tex_obj for tex_obj in global_tex_objs
+            if not tex_obj.is_empty()
+            and tex_registry.get_file_dict(tex_obj.font_type, tex_obj.string) is None
+        ])
+        if not generated_tex_objs:
+            return generated_tex_objs
+        tex_journal = self.params.get_tex_journal()
+        tex_journal.append(generated_tex_objs)
+        self.params.reset_databases("GLOBAL_TEX_DICT", "TEX_REGISTRY")
+        if compact_size is None:
+            compact_size = consts.TEX_JOURNAL_COMPACT_SIZE
+        if tex_journal.get_size() > compact_size:
+            self.compact_tex_json()
+        return generated_tex_objs
 
     @timer_decorator()
     def format_tex_json(self):
@@ -160,20 +217,22 @@ class JsonTools(Container):
             ).
         Judge whether generate or remove based on current json files.
         Generating goes first, then removing.
+        Strings which fail to compile are skipped, return the report of them.
         """
         if not string_tuples:
-            return
+            return []
         generated_tex_objs, removed_tex_objs = JsonTools.string_tuples_to_tex_objs(string_tuples)
         global_tex_dict = self.get_global_tex_dict()
         if consts.PRINT_FILE_MODIFYING_MSG and generated_tex_objs:
             print(consts.TEX_GENERATE_MEG)
-        with ft.ThreadPoolExecutor() as executor:
-            filtered_generated_tex_objs = [
-                tex_obj for tex_obj in executor.map(
-                    lambda tex_obj: self.get_single_tex(tex_obj, True),
-                    generated_tex_objs
-                ) if tex_obj is not None
-            ]
+        TexBatchWriter.write_missing_tex_files(generated_tex_objs)
+        scheduler = JobScheduler()
+        filtered_generated_tex_objs = [
+            tex_obj for tex_obj in scheduler.map(
+                lambda tex_obj: self.get_single_tex(tex_obj, True),
+                generated_tex_objs
+            ) if tex_obj is not None
+        ]
         global_tex_dict = JsonTools.generate_tex_in_json(
             filtered_generated_tex_objs, global_tex_dict
         )
@@ -189,6 +248,10 @@ class JsonTools(Container):
             filtered_removed_tex_objs, global_tex_dict
         )
         self.dump_tex_dict(global_tex_dict)
+        report = scheduler.get_report(lambda tex_obj: tex_obj.tex_string)
+        for line in report:
+            print(line)
+        return report
 
     @staticmethod
     def string_tuples_to_tex_objs(string_tuples):
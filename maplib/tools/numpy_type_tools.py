@@ -1,5 +1,9 @@
 import numpy as np
 
+import maplib.constants as consts
+
+from maplib.tools.simple_functions import modify_num
+
 
 def np_float(x, y):
     """
@@ -13,5 +17,33 @@ def np_to_tuple(np_data):
     Converts half-integers to a tuple with integers.
     0.5 -> 1; -0.5 -> -1
     """
+    return tuple(np_to_int_coords(np_data))
+
+
+def np_to_int_coords(np_data):
+    """
+    np_to_tuple for an array of any shape, returned as an int64 array.
+    """
     result = np.where(np_data >= 0, np.rint(np_data + 0.1), np.rint(np_data - 0.1))
-    return tuple(result.astype("int64"))
+    return result.astype("int64")
+
+
+def np_to_tuples(np_data):
+    """
+    np_to_tuple for each point of an array of shape (N, 2).
+    """
+    return [tuple(key) for key in np_to_int_coords(np_data).tolist()]
+
+
+def np_modify_nums(vals):
+    """
+    modify_num for each value of a float array, returned as a list, where
+    NAN becomes None.
+    """
+    rounded_vals = np.rint(vals)
+    int_mask = np.abs(rounded_vals - vals) < consts.TOLERANCE
+    result = np.where(int_mask, rounded_vals, 0).astype("int64").tolist()
+    for k in np.flatnonzero(~int_mask).tolist():
+        val = vals[k]
+        result[k] = None if np.isnan(val) else modify_num(val)
+    return result
@@ -0,0 +1,178 @@
+from contextlib import contextmanager
+from contextlib import nullcontext
+import json
+import os
+import threading
+import time
+
+import maplib.constants as consts
+
+from maplib.tools.file_tools import get_relative_path
+from maplib.tools.file_tools import replace_file
+
+
+class Profiler(object):
+    """
+    Records the spans and the counters of everything run (in the current
+    thread) while it is active:
+        spans: named blocks timed with perf_counter_ns, nested spans are
+            kept under the path of the spans around them;
+        counters: totals added with add_count.
+    Nothing is recorded unless consts.ENABLE_PROFILER is set, and every
+    probe then only costs a check of that flag.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.begin_ns = time.perf_counter_ns()
+        self.end_ns = None
+        self.span_events = []
+        self.counter_dict = {}
+
+    @contextmanager
+    def activate(self):
+        profiler_stack = get_profiler_stack()
+        profiler_stack.append(self)
+        try:
+            yield self
+        finally:
+            profiler_stack.pop()
+            self.end_ns = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name):
+        span_stack = get_span_stack()
+        span_stack.append(name)
+        path = "/".join(span_stack)
+        begin_ns = time.perf_counter_ns()
+        try:
+            yield self
+        finally:
+            end_ns = time.perf_counter_ns()
+            span_stack.pop()
+            with self.lock:
+                self.span_events.append((name, path, threading.get_ident(), begin_ns, end_ns - begin_ns))
+
+    def add_count(self, key, val=1):
+        with self.lock:
+            self.counter_dict[key] = self.counter_dict.get(key, 0) + val
+        return self
+
+    def get_wall_ns(self):
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return end_ns - self.begin_ns
+
+    def get_span_dicts(self):
+        """
+        Totals by span path, in the order the spans were entered. The self
+        time of a span excludes the time of the spans nested in it.
+        """
+        span_dict = {}
+        for name, path, thread_id, begin_ns, duration_ns in sorted(self.span_events, key=lambda event: event[3]):
+            if path not in span_dict:
+                span_dict[path] = {"path": path, "name": name, "calls": 0, "total_ns": 0, "self_ns": 0}
+            span_dict[path]["calls"] += 1
+            span_dict[path]["total_ns"] += duration_ns
+            span_dict[path]["self_ns"] += duration_ns
+        for path, path_dict in span_dict.items():
+            parent_path = path.rpartition("/")[0]
+            if parent_path in span_dict:
+                span_dict[parent_path]["self_ns"] -= path_dict["total_ns"]
+        return [
+            {
+                "path": path_dict["path"],
+                "name": path_dict["name"],
+                "calls": path_dict["calls"],
+                "total_ms": path_dict["total_ns"] / 1e6,
+                "self_ms": path_dict["self_ns"] / 1e6,
+            }
+            for path_dict in span_dict.values()
+        ]
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "wall_ms": self.get_wall_ns() / 1e6,
+                "spans": self.get_span_dicts(),
+                "counters": dict(sorted(self.counter_dict.items())),
+            }
+
+    def to_trace_dict(self):
+        """
+        The Chrome trace-event format, which chrome://tracing and Perfetto
+        open: a complete event for every span, and the counters at the end.
+        """
+        pid = os.getpid()
+        with self.lock:
+            trace_events = [
+                {
+                    "name": name,
+                    "cat": "maplib",
+                    "ph": "X",
+                    "ts": (begin_ns - self.begin_ns) / 1e3,
+                    "dur": duration_ns / 1e3,
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"path": path},
+                }
+                for name, path, thread_id, begin_ns, duration_ns in self.span_events
+            ]
+            trace_events.append({
+                "name": "counters",
+                "cat": "maplib",
+                "ph": "C",
+                "ts": self.get_wall_ns() / 1e3,
+                "pid": pid,
+                "args": dict(sorted(self.counter_dict.items())),
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def dump(self, report_file_name, trace_file_name):
+        for file_name, obj in ((report_file_name, self.to_dict()), (trace_file_name, self.to_trace_dict())):
+            replace_file(file_name, json.dumps(obj, ensure_ascii=False, indent=1).encode(consts.UTF_8))
+            if consts.PRINT_FILE_READY_MSG:
+                print(consts.FILE_READY_MSG.format(get_relative_path(file_name)))
+        return self
+
+
+_local_data = threading.local()
+_null_span = nullcontext()
+
+
+def get_profiler_stack():
+    if not hasattr(_local_data, "profiler_stack"):
+        _local_data.profiler_stack = []
+    return _local_data.profiler_stack
+
+
+def get_span_stack():
+    if not hasattr(_local_data, "span_stack"):
+        _local_data.span_stack = []
+    return _local_data.span_stack
+
+
+def get_active_profiler():
+    """
+    Return None if profiling is off or no profiler is active.
+    """
+    if not consts.ENABLE_PROFILER:
+        return None
+    profiler_stack = get_profiler_stack()
+    if profiler_stack:
+        return profiler_stack[-1]
+    return None
+
+
+def profile_span(name):
+    profiler = get_active_profiler()
+    if profiler is None:
+        return _null_span
+    return profiler.span(name)
+
+
+def add_count(key, val=1):
+    """
+    Callers in hot paths check consts.ENABLE_PROFILER first.
+    """
+    profiler = get_active_profiler()
+    if profiler is not None:
+        profiler.add_count(key, val)
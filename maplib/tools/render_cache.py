@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+
+import maplib.constants as consts
+
+from maplib.tools.file_tools import dump_dict
+from maplib.tools.file_tools import get_relative_path
+
+
+class RenderCache(object):
+    """
+    What is known of the last render of an output svg, kept in a json file
+    next to it:
+        fingerprint: a hash of everything the render depends on, i.e. the
+            source files (input.json, the style file, the logos, tex.json
+            and its journal), the code of maplib and the constants which
+            may be set at runtime and change the output;
+        output_hash, output_size: of the svg as it was written.
+    The render may be skipped if the fingerprint is unchanged and the svg
+    on disk is still the one written.
+    """
+    runtime_const_names = ("ENABLE_TEX_GENERATION", "FADED_METRO_RATIO", "DECIMAL_DIGITS", "TOLERANCE")
+
+    def __init__(self, file_name, output_file_name, source_file_names):
+        self.file_name = file_name
+        self.output_file_name = output_file_name
+        self.source_file_names = source_file_names
+
+    @staticmethod
+    def get_code_file_names():
+        """
+        The python files of maplib, apart from the style files of the
+        projects, which are source files of their own renders.
+        """
+        code_file_names = []
+        for dir_path, dir_names, file_names in os.walk(consts.THIS_DIR):
+            dir_names[:] = sorted([
+                dir_name for dir_name in dir_names
+                if os.path.join(dir_path, dir_name) != consts.FILE_DIR and dir_name != "__pycache__"
+            ])
+            code_file_names.extend([
+                os.path.join(dir_path, file_name)
+                for file_name in sorted(file_names)
+                if file_name.endswith(".py")
+            ])
+        return code_file_names
+
+    @staticmethod
+    def get_file_hash(file_name):
+        """
+        None if the file does not exist, e.g. a tex journal not written yet.
+        """
+        if not os.path.exists(file_name):
+            return None
+        with open(file_name, "rb") as input_file:
+            return hashlib.sha256(input_file.read()).hexdigest()
+
+    def get_fingerprint(self):
+        file_hash = hashlib.sha256(consts.RENDER_CACHE_VERSION.encode(consts.UTF_8))
+        for const_name in RenderCache.runtime_const_names:
+            file_hash.update("{0}={1!r}".format(const_name, getattr(consts, const_name)).encode(consts.UTF_8))
+        for source_file_name in [*self.source_file_names, *RenderCache.get_code_file_names()]:
+            file_hash.update(get_relative_path(source_file_name).encode(consts.UTF_8))
+            file_hash.update(str(RenderCache.get_file_hash(source_file_name)).encode(consts.UTF_8))
+        return file_hash.hexdigest()
+
+    def load(self, fingerprint):
+        """
+        Return the cache dict if the output svg is up to date, else None.
+        """
+        if not os.path.exists(self.file_name):
+            return None
+        try:
+            with open(self.file_name, "r", encoding=consts.UTF_8) as input_file:
+                cache_dict = json.load(input_file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cache_dict, dict) or cache_dict.get("fingerprint") != fingerprint:
+            return None
+        if not os.path.exists(self.output_file_name) \
+                or os.path.getsize(self.output_file_name) != cache_dict.get("output_size") \
+                or RenderCache.get_file_hash(self.output_file_name) != cache_dict.get("output_hash"):
+            return None
+        return cache_dict
+
+    def dump(self, fingerprint):
+        dump_dict({
+            "fingerprint": fingerprint,
+            "output_hash": RenderCache.get_file_hash(self.output_file_name),
+            "output_size": os.path.getsize(self.output_file_name),
+        }, self.file_name, indent=1)
+        return self
@@ -1,5 +1,7 @@
 import maplib.constants as consts
 
+from maplib.tools.profiler import add_count
+
 
 def remove_list_redundancies(list_obj, equal_func=None):
     """
@@ -67,6 +69,8 @@ def modify_num(num):
 
 
 def nums_to_string(nums, separator=" "):
+    if consts.ENABLE_PROFILER:
+        add_count("floats_formatted", len(nums))
     return separator.join([str(modify_num(val)) for val in nums])
 
 
@@ -74,6 +78,17 @@ def string_to_nums(string):
     return [modify_num(float(val_str)) for val_str in string.split()]
 
 
+def format_table(headers, rows):
+    str_rows = [[str(val) for val in row] for row in [headers, *rows]]
+    widths = [max([len(row[k]) for row in str_rows]) for k in range(len(headers))]
+    lines = [
+        "  ".join([s.rjust(width) for s, width in zip(row, widths)])
+        for row in str_rows
+    ]
+    lines.insert(1, "  ".join(["-" * width for width in widths]))
+    return "\n".join(lines)
+
+
 def get_path_id_num_str(path_id_name):
     return path_id_name[(path_id_name.index("-") + 1):]
 
@@ -25,6 +25,20 @@ def arg(point):
     return argument
 
 
+def get_args(vectors):
+    """
+    Vectorized arg of an (N, 2) array, computed the same way as arg.
+    """
+    x = vectors[:, 0]
+    y = vectors[:, 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        arguments = np.arctan(y / x)
+    arguments = np.where(x < 0, np.where(y > 0, arguments + consts.PI, arguments - consts.PI), arguments)
+    axis_arguments = np.where(y > 0, consts.PI / 2, -consts.PI / 2)
+    axis_arguments = np.where(y == 0, consts.NAN, axis_arguments)
+    return np.where(x == 0, axis_arguments, arguments)
+
+
 def arg_principle(argument):
     """
     Return a value in [-PI, PI).
@@ -97,10 +111,80 @@ def solve_intersection_point(point1, theta1, point2, theta2):
     return consts.NAN
 
 
+def solve_line_intersection_points(points1, directions1, points2, directions2):
+    """
+    Vectorized solve_intersection_point for lines in simplified directions
+    (angles of multiples of PI / 4), given as (N, 2) points and (N,) ints.
+    The direction vectors are integers, so nothing is lost to sin and cos.
+    Return (intersection_points, parallel_mask, coincident_mask), where
+    the intersection points of parallel lines are NAN.
+    """
+    vectors1 = consts.LINE_DIRECTION_VECTORS[np.mod(directions1, 4)]
+    vectors2 = consts.LINE_DIRECTION_VECTORS[np.mod(directions2, 4)]
+    distance_vecs = points2 - points1
+    cross_vals = vectors1[:, 0] * vectors2[:, 1] - vectors1[:, 1] * vectors2[:, 0]
+    parallel_mask = cross_vals == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        params = (distance_vecs[:, 0] * vectors2[:, 1] - distance_vecs[:, 1] * vectors2[:, 0]) / cross_vals
+        intersection_points = points1 + params[:, None] * vectors1
+    intersection_points[parallel_mask] = consts.NAN
+    coincident_mask = parallel_mask & (
+        distance_vecs[:, 0] * vectors1[:, 1] - distance_vecs[:, 1] * vectors1[:, 0] == 0
+    )
+    return intersection_points, parallel_mask, coincident_mask
+
+
+def get_bypass_directions(points1, points2, directions):
+    """
+    For parallel lines through points1 and points2 in directions, return
+    the direction of a line through their midpoint which crosses both, in
+    the way of Metro.append_new_point.
+    """
+    rotation_matrices = consts.LINE_INVERSE_ROTATION_MATRICES[np.mod(directions, 4)]
+    rotated_vecs = np.einsum("nij,nj->ni", rotation_matrices, points2 - points1)
+    h = rotated_vecs[:, 0]
+    v = rotated_vecs[:, 1]
+    h, v = np.where(v < 0, -h, h), np.abs(v)
+    append_directions = np.where(h > v, 1, np.where(h < -v, 3, 2))
+    return np.mod(directions + append_directions, 4)
+
+
 def center_of_mass(points_list):
     return np.mean(np.array(points_list), axis=0)
 
 
+def group_adjacent_coords(coord_tuples):
+    """
+    Split integer coords into groups connected by unit steps (in the four
+    base directions), with a union-find over a dict of the coords.
+    Return the groups as lists of indexes into coord_tuples, ordered by
+    their first index.
+    """
+    index_dict = {
+        (int(x), int(y)): k
+        for k, (x, y) in enumerate(coord_tuples)
+    }
+    parents = list(range(len(coord_tuples)))
+
+    def find(k):
+        while parents[k] != k:
+            parents[k] = parents[parents[k]]
+            k = parents[k]
+        return k
+
+    for (x, y), k in index_dict.items():
+        for adjacent_coord in ((x + 1, y), (x, y + 1)):
+            adjacent_index = index_dict.get(adjacent_coord)
+            if adjacent_index is not None:
+                root1, root2 = find(k), find(adjacent_index)
+                if root1 != root2:
+                    parents[max(root1, root2)] = min(root1, root2)
+    groups_dict = {}
+    for k in range(len(coord_tuples)):
+        groups_dict.setdefault(find(k), []).append(k)
+    return list(groups_dict.values())
+
+
 def midpoint(a, b):
     return center_of_mass([a, b])
 
@@ -111,6 +195,25 @@ def get_angle(a, b, c):
     return arg_principle(arg_end - arg_begin)
 
 
+def get_corner_arcs(a, b, c, arc_radius):
+    """
+    For corners b (between neighbours a and c, all (N, 2) arrays) rounded
+    by arcs of arc_radius, return (before_arc_points, after_arc_points,
+    sweep_flags): the points where the arcs begin and end, and 0 for a
+    counter-clockwise turn, 1 otherwise.
+    Every step is the one of get_angle and abs_arg_pair applied to all
+    corners at once, so the results are the same.
+    """
+    arg_begin = get_args(a - b)
+    arg_end = get_args(c - b)
+    thetas = np.mod(arg_end - arg_begin + consts.PI, 2 * consts.PI) - consts.PI
+    sweep_flags = np.where(thetas >= 0, 0, 1)
+    cut_off_lengths = (arc_radius / np.tan(np.abs(thetas) / 2))[:, None]
+    before_arc_points = b + np.stack([np.cos(arg_begin), np.sin(arg_begin)], axis=1) * cut_off_lengths
+    after_arc_points = b + np.stack([np.cos(arg_end), np.sin(arg_end)], axis=1) * cut_off_lengths
+    return before_arc_points, after_arc_points, sweep_flags
+
+
 def restore_angle(simplified_angle):
     """
     In simplified angle units, PI is equivalent to 4.
@@ -0,0 +1,100 @@
+from xml.etree import ElementTree
+import re
+
+import maplib.constants as consts
+
+
+NUM_PATTERN = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def split_nums(string):
+    """
+    Return (the parts between the numbers, the numbers).
+    """
+    return NUM_PATTERN.split(string), [float(num_str) for num_str in NUM_PATTERN.findall(string)]
+
+
+def get_val_difference(val, golden_val, tolerance):
+    """
+    Values are equal if they only differ in numbers, by at most tolerance
+    each, e.g. "M1 -0.0" and "M1.00001 0". Return None if they are equal,
+    or a description of the first difference.
+    """
+    if val == golden_val:
+        return None
+    texts, nums = split_nums(val)
+    golden_texts, golden_nums = split_nums(golden_val)
+    if texts != golden_texts:
+        return "'{0}' != '{1}'".format(shorten(val), shorten(golden_val))
+    for num_index, (num, golden_num) in enumerate(zip(nums, golden_nums)):
+        if abs(num - golden_num) > tolerance:
+            return "number {0}: {1} != {2}".format(num_index, num, golden_num)
+    return None
+
+
+def shorten(string, max_length=80):
+    if len(string) <= max_length:
+        return string
+    return string[:max_length] + "..."
+
+
+def get_tag_name(element):
+    return element.tag.rpartition("}")[2]
+
+
+def get_element_names(elements):
+    """
+    An element is named by its id if it has one, or else by its position
+    among its siblings of the same tag.
+    """
+    names = []
+    tag_counts = {}
+    for element in elements:
+        tag_name = get_tag_name(element)
+        tag_counts[tag_name] = tag_counts.get(tag_name, 0) + 1
+        if "id" in element.attrib:
+            names.append("{0}#{1}".format(tag_name, element.attrib["id"]))
+        else:
+            names.append("{0}[{1}]".format(tag_name, tag_counts[tag_name]))
+    return names
+
+
+def compare_elements(element, golden_element, element_path, tolerance):
+    """
+    Return (path of the element, description) of the first difference in
+    document order, or None. Attributes are compared regardless of their
+    order, the children in their order.
+    """
+    if element.tag != golden_element.tag:
+        return element_path, "tag {0} != {1}".format(get_tag_name(element), get_tag_name(golden_element))
+    keys = set(element.attrib)
+    golden_keys = set(golden_element.attrib)
+    if keys != golden_keys:
+        return element_path, "attributes, extra {0}, missing {1}".format(
+            sorted(keys - golden_keys), sorted(golden_keys - keys)
+        )
+    for key in sorted(keys):
+        difference = get_val_difference(element.attrib[key], golden_element.attrib[key], tolerance)
+        if difference is not None:
+            return element_path, "attribute {0}, {1}".format(key, difference)
+    difference = get_val_difference((element.text or "").strip(), (golden_element.text or "").strip(), tolerance)
+    if difference is not None:
+        return element_path, "text, {0}".format(difference)
+    children = list(element)
+    golden_children = list(golden_element)
+    for child, golden_child, child_name in zip(children, golden_children, get_element_names(children)):
+        result = compare_elements(child, golden_child, element_path + "/" + child_name, tolerance)
+        if result is not None:
+            return result
+    if len(children) != len(golden_children):
+        return element_path, "{0} children != {1}".format(len(children), len(golden_children))
+    return None
+
+
+def compare_svg_bytes(svg_bytes, golden_svg_bytes, tolerance=consts.GOLDEN_TOLERANCE):
+    """
+    A canonical comparison of two svg documents, see compare_elements.
+    """
+    root = ElementTree.fromstring(svg_bytes)
+    golden_root = ElementTree.fromstring(golden_svg_bytes)
+    return compare_elements(root, golden_root, "/" + get_tag_name(golden_root), tolerance)
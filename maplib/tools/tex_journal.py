@@ -0,0 +1,91 @@
+import json
+import os
+
+import maplib.constants as consts
+
+from maplib.tools.glyph_outline import GlyphOutline
+
+
+class TexJournal(object):
+    """
+    Glyphs generated since tex.json was last written, one json object per
+    line, appended to a file next to tex.json:
+        {"t": font_type, "s": string, "f": tex_file_dict, "p": tex_path_dict}
+    where the paths of tex_path_dict are written as path strings.
+    A line cut off by an interrupted run cannot be decoded and is skipped,
+    every complete line before it stays valid.
+    The journal is folded into tex.json by JsonTools.compact_tex_json.
+    """
+    def __init__(self, file_name):
+        self.file_name = file_name
+
+    def exists(self):
+        return os.path.exists(self.file_name)
+
+    def get_size(self):
+        if not self.exists():
+            return 0
+        return os.path.getsize(self.file_name)
+
+    @staticmethod
+    def get_entry_str(tex_obj):
+        return json.dumps({
+            "t": tex_obj.font_type,
+            "s": tex_obj.string,
+            "f": tex_obj.tex_file_dict,
+            "p": {
+                path_id_num: outline.to_path_string()
+                for path_id_num, outline in tex_obj.tex_path_dict.items()
+            },
+        }, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+
+    def append(self, tex_objs):
+        entry_bytes = "".join([
+            TexJournal.get_entry_str(tex_obj) + "\n"
+            for tex_obj in tex_objs
+        ]).encode(consts.UTF_8)
+        if not entry_bytes:
+            return self
+        with open(self.file_name, "ab+") as output_file:
+            if output_file.tell() > 0:
+                output_file.seek(-1, os.SEEK_END)
+                if output_file.read(1) != b"\n":
+                    entry_bytes = b"\n" + entry_bytes
+            output_file.write(entry_bytes)
+            output_file.flush()
+            os.fsync(output_file.fileno())
+        return self
+
+    def iter_entries(self):
+        if not self.exists():
+            return
+        with open(self.file_name, "rb") as input_file:
+            for line in input_file:
+                try:
+                    entry = json.loads(line.decode(consts.UTF_8))
+                except ValueError:
+                    continue
+                yield entry["t"], entry["s"], entry["f"], entry["p"]
+
+    def get_layer(self):
+        """
+        Return (file_layer, path_layer) in the format of GlyphRegistry.
+        """
+        file_layer = {}
+        path_layer = {}
+        for font_type, string, tex_file_dict, tex_path_dict in self.iter_entries():
+            file_layer[(font_type, string)] = tex_file_dict
+            for path_id_num, path_string in tex_path_dict.items():
+                path_layer[(font_type, path_id_num)] = GlyphOutline.from_path_string(path_string)
+        return file_layer, path_layer
+
+    def apply(self, global_tex_dict):
+        for font_type, string, tex_file_dict, tex_path_dict in self.iter_entries():
+            global_tex_dict["file"][font_type][string] = tex_file_dict
+            global_tex_dict["path"][font_type].update(tex_path_dict)
+        return global_tex_dict
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.file_name)
+        return self
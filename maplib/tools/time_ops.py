@@ -2,6 +2,8 @@ import time
 
 import maplib.constants as consts
 
+from maplib.tools.profiler import profile_span
+
 
 def timer_decorator(decorator_func=None):
     def decorator(func):
@@ -16,9 +18,10 @@ def timer_decorator(decorator_func=None):
                     decorator_func.__name__
                 ])
                 new_func = decorator_func(func)
-            begin = time.time()
-            result = new_func(*args, **kwargs)
-            end = time.time()
+            begin = time.perf_counter()
+            with profile_span(func.__name__):
+                result = new_func(*args, **kwargs)
+            end = time.perf_counter()
             if consts.PRINT_TIMER_MSG:
                 print(consts.TIMER_MSG.format(func_name, end - begin))
             return result
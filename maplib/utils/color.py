@@ -7,6 +7,15 @@ class Color(object):
     def __eq__(self, obj):
         return isinstance(obj, Color) and self.rgb == obj.rgb
 
+    def blend(self, color, ratio):
+        """
+        Moves ratio of the way towards color.
+        """
+        return Color(*[
+            int(round(val * (1 - ratio) + other_val * ratio))
+            for val, other_val in zip(self.rgb, color.rgb)
+        ])
+
     def xml_str(self):
         rgb_str = [str(val) for val in self.rgb]
         return "rgb({0})".format(",".join(rgb_str))
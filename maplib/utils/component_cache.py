@@ -0,0 +1,35 @@
+from maplib.utils.render_registry import RenderRegistry
+from maplib.utils.render_registry import register_tex_objs
+
+
+class ComponentCache(object):
+    """
+    Keeps the components built by the last render of a style (see watch
+    mode), so that the next render only rebuilds the components whose
+    inputs changed. Every entry is keyed by the id name of its component
+    and holds (fingerprint of the inputs, component, tex objs it
+    registered). A reused component registers its tex objs again.
+    """
+    def __init__(self):
+        self.entry_dict = {}
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def get_component(self, id_name, fingerprint, component_func):
+        entry = self.entry_dict.get(id_name)
+        if entry is not None and entry[0] == fingerprint:
+            self.num_hits += 1
+            fingerprint, component, tex_objs = entry
+            register_tex_objs(tex_objs)
+            return component
+        self.num_misses += 1
+        registry = RenderRegistry()
+        with registry.activate():
+            component = component_func()
+        register_tex_objs(registry.tex_objs)
+        self.entry_dict[id_name] = (fingerprint, component, registry.tex_objs)
+        return component
+
+    def clear(self):
+        self.entry_dict.clear()
+        return self
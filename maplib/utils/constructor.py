@@ -1,9 +1,16 @@
+import numpy as np
+
 import maplib.constants as consts
 
+from maplib.tools.input_cache import InputCache
+from maplib.tools.numpy_type_tools import np_float
+from maplib.tools.numpy_type_tools import np_modify_nums
+from maplib.tools.profiler import profile_span
 from maplib.tools.simple_functions import get_first_item
 from maplib.tools.simple_functions import modify_num
 from maplib.tools.simple_functions import string_to_nums
 from maplib.tools.space_ops import center_of_mass
+from maplib.tools.space_ops import group_adjacent_coords
 from maplib.utils.alignable import SvgFrame
 from maplib.utils.color import Color
 from maplib.utils.models import Mark
@@ -11,19 +18,217 @@ from maplib.utils.models import Metro
 from maplib.utils.models import Name
 from maplib.utils.models import Station
 from maplib.utils.params_getter import Container
+from maplib.utils.station_table import NameTable
+from maplib.utils.station_table import StationTable
 
 
 class Constructor(Container):
     def __init__(self):
+        """
+        The network resolved from input.json is kept in the input cache of
+        the project, which spares parsing and resolving the geometry as
+        long as input.json and the logos are unchanged. Once loaded, it is
+        shared by the contexts of all styles.
+        The fingerprints of the parts of the network are only needed by
+        a context with a component cache.
+        """
         Container.__init__(self)
-        self.input_dict = self.params.INPUT_DATABASE_DICT.copy()
-        self.all_stations_data_dict = {}
-        self.metro_objs = self.build_metros()
-        self.station_coord_tuples = list(self.all_stations_data_dict.keys())
-        self.station_objs = self.build_stations()
-        self.name_objs_dict = self.build_name_objs()
-        self.geography_objs_dict = self.build_geography_objs()
-        self.mark_objs_dict = self.build_mark_objs()
+        compiled_input = self.params.COMPILED_INPUT
+        if compiled_input is not None:
+            with profile_span("load_network"):
+                self.load_compiled_input(*compiled_input)
+        else:
+            self.build()
+            if consts.USE_INPUT_CACHE or self.params.component_cache is not None:
+                compiled_input = self.get_compiled_input()
+            if consts.USE_INPUT_CACHE:
+                input_cache = self.params.get_input_cache()
+                input_cache.dump(input_cache.get_fingerprint(), *compiled_input)
+                self.params.reset_databases("COMPILED_INPUT")
+        self.section_fingerprints = None
+        if self.params.component_cache is not None:
+            self.section_fingerprints = InputCache.get_section_fingerprints(*compiled_input)
+        self.filter_metros()
+
+    def filter_metros(self):
+        """
+        Only keeps the metros in the metro subset of the context (given by
+        english names), and the stations on them. The metros which are not
+        highlighted, if any metro is, fade into the main color.
+        """
+        metro_subset = self.params.metro_subset
+        if metro_subset is not None:
+            self.metro_objs = [
+                metro for metro in self.metro_objs
+                if metro.metro_name_dict[consts.ENG] in metro_subset
+            ]
+            metro_ids = set([id(metro) for metro in self.metro_objs])
+            station_objs = []
+            for station in self.station_objs:
+                parent_metros = tuple([metro for metro in station.parent_metros if id(metro) in metro_ids])
+                if len(parent_metros) == len(station.parent_metros):
+                    station_objs.append(station)
+                elif parent_metros:
+                    station_objs.append(Station(
+                        station.center_point, parent_metros, station.station_direction,
+                        station.name_dict, station.label_simple_direction
+                    ))
+            self.station_objs = station_objs
+        highlighted_metros = self.params.highlighted_metros
+        if highlighted_metros is not None:
+            for metro in self.metro_objs:
+                if metro.metro_name_dict[consts.ENG] not in highlighted_metros:
+                    metro.fade(self.params.MAIN_COLOR, consts.FADED_METRO_RATIO)
+        return self
+
+    def get_metro_objs_in_input_order(self):
+        """
+        The metros kept by filter_metros, in the order of input.json.
+        """
+        metro_ids = set([id(metro) for metro in self.metro_objs])
+        return [metro for metro in self.input_metro_objs if id(metro) in metro_ids]
+
+    def build(self):
+        with profile_span("parse"):
+            self.input_dict = self.params.INPUT_DATABASE_DICT
+        self.name_table = NameTable()
+        with profile_span("construct_metros"):
+            self.metro_objs = self.build_metros()
+        with profile_span("build_stations"):
+            self.station_objs = self.build_stations()
+        with profile_span("build_names"):
+            self.name_objs_dict = self.build_name_objs()
+        with profile_span("geography"):
+            self.geography_objs_dict = self.build_geography_objs()
+        with profile_span("build_marks"):
+            self.mark_objs_dict = self.build_mark_objs()
+        return self
+
+    def get_compiled_input(self):
+        """
+        Return (header, arrays) for InputCache.dump, holding nothing which
+        depends on the style.
+        """
+        metro_indexes_dict = {id(metro): k for k, metro in enumerate(self.input_metro_objs)}
+        control_points_lists = [metro.get_control_points_list() for metro in self.input_metro_objs]
+        route_sizes = [
+            len(control_points)
+            for control_points_list in control_points_lists
+            for control_points in control_points_list
+        ]
+        station_metro_indexes = [
+            metro_indexes_dict[id(metro)]
+            for station in self.station_objs
+            for metro in station.parent_metros
+        ]
+        header = {
+            "metros": [
+                [
+                    metro.layer_num, metro.metro_name_dict, list(metro.main_color.rgb),
+                    metro.sub_color if metro.sub_color in ("-", "*") else list(metro.sub_color.rgb),
+                    list(metro.name_color.rgb), metro.route_type, metro.names_coord,
+                ]
+                for metro in self.input_metro_objs
+            ],
+            "stations": [
+                [station.station_direction, station.name_dict, station.label_simple_direction]
+                for station in self.station_objs
+            ],
+            "names": {
+                name_type: [
+                    [*name_obj.center_point.tolist(), name_obj.name_dict[consts.ENG], name_obj.name_dict[consts.CHN]]
+                    for name_obj in name_obj_list
+                ]
+                for name_type, name_obj_list in self.name_objs_dict.items()
+            },
+            "geography": self.geography_objs_dict,
+            "marks": {
+                mark_type: [
+                    [*mark_obj.center_point.tolist(), mark_obj.label_simple_direction, mark_obj.name_dict[consts.CHN]]
+                    for mark_obj in mark_obj_list
+                ]
+                for mark_type, mark_obj_list in self.mark_objs_dict.items()
+            },
+            "logo_box_sizes": {
+                mark_type: logo_box_size.tolist()
+                for mark_type, logo_box_size in self.logo_box_sizes.items()
+            },
+        }
+        arrays = {
+            "control_points": np.array([
+                control_point
+                for control_points_list in control_points_lists
+                for control_points in control_points_list
+                for control_point in control_points
+            ], dtype="float64").reshape(-1, 2),
+            "route_sizes": np.array(route_sizes, dtype="int64"),
+            "station_centers": np.array([
+                station.center_point for station in self.station_objs
+            ], dtype="float64").reshape(-1, 2),
+            "station_sizes": np.array([
+                len(station.parent_metros) for station in self.station_objs
+            ], dtype="int64"),
+            "station_metro_indexes": np.array(station_metro_indexes, dtype="int64"),
+        }
+        return header, arrays
+
+    def load_compiled_input(self, header, arrays):
+        """
+        Rebuilds the objs from get_compiled_input, in the current style.
+        The header may be shared by several styles, so nothing in it is
+        handed out to be modified.
+        """
+        route_points_list = np.split(arrays["control_points"], np.cumsum(arrays["route_sizes"])[:-1])
+        route_points_list.reverse()
+        metro_objs = []
+        for layer_num, metro_name_dict, main_rgb, sub_color, name_rgb, route_type, names_coord in header["metros"]:
+            if sub_color not in ("-", "*"):
+                sub_color = Color(*sub_color)
+            num_routes = 2 if route_type == "y" else 1
+            control_points_list = [list(route_points_list.pop()) for _ in range(num_routes)]
+            metro = Metro.from_control_points(
+                layer_num, metro_name_dict, Color(*main_rgb), sub_color, Color(*name_rgb),
+                route_type, names_coord, control_points_list
+            )
+            metro_objs.append(metro)
+        self.input_metro_objs = list(metro_objs)
+        metro_objs.sort(key = lambda metro: metro.layer_num)
+        self.metro_objs = metro_objs
+        station_metro_indexes_list = np.split(
+            arrays["station_metro_indexes"], np.cumsum(arrays["station_sizes"])[:-1]
+        )
+        self.station_objs = [
+            Station(
+                center_point,
+                tuple([self.input_metro_objs[k] for k in metro_indexes.tolist()]),
+                station_direction,
+                station_name_dict,
+                label_simple_direction
+            )
+            for center_point, metro_indexes, (station_direction, station_name_dict, label_simple_direction) in zip(
+                arrays["station_centers"], station_metro_indexes_list, header["stations"]
+            )
+        ]
+        self.name_objs_dict = {
+            name_type: [Name(*name_data) for name_data in name_type_data]
+            for name_type, name_type_data in header["names"].items()
+        }
+        self.geography_objs_dict = {
+            obj_type: [(dict(obj_dict), obj_data) for obj_dict, obj_data in objs]
+            for obj_type, objs in header["geography"].items()
+        }
+        self.logo_box_sizes = {
+            mark_type: np_float(*logo_box_size)
+            for mark_type, logo_box_size in header["logo_box_sizes"].items()
+        }
+        self.mark_objs_dict = {
+            mark_type: [
+                Mark(*mark_data, self.get_logo_box_size(mark_type))
+                for mark_data in mark_type_data
+            ]
+            for mark_type, mark_type_data in header["marks"].items()
+        }
+        return self
 
     @staticmethod
     def string_to_vals(string, num_vals=None, merge_index=None, modify_indexes=None):
@@ -90,7 +295,61 @@ class Constructor(Container):
         return result
 
     @staticmethod
-    def get_metro_data(metro_dict):
+    def get_stations_data(station_data_strs, metro_name=None):
+        """
+        Parses all station lines of a metro at once, in the way of
+        string_to_vals(string, 7, 5, (2, 3)) on each line, except that signs
+        and station names are always kept as strings.
+        Return the columns (x_coords, y_coords, simplified_directions,
+        label_simple_directions, signs, station_names_eng, station_names_chn):
+        coords as float64 arrays (NAN for "-"), the rest as lists.
+        """
+        components_list = [string.split(maxsplit=5) for string in station_data_strs]
+        name_components_list = [components[-1].rsplit(maxsplit=1) for components in components_list if components]
+        if set(map(len, components_list)) - {6} or set(map(len, name_components_list)) - {2}:
+            for line_num, components in enumerate(components_list, 1):
+                if len(components) != 6 or len(components[-1].split()) < 2:
+                    Constructor.raise_station_data_error(station_data_strs, metro_name, line_num)
+        columns = list(zip(*components_list)) or [()] * 6
+        name_columns = list(zip(*name_components_list)) or [()] * 2
+        num_vals = Constructor.get_station_nums(columns[:4], station_data_strs, metro_name)
+        signs, station_names_eng, station_names_chn = [
+            [None if s == "-" else s for s in column]
+            for column in [columns[4], *name_columns]
+        ]
+        return num_vals[:, 0], num_vals[:, 1], np_modify_nums(num_vals[:, 2]), \
+            np_modify_nums(num_vals[:, 3]), signs, station_names_eng, station_names_chn
+
+    @staticmethod
+    def get_station_nums(num_columns, station_data_strs, metro_name):
+        """
+        Return an array of shape (N, 4). Each column is converted by numpy
+        in one go, which is retried with float per line to find a bad line.
+        """
+        num_columns = [
+            ["nan" if s == "-" else s for s in column]
+            for column in num_columns
+        ]
+        try:
+            return np.stack([np.array(column, dtype="float64") for column in num_columns], axis=1)
+        except ValueError:
+            pass
+        num_vals = []
+        for line_num, num_strs in enumerate(zip(*num_columns), 1):
+            try:
+                num_vals.append([float(s) for s in num_strs])
+            except ValueError:
+                Constructor.raise_station_data_error(station_data_strs, metro_name, line_num)
+        return np.array(num_vals).reshape(-1, 4)
+
+    @staticmethod
+    def raise_station_data_error(station_data_strs, metro_name, line_num):
+        raise ValueError(consts.STATION_DATA_ERROR_MSG.format(
+            metro_name, line_num, station_data_strs[line_num - 1]
+        ))
+
+    @staticmethod
+    def get_metro_data(metro_dict, name_table=None):
         metro_name_dict = metro_dict["name"]
         layer_num = metro_dict["layer_num"]
         color_str = metro_dict["color"]
@@ -107,16 +366,18 @@ class Constructor(Container):
         for names_coord_str in metro_dict["names_coord"]:
             name_coord = Constructor.string_to_vals(names_coord_str)
             names_coord.append(name_coord)
-        stations_data = []
-        for station_data_str in metro_dict["stations_data"]:
-            station_data = Constructor.string_to_vals(station_data_str, 7, 5, (2, 3))
-            stations_data.append(station_data)
+        if name_table is None:
+            name_table = NameTable()
+        station_table = StationTable.from_columns(
+            Constructor.get_stations_data(metro_dict["stations_data"], metro_name_dict[consts.ENG]),
+            name_table
+        )
         return layer_num, metro_name_dict, main_color, sub_color, name_color, \
-            route_type, names_coord, stations_data
+            route_type, names_coord, station_table
 
     @staticmethod
     def format_metro_dict(layer_num, metro_name_dict, main_color, sub_color, name_color,
-            route_type, names_coord, stations_data):
+            route_type, names_coord, station_table):
         color_str = main_color.simple_str()
         if sub_color in ("-", "*"):
             sub_color_str = sub_color
@@ -124,7 +385,7 @@ class Constructor(Container):
             sub_color_str = sub_color.simple_str()
         name_color_str = name_color.simple_str()
         names_coord_strs = Constructor.format_list_with_strs(names_coord)
-        stations_data_strs = Constructor.format_list_with_strs(stations_data, (5, 6))
+        stations_data_strs = Constructor.format_list_with_strs(station_table.get_stations_data(), (5, 6))
         return {
             "name": metro_name_dict,
             "layer_num": layer_num,
@@ -137,21 +398,28 @@ class Constructor(Container):
         }
 
     def build_metros(self):
+        """
+        The real stations of all metros are gathered in station_table,
+        where a coord of several metros refers to the last one.
+        """
         metro_objs = []
-        for metro_dict in self.input_dict["metro_database"]:
-            metro_data = Constructor.get_metro_data(metro_dict)
+        real_station_tables = []
+        for metro_index, metro_dict in enumerate(self.input_dict["metro_database"]):
+            metro_data = Constructor.get_metro_data(metro_dict, self.name_table)
             metro = Metro(*metro_data)
             metro_objs.append(metro)
-            self.all_stations_data_dict.update(metro.real_stations_data_dict)
+            metro.real_station_table.rows["metro_index"] = metro_index
+            real_station_tables.append(metro.real_station_table)
+        self.input_metro_objs = list(metro_objs)
+        station_table = StationTable.concatenate(real_station_tables, self.name_table)
+        self.station_table = station_table.take(station_table.get_last_indexes_by_key())
         metro_objs.sort(key = lambda metro: metro.layer_num)
         return metro_objs
 
-    def build_station(self):
-        station_coord_tuple = self.station_coord_tuples[0]
-        adjacent_coord_list = list(self.expand_station(station_coord_tuple))
-        adjacent_coord_list.sort(key = lambda coord: sum(coord))
-        for adjacent_coord in adjacent_coord_list:
-            self.station_coord_tuples.remove(adjacent_coord)
+    def build_station(self, station_indexes):
+        station_keys = self.station_keys
+        station_indexes = sorted(station_indexes, key = lambda k: sum(station_keys[k]))
+        adjacent_coord_list = [station_keys[k] for k in station_indexes]
         x, y = zip(*adjacent_coord_list)
         if max(y) == min(y):
             station_direction = consts.HORIZONTAL
@@ -160,8 +428,9 @@ class Constructor(Container):
         else:
             raise ValueError(adjacent_coord_list)
         center_point = center_of_mass(adjacent_coord_list)
-        station_data = [self.all_stations_data_dict[coord] for coord in adjacent_coord_list]
-        parent_metros, station_names_eng, station_names_chn, label_simple_directions = zip(*station_data)
+        metro_indexes, station_names_eng, station_names_chn, label_simple_directions = \
+            self.station_table.get_station_data(station_indexes)
+        parent_metros = tuple([self.input_metro_objs[k] for k in metro_indexes])
         station_name_dict = {
             consts.ENG: get_first_item(station_names_eng),
             consts.CHN: get_first_item(station_names_chn),
@@ -176,24 +445,15 @@ class Constructor(Container):
         )
         return station
 
-    def expand_station(self, station_coord_tuple):
-        old_adjacent_coord_set = set()
-        new_adjacent_coord_set = {station_coord_tuple}
-        while len(new_adjacent_coord_set - old_adjacent_coord_set) != 0:
-            old_adjacent_coord_set = new_adjacent_coord_set.copy()
-            for coord in list(old_adjacent_coord_set):
-                for direction in consts.FOUR_BASE_DIRECTIONS:
-                    extended_coord_tuple = tuple(coord + direction)
-                    if extended_coord_tuple in self.station_coord_tuples:
-                        new_adjacent_coord_set.add(extended_coord_tuple)
-        return new_adjacent_coord_set
-
     def build_stations(self):
-        station_objs = []
-        while self.station_coord_tuples:
-            station_obj = self.build_station()
-            station_objs.append(station_obj)
-        return station_objs
+        """
+        Station coords adjacent to each other make up one station.
+        """
+        self.station_keys = self.station_table.get_keys()
+        return [
+            self.build_station(station_indexes)
+            for station_indexes in group_adjacent_coords(self.station_keys)
+        ]
 
     @staticmethod
     def get_name_data(name_data_str):
@@ -221,6 +481,7 @@ class Constructor(Container):
 
     @staticmethod
     def get_geography_data(obj_dict):
+        obj_dict = obj_dict.copy()
         coord_data_strs = obj_dict.pop("coord_data")
         obj_data = []
         for coord_data_str in coord_data_strs:
@@ -257,9 +518,10 @@ class Constructor(Container):
 
     def build_mark_objs(self):
         mark_objs_dict = {}
+        self.logo_box_sizes = {}
         for mark_type, mark_data_strs in self.input_dict["mark_database"].items():
-            logo_frame = SvgFrame(consts.LOGO_DIRS[mark_type])
-            logo_box_size = self.params.MARK_LOGO_STYLE[mark_type]["scale_factor"] * logo_frame.box_size
+            self.logo_box_sizes[mark_type] = SvgFrame(consts.LOGO_DIRS[mark_type]).box_size
+            logo_box_size = self.get_logo_box_size(mark_type)
             mark_obj_list = []
             for mark_data_str in mark_data_strs:
                 mark_data = Constructor.get_mark_data(mark_data_str)
@@ -267,3 +529,6 @@ class Constructor(Container):
                 mark_obj_list.append(mark_obj)
             mark_objs_dict[mark_type] = mark_obj_list
         return mark_objs_dict
+
+    def get_logo_box_size(self, mark_type):
+        return self.params.MARK_LOGO_STYLE[mark_type]["scale_factor"] * self.logo_box_sizes[mark_type]
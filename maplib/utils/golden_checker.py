@@ -0,0 +1,139 @@
+import argparse
+import gzip
+import os
+import time
+
+import maplib.constants as consts
+
+from maplib.svg.main_project import Project
+from maplib.tools.file_tools import get_relative_path
+from maplib.tools.file_tools import replace_file
+from maplib.tools.simple_functions import format_table
+from maplib.tools.svg_compare import compare_svg_bytes
+from maplib.utils.params_getter import RenderContext
+from maplib.utils.project_builder import ProjectBuilder
+
+
+class GoldenChecker(object):
+    """
+    Renders every (project, style) target in memory and compares it with
+    its golden svg, GOLDEN_SVG_DIR of its context (see compare_svg_bytes),
+    or stores it as the golden one with update. Tex is never generated,
+    the glyphs all come from tex.json, so that no LaTeX is needed, and
+    nothing but the golden svgs is written. The golden svgs are kept
+    gzipped, without a timestamp so that the same svg gives the same file.
+    """
+    disabled_const_names = ("ENABLE_TEX_GENERATION", "PRINT_TEX_WRITING_PROGRESS_MSG", "PRINT_FILE_MODIFYING_MSG")
+
+    def __init__(self, project_city_names=None, tolerance=consts.GOLDEN_TOLERANCE, update=False):
+        if project_city_names is None:
+            project_city_names = RenderContext.get_possible_folder_names()
+        self.project_city_names = project_city_names
+        self.tolerance = tolerance
+        self.update = update
+        self.results = []
+
+    @staticmethod
+    def get_cmd_parser():
+        parser = argparse.ArgumentParser()
+        parser.add_argument(
+            "-p",
+            "--project",
+            nargs="+",
+            choices=RenderContext.get_possible_folder_names(),
+            help=consts.CMD_CHECK_PROJECT_HELP_MSG,
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=consts.GOLDEN_TOLERANCE,
+            help=consts.CMD_TOLERANCE_HELP_MSG,
+        )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help=consts.CMD_UPDATE_GOLDEN_HELP_MSG,
+        )
+        return parser
+
+    @staticmethod
+    def from_cmd(args=None):
+        if args is None:
+            args = GoldenChecker.get_cmd_parser().parse_args()
+        return GoldenChecker(args.project, args.tolerance, args.update)
+
+    def check_target(self, context):
+        """
+        Return (seconds, output size, status, difference), where the
+        difference is (element path, description) or None.
+        """
+        begin = time.perf_counter()
+        svg_bytes = Project(context, write_file=False).to_bytes()
+        seconds = time.perf_counter() - begin
+        golden_file_name = context.GOLDEN_SVG_DIR
+        if self.update:
+            os.makedirs(os.path.dirname(golden_file_name), exist_ok=True)
+            replace_file(golden_file_name, gzip.compress(svg_bytes, mtime=0))
+            return seconds, len(svg_bytes), "updated", None
+        if not os.path.exists(golden_file_name):
+            return seconds, len(svg_bytes), "no golden", None
+        with gzip.open(golden_file_name, "rb") as input_file:
+            golden_svg_bytes = input_file.read()
+        if svg_bytes == golden_svg_bytes:
+            return seconds, len(svg_bytes), "identical", None
+        difference = compare_svg_bytes(svg_bytes, golden_svg_bytes, self.tolerance)
+        if difference is None:
+            return seconds, len(svg_bytes), "within tolerance", None
+        return seconds, len(svg_bytes), "differs", difference
+
+    def check(self):
+        """
+        The constants of disabled_const_names are only disabled during the
+        check.
+        """
+        const_vals = [getattr(consts, const_name) for const_name in GoldenChecker.disabled_const_names]
+        for const_name in GoldenChecker.disabled_const_names:
+            setattr(consts, const_name, False)
+        try:
+            self.check_projects()
+        finally:
+            for const_name, const_val in zip(GoldenChecker.disabled_const_names, const_vals):
+                setattr(consts, const_name, const_val)
+        return self
+
+    def check_projects(self):
+        """
+        The styles of a project share its databases, so the first target
+        of a project also loads them.
+        """
+        for project_city_name in self.project_city_names:
+            first_context = None
+            for params_file_name in ProjectBuilder.get_style_names(project_city_name):
+                if first_context is None:
+                    context = first_context = RenderContext(project_city_name, params_file_name)
+                else:
+                    context = first_context.with_style(params_file_name)
+                self.results.append((context, *self.check_target(context)))
+            if first_context is not None:
+                first_context.reset_databases()
+        return self
+
+    def get_failures(self):
+        return [result for result in self.results if result[3] in ("differs", "no golden")]
+
+    def print_report(self):
+        rows = []
+        for context, seconds, output_size, status, difference in self.results:
+            rows.append([
+                context.PROJECT_CITY_NAME,
+                context.PARAMS_FILE_NAME,
+                "{0:.3f}".format(seconds),
+                output_size // 1024,
+                status,
+            ])
+            if difference is not None:
+                print(consts.GOLDEN_DIFFERENCE_MSG.format(get_relative_path(context.GOLDEN_SVG_DIR), *difference))
+        print(format_table(("project", "style", "seconds", "output (KiB)", "result"), rows))
+        if not self.update:
+            print(consts.GOLDEN_SUMMARY_MSG.format(len(self.results) - len(self.get_failures()), len(self.results)))
+        return self
@@ -1,3 +1,5 @@
+import numpy as np
+
 import maplib.constants as consts
 
 from maplib.svg.path_types import LPath
@@ -11,15 +13,15 @@ from maplib.tools.assertions import assert_is_standard_route
 from maplib.tools.assertions import assert_station_on_route
 from maplib.tools.numpy_type_tools import np_float
 from maplib.tools.numpy_type_tools import np_to_tuple
+from maplib.tools.numpy_type_tools import np_to_tuples
 from maplib.tools.simple_functions import adjacent_n_tuples
-from maplib.tools.simple_functions import shrink_value
+from maplib.tools.space_ops import get_bypass_directions
 from maplib.tools.space_ops import get_positive_direction
 from maplib.tools.space_ops import midpoint
 from maplib.tools.space_ops import num_to_base_direction
-from maplib.tools.space_ops import restore_angle
-from maplib.tools.space_ops import rotate
-from maplib.tools.space_ops import solve_intersection_point
+from maplib.tools.space_ops import solve_line_intersection_points
 from maplib.utils.alignable import Frame
+from maplib.utils.color import Color
 from maplib.utils.params_getter import Container
 
 
@@ -67,7 +69,7 @@ class Metro(Container):
     name_color: a Color obj;
     route_type: a str in ("l", "o", "y");
     names_coord: a list which contains coords of names of the metro;
-    stations_data: an array-like database which contains 7 elements as the following format:
+    station_table: a StationTable of stations in the following format:
         station_x_coord: an int,
         station_y_coord: an int,
         simplified_direction: an integer in range(4),
@@ -80,8 +82,43 @@ class Metro(Container):
         station_name_chn: a str.
     """
     def __init__(self, layer_num, metro_name_dict, main_color, sub_color, name_color,
-            route_type, names_coord, stations_data):
+            route_type, names_coord, station_table):
         Container.__init__(self)
+        self.init_attrs(layer_num, metro_name_dict, main_color, sub_color, name_color,
+            route_type, names_coord)
+        self.station_table = station_table
+        self.init_dicts()
+        self.digest_stations_data()
+        if self.route_type == "y":
+            self.handle_y_type()
+        else:
+            self.handle_non_y_type()
+        self.real_station_table = self.station_table.take(list(self.real_station_indexes_dict.values()))
+
+    @staticmethod
+    def from_control_points(layer_num, metro_name_dict, main_color, sub_color, name_color,
+            route_type, names_coord, control_points_list):
+        """
+        Rebuilds a metro whose control points have been resolved before,
+        see get_control_points_list. It has no station data.
+        """
+        metro = Metro.__new__(Metro)
+        Container.__init__(metro)
+        metro.init_attrs(layer_num, metro_name_dict, main_color, sub_color, name_color,
+            route_type, names_coord)
+        if route_type == "y":
+            metro.main_control_points, metro.sub_control_points = control_points_list
+        else:
+            metro.control_points, = control_points_list
+        return metro
+
+    def get_control_points_list(self):
+        if self.route_type == "y":
+            return [self.main_control_points, self.sub_control_points]
+        return [self.control_points]
+
+    def init_attrs(self, layer_num, metro_name_dict, main_color, sub_color, name_color,
+            route_type, names_coord):
         self.layer_num = layer_num
         self.metro_name_dict = metro_name_dict
         self.main_color = main_color
@@ -89,7 +126,7 @@ class Metro(Container):
         self.name_color = name_color
         self.route_type = route_type
         self.names_coord = names_coord
-        self.stations_data = stations_data
+        self.loop = True if route_type == "o" else False
         layer_num_str = str(layer_num)
         self.route_id_name = "r" + layer_num_str
         self.mask_id_name = "m" + layer_num_str
@@ -97,134 +134,152 @@ class Metro(Container):
         self.point_id_name = "p" + layer_num_str
         self.sign_id_name = "s" + layer_num_str
         self.name_dict = self.get_name_dict()
-        self.init_dicts()
-        self.digest_stations_data()
-        if self.route_type == "y":
-            self.handle_y_type()
-        else:
-            self.handle_non_y_type()
+        return self
+
+    def fade(self, color, ratio):
+        """
+        Blends the colors of the metro into color, see Color.blend.
+        """
+        self.main_color = self.main_color.blend(color, ratio)
+        if isinstance(self.sub_color, Color):
+            self.sub_color = self.sub_color.blend(color, ratio)
+        self.name_color = self.name_color.blend(color, ratio)
+        return self
 
     def init_dicts(self):
         """
-        stations_data_dict
-        dict_key: a tuple of a given point
-        dict_val: tuple(
-            sign,
-            station_name_eng,
-            station_name_chn,
-            label_simple_direction
-        )
-        real_stations_data_dict
+        real_station_indexes_dict
         dict_key: a tuple of a real station
-        dict_val: tuple(
-            metro,
-            station_name_eng,
-            station_name_chn,
-            label_simple_direction
-        )
+        dict_val: the index of the station in station_table
         coord_to_direction_dict
         dict_key: a tuple of a point either given or calculated
         dict_val: simplified_direction
         """
-        self.stations_data_dict = {}
-        self.real_stations_data_dict = {}
+        self.real_station_indexes_dict = {}
         self.coord_to_direction_dict = {}
         return self
 
     def digest_stations_data(self):
-        self.loop = True if self.route_type == "o" else False
-        station_coords = []
-        signs = []
-        for station_data in self.stations_data:
-            station_x_coord, station_y_coord, simplified_direction, label_simple_direction, \
-                sign, station_name_eng, station_name_chn = station_data
-            station_coord = np_float(station_x_coord, station_y_coord)
-            station_coords.append(station_coord)
-            signs.append(sign)
-            self.stations_data_dict[np_to_tuple(station_coord)] = (
-                sign,
-                station_name_eng,
-                station_name_chn,
-                label_simple_direction
-            )
-            self.coord_to_direction_dict[np_to_tuple(station_coord)] = simplified_direction
-        self.station_coords = station_coords
-        self.signs = signs
+        """
+        A coord given twice refers to its last station.
+        """
+        self.station_coords = list(self.station_table.get_coords())
+        self.signs = self.station_table.get_signs()
+        self.station_keys = self.station_table.get_keys()
+        self.coord_to_direction_dict.update(
+            zip(self.station_keys, self.station_table.rows["direction"].tolist())
+        )
+        self.last_station_indexes_dict = {
+            key: k for k, key in enumerate(self.station_keys)
+        }
         return self
 
     def handle_non_y_type(self):
         coords = self.station_coords
         self.control_points = self.compute_control_points(coords)
-        self.add_real_stations_data(self.control_points, coords)
+        self.add_real_stations_data(self.control_points, range(len(coords)))
         return self
 
     def handle_y_type(self):
         coords = self.station_coords
         branch_index = self.signs.index("#")
         follow_index = self.signs.index("^")
-        main_coords = coords[:follow_index]
-        sub_coords = coords[follow_index:]
-        sub_coords.insert(0, coords[branch_index])
-        self.main_control_points = self.compute_control_points(main_coords)
-        self.sub_control_points = self.compute_control_points(sub_coords)
-        self.add_real_stations_data(self.main_control_points, main_coords)
-        self.add_real_stations_data(self.sub_control_points, sub_coords)
+        main_indexes = list(range(follow_index))
+        sub_indexes = list(range(follow_index, len(coords)))
+        sub_indexes.insert(0, branch_index)
+        self.main_control_points = self.compute_control_points([coords[k] for k in main_indexes])
+        self.sub_control_points = self.compute_control_points([coords[k] for k in sub_indexes])
+        self.add_real_stations_data(self.main_control_points, main_indexes)
+        self.add_real_stations_data(self.sub_control_points, sub_indexes)
         return self
 
-    def add_real_stations_data(self, control_points, station_coords):
+    def add_real_stations_data(self, control_points, station_indexes):
         assert_is_standard_route(control_points, self.loop)
-        for station_coord in station_coords:
-            station_data = self.stations_data_dict[np_to_tuple(station_coord)]
-            if station_data[0] != "*":
-                assert_station_on_route(station_coord, control_points, self.loop)
-                real_station_data = list(station_data)[1:]
-                real_station_data.insert(0, self)
-                self.real_stations_data_dict[np_to_tuple(station_coord)] = tuple(real_station_data)
+        for station_index in station_indexes:
+            station_key = self.station_keys[station_index]
+            last_station_index = self.last_station_indexes_dict[station_key]
+            if self.signs[last_station_index] != "*":
+                assert_station_on_route(self.station_coords[station_index], control_points, self.loop)
+                self.real_station_indexes_dict[station_key] = last_station_index
         return self
 
     def compute_control_points(self, station_coords):
-        control_points = []
-        for point1, point2 in adjacent_n_tuples(station_coords, 2, self.loop):
-            control_points = self.update_control_point(point1, point2, control_points)
+        """
+        The route turns at the intersection of the lines through adjacent
+        stations. Parallel lines are bypassed through their midpoint.
+        All station pairs are solved at once, unless a midpoint is keyed
+        (by np_to_tuple) the same as a station, whose direction it then
+        replaces: this is only right pair by pair.
+        """
+        pairs = list(adjacent_n_tuples(station_coords, 2, self.loop))
+        if not pairs:
+            control_points = []
+        else:
+            control_points = self.solve_control_points(pairs)
+            if control_points is None:
+                control_points = []
+                for point1, point2 in pairs:
+                    control_points = self.update_control_point(point1, point2, control_points)
         if not self.loop:
             control_points.insert(0, station_coords[0])
             control_points.append(station_coords[-1])
         return control_points
 
+    def get_directions(self, points):
+        return np.array([
+            self.coord_to_direction_dict[key]
+            for key in np_to_tuples(points)
+        ], dtype="int64")
+
+    def solve_control_points(self, pairs):
+        points1 = np.array([pair[0] for pair in pairs])
+        points2 = np.array([pair[1] for pair in pairs])
+        directions1 = self.get_directions(points1)
+        directions2 = self.get_directions(points2)
+        intersection_points, parallel_mask, coincident_mask = solve_line_intersection_points(
+            points1, directions1, points2, directions2
+        )
+        bypass_mask = parallel_mask & ~coincident_mask
+        append_points = (points1[bypass_mask] + points2[bypass_mask]) / 2
+        append_keys = np_to_tuples(append_points)
+        station_keys = set(np_to_tuples(points1)) | set(np_to_tuples(points2))
+        if any([append_key in station_keys for append_key in append_keys]):
+            return None
+        append_directions = get_bypass_directions(
+            points1[bypass_mask], points2[bypass_mask], directions1[bypass_mask]
+        )
+        for append_key, append_direction in zip(append_keys, append_directions.tolist()):
+            self.coord_to_direction_dict[append_key] = append_direction
+        second_points = np.full_like(intersection_points, consts.NAN)
+        intersection_points[bypass_mask] = solve_line_intersection_points(
+            points1[bypass_mask], directions1[bypass_mask], append_points, append_directions
+        )[0]
+        second_points[bypass_mask] = solve_line_intersection_points(
+            points2[bypass_mask], directions2[bypass_mask], append_points, append_directions
+        )[0]
+        keep_mask = np.stack([~coincident_mask, bypass_mask], axis=1)
+        return list(np.stack([intersection_points, second_points], axis=1)[keep_mask])
+
     def update_control_point(self, point1, point2, control_points):
         simplified_direction1 = self.coord_to_direction_dict[np_to_tuple(point1)]
         simplified_direction2 = self.coord_to_direction_dict[np_to_tuple(point2)]
-        theta1, theta2 = [
-            restore_angle(simplified_direction)
-            for simplified_direction in [simplified_direction1, simplified_direction2]
-        ]
-        intersection_point = solve_intersection_point(point1, theta1, point2, theta2)
-        if intersection_point is None:
-            simplified_direction = simplified_direction1
-            append_point = self.append_new_point(point1, point2, simplified_direction)
+        intersection_points, parallel_mask, coincident_mask = solve_line_intersection_points(
+            np.array([point1]), np.array([simplified_direction1]),
+            np.array([point2]), np.array([simplified_direction2]),
+        )
+        if not parallel_mask[0]:
+            control_points.append(intersection_points[0])
+        elif not coincident_mask[0]:
+            append_point = self.append_new_point(point1, point2, simplified_direction1)
             control_points = self.update_control_point(point1, append_point, control_points)
             control_points = self.update_control_point(point2, append_point, control_points)
-        elif intersection_point is not consts.NAN:
-            control_points.append(intersection_point)
         return control_points
 
     def append_new_point(self, point1, point2, simplified_direction):
-        rotated_point1, rotated_point2 = [
-            rotate(point, -restore_angle(simplified_direction))
-            for point in [point1, point2]
-        ]
-        distance_vec = rotated_point2 - rotated_point1
-        h, v = distance_vec[0], distance_vec[1]
-        if v < 0:
-            h, v = -h, -v
-        if h > v:
-            append_direction = 1
-        elif h < -v:
-            append_direction = 3
-        else:
-            append_direction = 2
+        append_direction = get_bypass_directions(
+            np.array([point1]), np.array([point2]), np.array([simplified_direction])
+        ).tolist()[0]
         append_point = midpoint(point1, point2)
-        append_direction = shrink_value(simplified_direction + append_direction, 0, 4)
         self.coord_to_direction_dict[np_to_tuple(append_point)] = append_direction
         return append_point
 
@@ -277,6 +332,7 @@ class Station(Container):
         self.name_dict = station_name_dict
         station_size = len(parent_metros)
         self.station_size = station_size
+        self.label_simple_direction = label_simple_direction
         self.label_direction = num_to_base_direction(label_simple_direction)
         if station_size == 1:
             self.init_normal_station()
@@ -352,6 +408,7 @@ class Mark(object):
             consts.CHN: name_chn,
         }
         self.center_point = np_float(x_coord, y_coord)
+        self.label_simple_direction = label_simple_direction
         self.label_direction = num_to_base_direction(label_simple_direction)
         self.logo_box_size = logo_box_size
         self.set_frame()
@@ -1,22 +1,67 @@
+from contextlib import contextmanager
 import argparse
-import importlib
-import json
+import importlib.util
 import os
+import threading
+
+import numpy as np
 
 import maplib.constants as consts
 
 from maplib.tools.file_tools import get_file_basename
 from maplib.tools.file_tools import get_relative_path
+from maplib.tools.file_tools import load_dict
+from maplib.tools.glyph_store import GlyphRegistry
+from maplib.tools.glyph_store import GlyphStore
+from maplib.tools.input_cache import InputCache
 from maplib.tools.numpy_type_tools import np_float
+from maplib.tools.profiler import profile_span
+from maplib.tools.render_cache import RenderCache
+from maplib.tools.tex_journal import TexJournal
+from maplib.utils.color import Color
+
 
+class RenderContext(object):
+    """
+    Keeps everything a render depends on: the project dirs, the style
+    parameters and the json databases of the project.
+    The databases are only loaded on first access, and are shared by the
+    contexts of other styles made with with_style.
+    """
+    lazy_attrs = (
+        "INPUT_DATABASE_DICT", "COMPILED_INPUT", "GLOBAL_TEX_DICT", "TEX_STORE", "TEX_REGISTRY"
+    )
 
-class Getter(object):
-    def __init__(self):
-        self.parse_cmd()
+    def __init__(self, project_city_name=consts.DEFAULT_PROJECT_CITY_NAME,
+            params_file_name=consts.DEFAULT_STYLE_FILE_NAME):
+        self.lazy_attrs_lock = threading.RLock()
+        self.databases = {}
+        self.component_cache = None
+        self.metro_subset = None
+        self.highlighted_metros = None
+        self.param_names = []
+        self.PROJECT_CITY_NAME = project_city_name
+        self.PARAMS_FILE_NAME = params_file_name
         self.load_dirs()
         self.load_params()
         self.load_other_attrs()
 
+    def __getattr__(self, key):
+        """
+        Only called when the attribute is missing, i.e. a lazy database
+        which has not been loaded yet. Tex writers may get here from
+        several threads at once, hence the lock.
+        """
+        if key not in RenderContext.lazy_attrs:
+            raise AttributeError(key)
+        databases = self.databases
+        if key not in databases:
+            with self.lazy_attrs_lock:
+                if key not in databases:
+                    with profile_span("load_" + key.lower()):
+                        databases[key] = self.__getattribute__("load_" + key.lower())()
+        return databases[key]
+
     @staticmethod
     def check_valid_folder_path(folder_path):
         return os.path.isdir(folder_path) and all([
@@ -28,66 +73,247 @@ class Getter(object):
                 "tex.json",
             )
         ])
-    
-    def parse_cmd(self):
+
+    @staticmethod
+    def get_possible_folder_names():
         file_dir = consts.FILE_DIR
         possible_folder_names = []
         for folder_name in os.listdir(file_dir):
             if folder_name != "template_file":
                 folder_path = os.path.join(file_dir, folder_name)
-                if Getter.check_valid_folder_path(folder_path):
+                if RenderContext.check_valid_folder_path(folder_path):
                     possible_folder_names.append(folder_name)
         possible_folder_names.sort()
+        return possible_folder_names
+
+    @staticmethod
+    def get_cmd_parser():
         parser = argparse.ArgumentParser()
         parser.add_argument(
             "-p",
             "--project",
-            choices=possible_folder_names,
+            choices=RenderContext.get_possible_folder_names(),
             default=consts.DEFAULT_PROJECT_CITY_NAME,
             help=consts.CMD_PROJECT_HELP_MSG,
         )
         parser.add_argument(
             "-s",
             "--style",
-            default=consts.DEFAULT_STYLE_FILE_NAME,
+            nargs="+",
+            default=[consts.DEFAULT_STYLE_FILE_NAME],
             help=consts.CMD_STYLE_HELP_MSG,
         )
-        args = parser.parse_args()
-        self.PROJECT_CITY_NAME = args.project
-        self.PARAMS_FILE_NAME = args.style
+        return parser
+
+    @staticmethod
+    def from_cmd(args=None):
+        """
+        The context of the first style given.
+        """
+        return RenderContext.list_from_cmd(args)[0]
+
+    @staticmethod
+    def list_from_cmd(args=None):
+        """
+        A context for every style given, all sharing the databases.
+        """
+        if args is None:
+            args = RenderContext.get_cmd_parser().parse_args()
+        first_context = RenderContext(args.project, args.style[0])
+        return [first_context] + [
+            first_context.with_style(params_file_name)
+            for params_file_name in args.style[1:]
+        ]
+
+    def with_style(self, params_file_name):
+        """
+        A context of the same project in another style, which shares the
+        databases (and their lock) with this one, so that they are loaded
+        once for all styles.
+        """
+        context = RenderContext(self.PROJECT_CITY_NAME, params_file_name)
+        context.lazy_attrs_lock = self.lazy_attrs_lock
+        context.databases = self.databases
+        return context
 
     def load_dirs(self):
         project_dir = os.path.join(consts.FILE_DIR, self.PROJECT_CITY_NAME)
         self.PROJECT_DIR = project_dir
         self.PARAMETERS_DIR = os.path.join(project_dir, self.PARAMS_FILE_NAME + ".py")
         self.INPUT_JSON_DIR = os.path.join(project_dir, "input.json")
+        self.INPUT_CACHE_DIR = os.path.join(project_dir, "input.bin")
         self.TEX_JSON_DIR = os.path.join(project_dir, "tex.json")
+        self.TEX_STORE_DIR = os.path.join(project_dir, "tex.bin")
+        self.TEX_JOURNAL_DIR = os.path.join(project_dir, "tex.journal")
         self.METRO_LOGO_DIR = os.path.join(project_dir, "metro_logo.svg")
 
     def load_params(self):
+        """
+        The style file is executed as a fresh module for every context,
+        so that contexts of different projects never share a module.
+        """
         params_path = get_relative_path(self.PARAMETERS_DIR)
-        pkg_name = get_file_basename(params_path).replace("\\", ".")
-        params_module = importlib.import_module(pkg_name)
+        pkg_name = get_file_basename(params_path).replace(os.sep, ".")
+        spec = importlib.util.spec_from_file_location(pkg_name, self.PARAMETERS_DIR)
+        params_module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(params_module)
         for key, val in params_module.__dict__.items():
             if "__" not in key and key not in ("consts", "np_float", "Color"):
                 self.__setattr__(key, val)
+                self.param_names.append(key)
 
     def load_other_attrs(self):
         self.OUTPUT_SVG_DIR = os.path.join(self.PROJECT_DIR, self.OUTPUT_FILE_NAME + ".svg")
-        with open(self.INPUT_JSON_DIR, "r", encoding=consts.UTF_8) as input_file:
-            self.INPUT_DATABASE_DICT = json.load(input_file)
-        with open(self.TEX_JSON_DIR, "r", encoding=consts.UTF_8) as input_file:
-            self.GLOBAL_TEX_DICT = json.load(input_file)
+        self.PROFILE_REPORT_DIR = os.path.join(self.PROJECT_DIR, self.OUTPUT_FILE_NAME + "-profile.json")
+        self.PROFILE_TRACE_DIR = os.path.join(self.PROJECT_DIR, self.OUTPUT_FILE_NAME + "-trace.json")
+        self.RENDER_CACHE_DIR = os.path.join(self.PROJECT_DIR, self.OUTPUT_FILE_NAME + "-cache.json")
+        self.GOLDEN_SVG_DIR = os.path.join(self.PROJECT_DIR, "golden", self.OUTPUT_FILE_NAME + ".svg.gz")
         self.FULL_SIZE = np_float(self.FULL_WIDTH, self.FULL_HEIGHT)
         self.BODY_SIZE = np_float(self.BODY_WIDTH, self.BODY_HEIGHT)
 
+    @staticmethod
+    def get_override_val(val, new_val):
+        """
+        Converts a json value into the type of the parameter it replaces:
+        a Color from [r, g, b], a point from [x, y], and dicts merged key
+        by key. Raise ValueError if they do not match.
+        """
+        if isinstance(val, Color):
+            if not isinstance(new_val, list) or len(new_val) != 3:
+                raise ValueError(new_val)
+            return Color(*new_val)
+        if isinstance(val, np.ndarray):
+            if not isinstance(new_val, list) or len(new_val) != len(val):
+                raise ValueError(new_val)
+            return np_float(*new_val)
+        if isinstance(val, dict):
+            if not isinstance(new_val, dict) or any([key not in val for key in new_val]):
+                raise ValueError(new_val)
+            return {
+                key: RenderContext.get_override_val(sub_val, new_val[key]) if key in new_val else sub_val
+                for key, sub_val in val.items()
+            }
+        if isinstance(val, (list, tuple)):
+            if not isinstance(new_val, list) or len(new_val) != len(val):
+                raise ValueError(new_val)
+            return type(val)([
+                RenderContext.get_override_val(sub_val, new_sub_val)
+                for sub_val, new_sub_val in zip(val, new_val)
+            ])
+        if isinstance(val, bool) or isinstance(val, str):
+            if type(new_val) is not type(val):
+                raise ValueError(new_val)
+            return new_val
+        if isinstance(val, (int, float)):
+            if isinstance(new_val, bool) or not isinstance(new_val, (int, float)):
+                raise ValueError(new_val)
+            return type(val)(new_val)
+        raise ValueError(new_val)
+
+    def apply_overrides(self, overrides):
+        """
+        overrides: {parameter name: json value}, see get_override_val.
+        """
+        for key, new_val in overrides.items():
+            if key not in self.param_names:
+                raise ValueError(key)
+            self.__setattr__(key, RenderContext.get_override_val(getattr(self, key), new_val))
+        self.load_other_attrs()
+        return self
+
+    def load_input_database_dict(self):
+        return load_dict(self.INPUT_JSON_DIR)
+
+    def load_compiled_input(self):
+        """
+        (header, arrays) of the input cache, None if it is out of date or
+        disabled. See Constructor.
+        """
+        if not consts.USE_INPUT_CACHE:
+            return None
+        input_cache = self.get_input_cache()
+        return input_cache.load(input_cache.get_fingerprint())
+
+    def load_global_tex_dict(self):
+        return self.get_tex_journal().apply(load_dict(self.TEX_JSON_DIR))
+
+    def load_tex_store(self):
+        return GlyphStore.open_from_json_file(self.TEX_STORE_DIR, self.TEX_JSON_DIR)
+
+    def load_tex_registry(self):
+        return GlyphRegistry(self.TEX_STORE, self.get_tex_journal().get_layer())
+
+    def get_tex_journal(self):
+        return TexJournal(self.TEX_JOURNAL_DIR)
+
+    def get_input_cache(self):
+        return InputCache(self.INPUT_CACHE_DIR, [self.INPUT_JSON_DIR, *consts.LOGO_DIRS.values()])
+
+    def get_render_cache(self):
+        return RenderCache(self.RENDER_CACHE_DIR, self.OUTPUT_SVG_DIR, [
+            self.INPUT_JSON_DIR,
+            self.PARAMETERS_DIR,
+            self.METRO_LOGO_DIR,
+            *consts.LOGO_DIRS.values(),
+            self.TEX_JSON_DIR,
+            self.TEX_JOURNAL_DIR,
+        ])
+
+    def reset_databases(self, *keys):
+        """
+        Drops the loaded databases (all of them if no key is given) for
+        every context sharing them, they will be reloaded on next access.
+        """
+        if not keys:
+            keys = RenderContext.lazy_attrs
+        with self.lazy_attrs_lock:
+            for key in keys:
+                val = self.databases.pop(key, None)
+                if isinstance(val, GlyphStore):
+                    val.close()
+        return self
+
+    @contextmanager
+    def activate(self):
+        """
+        Every Container built inside the block (in the current thread)
+        without an explicit context gets this one.
+        """
+        context_stack = get_context_stack()
+        context_stack.append(self)
+        try:
+            yield self
+        finally:
+            context_stack.pop()
+
+
+_local_data = threading.local()
+
+
+def get_context_stack():
+    if not hasattr(_local_data, "context_stack"):
+        _local_data.context_stack = []
+    return _local_data.context_stack
+
 
-getter = Getter()
+def get_active_context():
+    """
+    There is no default context: the command line is only parsed by the
+    entry points, which activate the contexts they build.
+    """
+    context_stack = get_context_stack()
+    if not context_stack:
+        raise RuntimeError(consts.NO_ACTIVE_CONTEXT_MSG)
+    return context_stack[-1]
 
 
 class Container(object):
-    def __init__(self):
-        self._params = getter
+    def __init__(self, params=None):
+        if params is None:
+            params = getattr(self, "_params", None)
+        if params is None:
+            params = get_active_context()
+        self._params = params
 
     @property
     def params(self):
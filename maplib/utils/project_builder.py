@@ -0,0 +1,189 @@
+import argparse
+import concurrent.futures as ft
+import os
+import time
+
+import maplib.constants as consts
+
+from maplib.svg.main_project import Project
+from maplib.tools.file_tools import get_relative_path
+from maplib.tools.json_file_tools import JsonTools
+from maplib.tools.simple_functions import format_table
+from maplib.tools.simple_functions import remove_list_redundancies
+from maplib.utils.constructor import Constructor
+from maplib.utils.params_getter import RenderContext
+
+
+class ProjectBuilder(object):
+    """
+    Renders every (project, style) target in a pool of worker processes.
+    Before the pool starts, the glyph store (tex.bin) and the input cache
+    (input.bin) of every project are brought up to date, so that workers
+    only read them. New glyphs go through the tex cache, which is safe to
+    share between processes, and the journal; the journals are compacted
+    by the builder once all targets are done.
+    """
+    def __init__(self, project_city_names=None, max_workers=consts.BUILD_MAX_WORKERS):
+        if project_city_names is None:
+            project_city_names = RenderContext.get_possible_folder_names()
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.project_city_names = project_city_names
+        self.max_workers = max_workers
+        self.targets = [
+            (project_city_name, params_file_name)
+            for project_city_name in project_city_names
+            for params_file_name in ProjectBuilder.get_style_names(project_city_name)
+        ]
+        self.input_cache_hits = {}
+        self.results = {}
+        self.failures = {}
+
+    @staticmethod
+    def get_cmd_parser():
+        parser = argparse.ArgumentParser()
+        parser.add_argument(
+            "-p",
+            "--project",
+            nargs="+",
+            choices=RenderContext.get_possible_folder_names(),
+            help=consts.CMD_BUILD_PROJECT_HELP_MSG,
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=consts.BUILD_MAX_WORKERS,
+            help=consts.CMD_JOBS_HELP_MSG,
+        )
+        return parser
+
+    @staticmethod
+    def from_cmd(args=None):
+        if args is None:
+            args = ProjectBuilder.get_cmd_parser().parse_args()
+        return ProjectBuilder(args.project, args.jobs)
+
+    @staticmethod
+    def get_style_names(project_city_name):
+        """
+        Every python file in the project folder is a style file.
+        """
+        project_dir = os.path.join(consts.FILE_DIR, project_city_name)
+        return sorted([
+            file_name[:-len(".py")]
+            for file_name in os.listdir(project_dir)
+            if file_name.endswith(".py") and not file_name.startswith("_")
+        ])
+
+    @staticmethod
+    def prepare_project(context):
+        """
+        Loading the glyph store rebuilds tex.bin if it is out of date, and
+        Constructor rebuilds input.bin. Return whether the input cache was
+        up to date.
+        """
+        context.TEX_STORE
+        input_cache_hit = context.COMPILED_INPUT is not None
+        if not input_cache_hit:
+            with context.activate():
+                Constructor()
+        context.reset_databases()
+        return input_cache_hit
+
+    @staticmethod
+    def init_worker():
+        consts.OPEN_OUTPUT_FILE_AT_ONCE = False
+        consts.PRINT_TEX_WRITING_PROGRESS_MSG = False
+        consts.PRINT_FILE_MODIFYING_MSG = False
+        consts.PRINT_FILE_READY_MSG = False
+        consts.PRINT_TIMER_MSG = False
+        consts.TEX_JOURNAL_COMPACT_SIZE = float("inf")
+
+    @staticmethod
+    def build_target(project_city_name, params_file_name):
+        """
+        Runs in a worker. Return (seconds, output size, glyph hits, glyphs),
+        where the glyphs are the distinct tex strings of the map and the
+        hits are those already in the glyph database.
+        """
+        begin = time.perf_counter()
+        context = RenderContext(project_city_name, params_file_name)
+        project = Project(context)
+        seconds = time.perf_counter() - begin
+        tex_objs = [
+            tex_obj for tex_obj in remove_list_redundancies(project.global_tex_objs)
+            if not tex_obj.is_empty()
+        ]
+        context.reset_databases()
+        return seconds, os.path.getsize(context.OUTPUT_SVG_DIR), \
+            len(tex_objs) - len(project.generated_tex_objs), len(tex_objs)
+
+    def prepare_projects(self):
+        """
+        A project which fails to be prepared, e.g. for a broken input.json,
+        fails all of its targets, which are then skipped.
+        Return the names of the projects prepared.
+        """
+        prepared_project_city_names = []
+        for project_city_name in self.project_city_names:
+            try:
+                context = RenderContext(project_city_name)
+                self.input_cache_hits[project_city_name] = ProjectBuilder.prepare_project(context)
+            except Exception as error:
+                for target in self.targets:
+                    if target[0] == project_city_name:
+                        self.failures[target] = error
+                continue
+            prepared_project_city_names.append(project_city_name)
+        return prepared_project_city_names
+
+    def build(self):
+        prepared_project_city_names = self.prepare_projects()
+        with ft.ProcessPoolExecutor(self.max_workers, initializer=ProjectBuilder.init_worker) as executor:
+            future_dict = {
+                executor.submit(ProjectBuilder.build_target, *target): target
+                for target in self.targets
+                if target[0] in prepared_project_city_names
+            }
+            for future in ft.as_completed(future_dict):
+                target = future_dict[future]
+                try:
+                    self.results[target] = future.result()
+                except Exception as error:
+                    self.failures[target] = error
+        for project_city_name in prepared_project_city_names:
+            context = RenderContext(project_city_name)
+            if context.get_tex_journal().get_size() > consts.TEX_JOURNAL_COMPACT_SIZE:
+                JsonTools(context).compact_tex_json()
+        return self
+
+    def get_summary_table(self):
+        rows = []
+        for project_city_name, params_file_name in self.targets:
+            target = (project_city_name, params_file_name)
+            if target not in self.results:
+                continue
+            seconds, output_size, num_glyph_hits, num_glyphs = self.results[target]
+            rows.append([
+                project_city_name,
+                params_file_name,
+                "{0:.3f}".format(seconds),
+                output_size // 1024,
+                "hit" if self.input_cache_hits[project_city_name] else "miss",
+                "{0}/{1} ({2:.0%})".format(num_glyph_hits, num_glyphs, num_glyph_hits / max(num_glyphs, 1)),
+            ])
+        return format_table(
+            ("project", "style", "seconds", "output (KiB)", "input cache", "glyph hits"), rows
+        )
+
+    def print_report(self, seconds):
+        for (project_city_name, params_file_name), error in self.failures.items():
+            print(consts.BUILD_FAILED_MSG.format(
+                get_relative_path(os.path.join(consts.FILE_DIR, project_city_name, params_file_name)),
+                error
+            ))
+        if self.results:
+            print(self.get_summary_table())
+        print(consts.BUILD_SUMMARY_MSG.format(len(self.results), len(self.targets), seconds))
+        return self
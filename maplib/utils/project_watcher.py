@@ -0,0 +1,170 @@
+import hashlib
+import os
+import time
+
+import maplib.constants as consts
+
+from maplib.svg.main_project import Project
+from maplib.tools.file_tools import get_relative_path
+from maplib.utils.component_cache import ComponentCache
+
+
+class FileWatcher(object):
+    """
+    Polls files without any extra dependency. The stat of every file is
+    checked on each poll, a file is only hashed again if its mtime or
+    size has changed, and counts as changed if its hash differs.
+    """
+    def __init__(self, file_names):
+        self.file_names = []
+        self.stat_dict = {}
+        self.hash_dict = {}
+        self.add_file_names(file_names)
+
+    def add_file_names(self, file_names):
+        for file_name in file_names:
+            if file_name in self.stat_dict:
+                continue
+            self.file_names.append(file_name)
+            self.stat_dict[file_name] = FileWatcher.get_stat(file_name)
+            self.hash_dict[file_name] = FileWatcher.get_hash(file_name)
+        return self
+
+    @staticmethod
+    def get_stat(file_name):
+        try:
+            stat_result = os.stat(file_name)
+        except OSError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
+    @staticmethod
+    def get_hash(file_name):
+        try:
+            with open(file_name, "rb") as input_file:
+                return hashlib.sha256(input_file.read()).hexdigest()
+        except OSError:
+            return None
+
+    def get_changed_file_names(self):
+        changed_file_names = []
+        for file_name in self.file_names:
+            file_stat = FileWatcher.get_stat(file_name)
+            if file_stat == self.stat_dict[file_name]:
+                continue
+            self.stat_dict[file_name] = file_stat
+            file_hash = FileWatcher.get_hash(file_name)
+            if file_hash != self.hash_dict[file_name]:
+                self.hash_dict[file_name] = file_hash
+                changed_file_names.append(file_name)
+        return changed_file_names
+
+    def wait_for_changes(self, poll_interval=consts.WATCH_POLL_INTERVAL):
+        """
+        Blocks until some files have changed, then until they stay
+        unchanged for a poll, since an editor may save in several writes.
+        """
+        changed_file_names = []
+        while not changed_file_names:
+            time.sleep(poll_interval)
+            changed_file_names = self.get_changed_file_names()
+        while True:
+            time.sleep(poll_interval)
+            more_file_names = self.get_changed_file_names()
+            if not more_file_names:
+                return changed_file_names
+            changed_file_names.extend([
+                file_name for file_name in more_file_names
+                if file_name not in changed_file_names
+            ])
+
+
+class ProjectWatcher(object):
+    """
+    Keeps the contexts of the styles of a project warm, and renders them
+    again whenever input.json, a logo or a style file changes:
+        input.json: the network is reloaded, the styles are rendered
+            again with only the components depending on the changed
+            parts of the network rebuilt (see ComponentCache);
+        a logo: as above, with every component rebuilt;
+        a style file: only that style is loaded and rendered again.
+    The glyphs and the imports stay loaded all along.
+    """
+    def __init__(self, contexts):
+        for context in contexts:
+            context.component_cache = ComponentCache()
+        first_context = contexts[0]
+        self.contexts = contexts
+        self.input_file_names = [first_context.INPUT_JSON_DIR]
+        self.logo_file_names = [first_context.METRO_LOGO_DIR, *consts.LOGO_DIRS.values()]
+        self.file_watcher = FileWatcher([
+            *self.input_file_names,
+            *self.logo_file_names,
+            *[context.PARAMETERS_DIR for context in contexts],
+        ])
+
+    def watch(self):
+        print(consts.WATCH_START_MSG.format(get_relative_path(self.contexts[0].PROJECT_DIR)))
+        try:
+            while True:
+                changed_file_names = self.file_watcher.wait_for_changes()
+                self.update(changed_file_names)
+        except KeyboardInterrupt:
+            pass
+        return self
+
+    def update(self, changed_file_names):
+        begin = time.perf_counter()
+        for file_name in changed_file_names:
+            print(consts.WATCH_CHANGE_MSG.format(get_relative_path(file_name)))
+        first_context = self.contexts[0]
+        if any([file_name in self.logo_file_names for file_name in changed_file_names]):
+            for context in self.contexts:
+                context.component_cache.clear()
+        if any([
+            file_name in self.input_file_names or file_name in self.logo_file_names
+            for file_name in changed_file_names
+        ]):
+            first_context.reset_databases("INPUT_DATABASE_DICT", "COMPILED_INPUT")
+            rendered_contexts = list(self.contexts)
+        else:
+            rendered_contexts = []
+        for k, context in enumerate(self.contexts):
+            if context.PARAMETERS_DIR not in changed_file_names:
+                continue
+            try:
+                new_context = first_context.with_style(context.PARAMS_FILE_NAME)
+            except Exception as error:
+                print(consts.WATCH_ERROR_MSG.format(get_relative_path(context.PARAMETERS_DIR), error))
+                continue
+            new_context.component_cache = ComponentCache()
+            self.contexts[k] = new_context
+            if context in rendered_contexts:
+                rendered_contexts.remove(context)
+            rendered_contexts.append(new_context)
+        for context in rendered_contexts:
+            self.render(context)
+        print(consts.WATCH_CYCLE_MSG.format(time.perf_counter() - begin))
+        return self
+
+    def render(self, context):
+        component_cache = context.component_cache
+        num_hits = component_cache.num_hits
+        num_misses = component_cache.num_misses
+        begin = time.perf_counter()
+        try:
+            Project(context)
+            render_cache = context.get_render_cache()
+            render_cache.dump(render_cache.get_fingerprint())
+        except Exception as error:
+            print(consts.WATCH_ERROR_MSG.format(get_relative_path(context.OUTPUT_SVG_DIR), error))
+            return self
+        num_hits = component_cache.num_hits - num_hits
+        num_misses = component_cache.num_misses - num_misses
+        print(consts.WATCH_RENDER_MSG.format(
+            get_relative_path(context.OUTPUT_SVG_DIR),
+            time.perf_counter() - begin,
+            num_hits,
+            num_hits + num_misses,
+        ))
+        return self
@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+import threading
+
+
+class RenderRegistry(object):
+    """
+    What the components of one render register for the canvas, once, when
+    they are built, instead of handing it up through every append:
+        tex_objs: all tex objs, whose glyph paths go into the defs;
+        metro_objs: the metros of the map in the order of input.json, for
+            the side part, so that it does not read input.json again.
+    """
+    def __init__(self):
+        self.tex_objs = []
+        self.metro_objs = None
+
+    def add_tex_objs(self, tex_objs):
+        self.tex_objs.extend(tex_objs)
+        return self
+
+    def set_metro_objs(self, metro_objs):
+        self.metro_objs = metro_objs
+        return self
+
+    @contextmanager
+    def activate(self):
+        """
+        Components built inside the block (in the current thread) register
+        into this registry.
+        """
+        registry_stack = get_registry_stack()
+        registry_stack.append(self)
+        try:
+            yield self
+        finally:
+            registry_stack.pop()
+
+
+_local_data = threading.local()
+
+
+def get_registry_stack():
+    if not hasattr(_local_data, "registry_stack"):
+        _local_data.registry_stack = []
+    return _local_data.registry_stack
+
+
+def get_active_registry():
+    """
+    Return None outside of a render.
+    """
+    registry_stack = get_registry_stack()
+    if registry_stack:
+        return registry_stack[-1]
+    return None
+
+
+def register_tex_objs(tex_objs):
+    registry = get_active_registry()
+    if registry is not None:
+        registry.add_tex_objs(tex_objs)
+
+
+def register_metro_objs(metro_objs):
+    registry = get_active_registry()
+    if registry is not None:
+        registry.set_metro_objs(metro_objs)
+
+
+def get_registered_metro_objs():
+    """
+    Return None if no metros have been registered.
+    """
+    registry = get_active_registry()
+    if registry is None:
+        return None
+    return registry.metro_objs
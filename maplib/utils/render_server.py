@@ -0,0 +1,441 @@
+from collections import OrderedDict
+from collections import deque
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+import argparse
+import concurrent.futures as ft
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+import maplib.constants as consts
+
+from maplib.svg.main_project import Project
+from maplib.utils.params_getter import RenderContext
+from maplib.utils.project_builder import ProjectBuilder
+from maplib.utils.project_watcher import FileWatcher
+
+
+class RenderRequest(object):
+    """
+    What a client may ask for:
+        project, style: as in the command line;
+        overrides: {parameter name: json value}, see
+            RenderContext.apply_overrides;
+        lines: english names of the metros to keep, all of them if None;
+        highlight: english names of the metros to highlight, none if None.
+    """
+    def __init__(self, project=consts.DEFAULT_PROJECT_CITY_NAME, style=consts.DEFAULT_STYLE_FILE_NAME,
+            overrides=None, lines=None, highlight=None):
+        if project not in RenderContext.get_possible_folder_names():
+            raise ValueError(project)
+        if style not in ProjectBuilder.get_style_names(project):
+            raise ValueError(style)
+        if overrides is None:
+            overrides = {}
+        if not isinstance(overrides, dict):
+            raise ValueError(overrides)
+        self.project = project
+        self.style = style
+        self.overrides = overrides
+        self.lines = RenderRequest.get_metro_names(lines)
+        self.highlight = RenderRequest.get_metro_names(highlight)
+
+    @staticmethod
+    def get_metro_names(metro_names):
+        if metro_names is None:
+            return None
+        if isinstance(metro_names, str):
+            metro_names = metro_names.split(",")
+        if not isinstance(metro_names, list) or not all([isinstance(name, str) for name in metro_names]):
+            raise ValueError(metro_names)
+        return sorted(set([name.strip() for name in metro_names]))
+
+    @staticmethod
+    def from_query(query_str):
+        """
+        Every field is a query parameter, lines and highlight are separated
+        by commas and overrides is given as json.
+        """
+        query_dict = {key: vals[-1] for key, vals in parse_qs(query_str).items()}
+        if "overrides" in query_dict:
+            query_dict["overrides"] = json.loads(query_dict["overrides"])
+        return RenderRequest(**query_dict)
+
+    @staticmethod
+    def from_json(body_bytes):
+        request_dict = json.loads(body_bytes.decode(consts.UTF_8))
+        if not isinstance(request_dict, dict):
+            raise ValueError(request_dict)
+        return RenderRequest(**request_dict)
+
+    def get_fingerprint(self):
+        return hashlib.sha256(json.dumps([
+            self.project, self.style, self.overrides, self.lines, self.highlight
+        ], ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode(consts.UTF_8)).hexdigest()
+
+
+class RenderStats(object):
+    """
+    Counters of a render server, kept under a lock since requests are
+    handled in threads. Latencies are those of the last
+    RENDER_SERVER_LATENCY_WINDOW requests.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.begin_time = time.time()
+        self.counter_dict = {
+            "requests": 0,
+            "cache_hits": 0,
+            "renders": 0,
+            "errors": 0,
+            "in_flight": 0,
+        }
+        self.latencies = deque(maxlen=consts.RENDER_SERVER_LATENCY_WINDOW)
+        self.render_latencies = deque(maxlen=consts.RENDER_SERVER_LATENCY_WINDOW)
+
+    def add(self, key, val=1):
+        with self.lock:
+            self.counter_dict[key] += val
+        return self
+
+    def add_latency(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+        return self
+
+    def add_render_latency(self, seconds):
+        with self.lock:
+            self.render_latencies.append(seconds)
+        return self
+
+    @staticmethod
+    def get_latency_dict(latencies):
+        if not latencies:
+            return None
+        latency_array = np.array(latencies)
+        return {
+            "mean": float(latency_array.mean()),
+            "p50": float(np.percentile(latency_array, 50)),
+            "p95": float(np.percentile(latency_array, 95)),
+            "max": float(latency_array.max()),
+        }
+
+    def to_dict(self):
+        with self.lock:
+            uptime = time.time() - self.begin_time
+            status_dict = dict(self.counter_dict)
+            latencies = list(self.latencies)
+            render_latencies = list(self.render_latencies)
+        status_dict["uptime"] = uptime
+        status_dict["throughput"] = status_dict["requests"] / uptime if uptime > 0 else 0.0
+        status_dict["latency"] = RenderStats.get_latency_dict(latencies)
+        status_dict["render_latency"] = RenderStats.get_latency_dict(render_latencies)
+        return status_dict
+
+
+class RenderService(object):
+    """
+    Renders maps in memory for many requests:
+        the network and the glyphs of every project are loaded once into
+            a context, and shared by the contexts of all requests of it
+            (see RenderContext.with_style);
+        renders run in a pool of max_workers threads, identical requests
+            in flight share a render;
+        rendered svgs are kept by request fingerprint, at most cache_size
+            of them, the least recently used dropped first.
+    input.json, the logos and the style files are polled on every
+    request. Any change starts a new generation of the project: its svgs
+    and the renders in flight are dropped, and so is its network if
+    input.json or a logo changed. A render of an older generation is
+    neither cached nor returned.
+    The journal of new glyphs is not compacted by the service, since
+    compacting drops the glyph store under the renders running.
+    """
+    def __init__(self, max_workers=consts.RENDER_SERVER_MAX_WORKERS,
+            cache_size=consts.RENDER_SERVER_CACHE_SIZE):
+        self.executor = ft.ThreadPoolExecutor(max_workers)
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.svg_cache = OrderedDict()
+        self.future_dict = {}
+        self.base_context_dict = {}
+        self.file_watcher_dict = {}
+        self.input_file_names_dict = {}
+        self.generation_dict = {}
+        self.stats = RenderStats()
+
+    def get_base_context(self, project):
+        """
+        The context holding the databases of a project, made on first use.
+        """
+        with self.lock:
+            if project not in self.base_context_dict:
+                base_context = RenderContext(project)
+                input_file_names = [
+                    base_context.INPUT_JSON_DIR,
+                    base_context.METRO_LOGO_DIR,
+                    *consts.LOGO_DIRS.values(),
+                ]
+                self.base_context_dict[project] = base_context
+                self.input_file_names_dict[project] = input_file_names
+                self.file_watcher_dict[project] = FileWatcher(input_file_names)
+                self.generation_dict[project] = 0
+            return self.base_context_dict[project]
+
+    def check_changes(self, render_request):
+        """
+        Starts a new generation of the project of the request if any of
+        its files changed, see RenderService.
+        """
+        project = render_request.project
+        base_context = self.get_base_context(project)
+        with self.lock:
+            file_watcher = self.file_watcher_dict[project]
+            file_watcher.add_file_names([os.path.join(base_context.PROJECT_DIR, render_request.style + ".py")])
+            changed_file_names = file_watcher.get_changed_file_names()
+            if not changed_file_names:
+                return self
+            self.generation_dict[project] += 1
+            if any([file_name in self.input_file_names_dict[project] for file_name in changed_file_names]):
+                base_context.reset_databases("INPUT_DATABASE_DICT", "COMPILED_INPUT")
+            for cache_dict in (self.svg_cache, self.future_dict):
+                for fingerprint in [
+                    fingerprint for fingerprint, (project_name, generation, val) in cache_dict.items()
+                    if project_name == project
+                ]:
+                    cache_dict.pop(fingerprint)
+        return self
+
+    def is_current(self, project, generation):
+        """
+        Called under the lock.
+        """
+        return self.generation_dict[project] == generation
+
+    @staticmethod
+    def get_project_metro_names(base_context):
+        """
+        English names of the metros of a project, read from the input
+        cache when it is up to date, so that input.json is not parsed.
+        """
+        compiled_input = base_context.COMPILED_INPUT
+        if compiled_input is not None:
+            return set([metro_tuple[1][consts.ENG] for metro_tuple in compiled_input[0]["metros"]])
+        return set([metro_dict["name"][consts.ENG] for metro_dict in base_context.INPUT_DATABASE_DICT["metro_database"]])
+
+    def get_context(self, render_request):
+        """
+        Raise ValueError if the overrides do not apply, or if any of the
+        lines or the highlighted metros is not in the project.
+        """
+        base_context = self.get_base_context(render_request.project)
+        metro_names = set(render_request.lines or []) | set(render_request.highlight or [])
+        if metro_names:
+            unknown_metro_names = sorted(metro_names - RenderService.get_project_metro_names(base_context))
+            if unknown_metro_names:
+                raise ValueError(consts.UNKNOWN_METROS_MSG.format(", ".join(unknown_metro_names)))
+        context = base_context.with_style(render_request.style)
+        context.apply_overrides(render_request.overrides)
+        context.metro_subset = render_request.lines
+        context.highlighted_metros = render_request.highlight
+        return context
+
+    def render(self, context, fingerprint, generation):
+        """
+        Runs in the pool, the svg is cached before the render counts as
+        finished, so that no identical request renders it again, unless
+        the project has moved to a newer generation meanwhile.
+        """
+        project = context.PROJECT_CITY_NAME
+        begin = time.perf_counter()
+        try:
+            svg_bytes = Project(context, write_file=False, tex_journal_compact_size=float("inf")).to_bytes()
+            with self.lock:
+                if self.is_current(project, generation):
+                    self.svg_cache[fingerprint] = (project, generation, svg_bytes)
+                    while len(self.svg_cache) > self.cache_size:
+                        self.svg_cache.popitem(last=False)
+        finally:
+            with self.lock:
+                if self.future_dict.get(fingerprint, (None, None, None))[1] == generation:
+                    self.future_dict.pop(fingerprint)
+        self.stats.add_render_latency(time.perf_counter() - begin)
+        return svg_bytes
+
+    def get_svg(self, render_request):
+        """
+        Return (svg bytes, whether it was cached). A render finished after
+        the project has changed is not returned, the request is rendered
+        again in the new generation.
+        """
+        project = render_request.project
+        fingerprint = render_request.get_fingerprint()
+        while True:
+            self.check_changes(render_request)
+            with self.lock:
+                generation = self.generation_dict[project]
+                if fingerprint in self.svg_cache:
+                    self.svg_cache.move_to_end(fingerprint)
+                    return self.svg_cache[fingerprint][2], True
+                future = self.future_dict.get(fingerprint, (None, None, None))[2]
+            if future is None:
+                context = self.get_context(render_request)
+                with self.lock:
+                    if not self.is_current(project, generation):
+                        continue
+                    future = self.future_dict.get(fingerprint, (None, None, None))[2]
+                    if future is None:
+                        future = self.executor.submit(self.render, context, fingerprint, generation)
+                        self.future_dict[fingerprint] = (project, generation, future)
+                        self.stats.add("renders")
+            svg_bytes = future.result()
+            with self.lock:
+                if self.is_current(project, generation):
+                    return svg_bytes, False
+
+    def get_status(self):
+        status_dict = self.stats.to_dict()
+        with self.lock:
+            status_dict["cached_svgs"] = len(self.svg_cache)
+            status_dict["projects"] = sorted(self.base_context_dict.keys())
+        return status_dict
+
+    def shutdown(self):
+        self.executor.shutdown()
+        for base_context in self.base_context_dict.values():
+            base_context.reset_databases()
+        return self
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /render?project=...&style=...&lines=...&highlight=...&overrides=...
+        returns the svg, see RenderRequest.from_query;
+    POST /render with a json object of the same fields
+        returns the svg;
+    GET /status
+        returns the counters of the service as json.
+    A request which cannot be understood gets 400, a failed render 500.
+    """
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/status":
+            self.send_body(200, "application/json", self.get_json_bytes(self.server.service.get_status()))
+        elif url.path == "/render":
+            self.handle_render(lambda: RenderRequest.from_query(url.query))
+        else:
+            self.send_error_json(404, url.path)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != "/render":
+            self.send_error_json(404, url.path)
+            return
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            if content_length < 0:
+                raise ValueError(content_length)
+        except ValueError as error:
+            self.server.service.stats.add("errors")
+            self.send_error_json(400, error)
+            return
+        body_bytes = self.rfile.read(content_length)
+        self.handle_render(lambda: RenderRequest.from_json(body_bytes))
+
+    def handle_render(self, request_func):
+        stats = self.server.service.stats
+        begin = time.perf_counter()
+        stats.add("requests")
+        stats.add("in_flight")
+        try:
+            try:
+                svg_bytes, cached = self.server.service.get_svg(request_func())
+            except (ValueError, TypeError) as error:
+                stats.add("errors")
+                self.send_error_json(400, error)
+                return
+            except Exception as error:
+                stats.add("errors")
+                self.send_error_json(500, error)
+                return
+            if cached:
+                stats.add("cache_hits")
+            self.send_body(200, "image/svg+xml", svg_bytes, {"X-Render-Cache": "hit" if cached else "miss"})
+        finally:
+            stats.add("in_flight", -1)
+            stats.add_latency(time.perf_counter() - begin)
+
+    @staticmethod
+    def get_json_bytes(obj):
+        return json.dumps(obj, ensure_ascii=False, sort_keys=True).encode(consts.UTF_8)
+
+    def send_error_json(self, code, error):
+        self.send_body(code, "application/json", self.get_json_bytes({"error": str(error)}))
+
+    def send_body(self, code, content_type, body_bytes, header_dict=None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body_bytes)))
+        if header_dict is not None:
+            for key, val in header_dict.items():
+                self.send_header(key, val)
+        self.end_headers()
+        self.wfile.write(body_bytes)
+
+    def log_message(self, format, *args):
+        if consts.PRINT_RENDER_SERVER_LOG:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class RenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host=consts.RENDER_SERVER_HOST, port=consts.RENDER_SERVER_PORT,
+            max_workers=consts.RENDER_SERVER_MAX_WORKERS, cache_size=consts.RENDER_SERVER_CACHE_SIZE):
+        ThreadingHTTPServer.__init__(self, (host, port), RenderRequestHandler)
+        self.service = RenderService(max_workers, cache_size)
+
+    @staticmethod
+    def get_cmd_parser():
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--host", default=consts.RENDER_SERVER_HOST)
+        parser.add_argument("--port", type=int, default=consts.RENDER_SERVER_PORT)
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=consts.RENDER_SERVER_MAX_WORKERS,
+            help=consts.CMD_RENDER_JOBS_HELP_MSG,
+        )
+        parser.add_argument(
+            "--cache-size",
+            type=int,
+            default=consts.RENDER_SERVER_CACHE_SIZE,
+            help=consts.CMD_CACHE_SIZE_HELP_MSG,
+        )
+        return parser
+
+    @staticmethod
+    def from_cmd(args=None):
+        if args is None:
+            args = RenderServer.get_cmd_parser().parse_args()
+        return RenderServer(args.host, args.port, args.jobs, args.cache_size)
+
+    def serve(self):
+        host, port = self.server_address[:2]
+        print(consts.RENDER_SERVER_START_MSG.format(host, port))
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
+            self.service.shutdown()
+        return self
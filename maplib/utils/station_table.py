@@ -0,0 +1,158 @@
+import numpy as np
+
+import maplib.constants as consts
+
+from maplib.tools.numpy_type_tools import np_to_int_coords
+
+
+class NameTable(object):
+    """
+    Interned (station_name_eng, station_name_chn) pairs, shared by all
+    station tables of a map.
+    """
+    def __init__(self):
+        self.names_list = []
+        self.index_dict = {}
+
+    def get_index(self, names):
+        index = self.index_dict.get(names)
+        if index is None:
+            index = len(self.names_list)
+            self.names_list.append(names)
+            self.index_dict[names] = index
+        return index
+
+    def get_names(self, index):
+        return self.names_list[index]
+
+
+class StationTable(object):
+    """
+    Stations stored in columns of a structured array:
+    x, y: the given coord;
+    key_x, key_y: the coord rounded by np_to_tuple, which identifies a station;
+    direction: simplified_direction;
+    label_direction: label_simple_direction, -1 for None;
+    sign: "*", "#", "^", or "" for None;
+    name_index: of the names in the name table;
+    metro_index: of the parent metro in the input, -1 if not set.
+    """
+    dtype = np.dtype([
+        ("x", "float64"),
+        ("y", "float64"),
+        ("key_x", "int64"),
+        ("key_y", "int64"),
+        ("direction", "int8"),
+        ("label_direction", "int8"),
+        ("sign", "U1"),
+        ("name_index", "int64"),
+        ("metro_index", "int64"),
+    ])
+
+    def __init__(self, rows, name_table):
+        self.rows = rows
+        self.name_table = name_table
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def from_columns(columns, name_table):
+        """
+        columns: (x_coords, y_coords, simplified_directions,
+        label_simple_directions, signs, station_names_eng,
+        station_names_chn), see Constructor.get_stations_data.
+        A sign longer than the sign column is an error rather than cut.
+        """
+        x_coords, y_coords, directions, label_directions, signs, names_eng, names_chn = columns
+        for sign, station_name_eng in zip(signs, names_eng):
+            if sign is not None and len(sign) > 1:
+                raise ValueError(consts.STATION_SIGN_ERROR_MSG.format(sign, station_name_eng))
+        rows = np.zeros(len(x_coords), dtype=StationTable.dtype)
+        rows["x"] = x_coords
+        rows["y"] = y_coords
+        rows["direction"] = directions
+        rows["label_direction"] = [-1 if val is None else val for val in label_directions]
+        rows["sign"] = ["" if sign is None else sign for sign in signs]
+        rows["name_index"] = [
+            name_table.get_index(names)
+            for names in zip(names_eng, names_chn)
+        ]
+        key_coords = np_to_int_coords(np.stack([rows["x"], rows["y"]], axis=1))
+        rows["key_x"] = key_coords[:, 0]
+        rows["key_y"] = key_coords[:, 1]
+        rows["metro_index"] = -1
+        return StationTable(rows, name_table)
+
+    @staticmethod
+    def from_stations_data(stations_data, name_table):
+        """
+        stations_data is a list of rows in the format of the columns.
+        """
+        columns = list(zip(*stations_data)) if stations_data else [()] * 7
+        return StationTable.from_columns(columns, name_table)
+
+    def get_stations_data(self):
+        """
+        The rows in the format of Constructor.string_to_vals.
+        """
+        names_list = [
+            self.name_table.get_names(name_index)
+            for name_index in self.rows["name_index"].tolist()
+        ]
+        return [
+            [x, y, direction, None if label_direction < 0 else label_direction,
+                sign if sign else None, station_name_eng, station_name_chn]
+            for x, y, direction, label_direction, sign, (station_name_eng, station_name_chn) in zip(
+                self.rows["x"].tolist(),
+                self.rows["y"].tolist(),
+                self.rows["direction"].tolist(),
+                self.rows["label_direction"].tolist(),
+                self.rows["sign"].tolist(),
+                names_list,
+            )
+        ]
+
+    @staticmethod
+    def concatenate(tables, name_table):
+        return StationTable(np.concatenate([table.rows for table in tables]), name_table)
+
+    def take(self, indexes):
+        return StationTable(self.rows[np.asarray(indexes, dtype="int64")], self.name_table)
+
+    def get_coords(self):
+        return np.stack([self.rows["x"], self.rows["y"]], axis=1)
+
+    def get_keys(self):
+        return list(zip(self.rows["key_x"].tolist(), self.rows["key_y"].tolist()))
+
+    def get_signs(self):
+        return [sign if sign else None for sign in self.rows["sign"].tolist()]
+
+    def get_last_indexes_by_key(self):
+        """
+        The index of the last row of each key, ordered by the first row
+        of each key, in the way of updating a dict keyed by the coord.
+        """
+        index_dict = {}
+        for k, key in enumerate(self.get_keys()):
+            index_dict[key] = k
+        return list(index_dict.values())
+
+    def get_station_data(self, indexes):
+        """
+        Return (metro_indexes, station_names_eng, station_names_chn,
+        label_simple_directions) of the given rows.
+        """
+        rows = self.rows[np.asarray(indexes, dtype="int64")]
+        names_list = [
+            self.name_table.get_names(name_index)
+            for name_index in rows["name_index"].tolist()
+        ]
+        station_names_eng, station_names_chn = zip(*names_list)
+        label_simple_directions = [
+            None if val < 0 else val
+            for val in rows["label_direction"].tolist()
+        ]
+        return rows["metro_index"].tolist(), station_names_eng, station_names_chn, \
+            label_simple_directions
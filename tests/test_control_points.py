@@ -0,0 +1,41 @@
+import numpy as np
+
+from maplib.utils.models import Metro
+
+
+def get_metro(direction_dict, loop=False):
+    metro = Metro.__new__(Metro)
+    metro.loop = loop
+    metro.coord_to_direction_dict = dict(direction_dict)
+    return metro
+
+
+def get_pair_by_pair_control_points(metro, station_coords):
+    control_points = []
+    for point1, point2 in zip(station_coords[:-1], station_coords[1:]):
+        control_points = metro.update_control_point(point1, point2, control_points)
+    return [station_coords[0], *control_points, station_coords[-1]]
+
+
+def test_solved_control_points_match_pair_by_pair():
+    direction_dict = {(0, 0): 0, (4, 2): 0, (8, 0): 1}
+    station_coords = [np.array(key, dtype=float) for key in direction_dict]
+    solved = get_metro(direction_dict).compute_control_points(station_coords)
+    expected = get_pair_by_pair_control_points(get_metro(direction_dict), station_coords)
+    np.testing.assert_allclose(np.array(solved), np.array(expected))
+
+
+def test_midpoint_on_last_station_falls_back_to_pair_by_pair():
+    """
+    The bypass midpoint of the first pair is the last station, which is
+    only among the second points of the pairs.
+    """
+    direction_dict = {(0, 0): 0, (4, 2): 0, (2, 1): 2}
+    station_coords = [np.array(key, dtype=float) for key in direction_dict]
+    metro = get_metro(direction_dict)
+    pairs = list(zip(station_coords[:-1], station_coords[1:]))
+    assert metro.solve_control_points(pairs) is None
+    assert metro.coord_to_direction_dict == direction_dict
+    solved = metro.compute_control_points(station_coords)
+    expected = get_pair_by_pair_control_points(get_metro(direction_dict), station_coords)
+    np.testing.assert_allclose(np.array(solved), np.array(expected))
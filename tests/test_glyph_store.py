@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+import maplib.constants as consts
+
+from maplib.tools.glyph_store import GlyphStore
+
+
+PATH_STRING = "M5.092496 -6.761995H2.540998C1.259999 -6.761995 1.238999 -6.898495 1.196999 -7.097995Z"
+
+
+def get_global_tex_dict():
+    global_tex_dict = {
+        "file": {font_type: {} for font_type in consts.TEX_FONT_CMDS},
+        "path": {font_type: {} for font_type in consts.TEX_FONT_CMDS},
+    }
+    for k, string in enumerate(["A", "10号线", "Line 2"]):
+        global_tex_dict["file"]["heiti"][string] = {"h": str(k), "v": "0 0 1 1", "x": "0", "y": 0}
+        global_tex_dict["path"]["heiti"][str(k)] = PATH_STRING
+    return global_tex_dict
+
+
+@pytest.fixture
+def json_file_name(tmp_path):
+    file_name = str(tmp_path / "tex.json")
+    with open(file_name, "w", encoding=consts.UTF_8) as output_file:
+        json.dump(get_global_tex_dict(), output_file, ensure_ascii=False)
+    return file_name
+
+
+@pytest.fixture
+def store_file_name(tmp_path):
+    return str(tmp_path / "tex.bin")
+
+
+def test_round_trip(json_file_name, store_file_name):
+    store = GlyphStore.open_from_json_file(store_file_name, json_file_name)
+    global_tex_dict = get_global_tex_dict()
+    assert store.to_dict() == global_tex_dict
+    for string, tex_file_dict in global_tex_dict["file"]["heiti"].items():
+        assert store.get_file_dict("heiti", string) == tex_file_dict
+    assert store.get_path_string("heiti", "0") == PATH_STRING
+    store.close()
+
+
+def test_missing_records(json_file_name, store_file_name):
+    store = GlyphStore.open_from_json_file(store_file_name, json_file_name)
+    assert store.get_file_dict("heiti", "B") is None
+    assert store.get_file_dict("songti", "A") is None
+    assert store.get_outline("heiti", "3") is None
+    store.close()
+
+
+def test_empty_store(store_file_name):
+    GlyphStore.write({"file": {}, "path": {}}, store_file_name)
+    store = GlyphStore(store_file_name)
+    assert store.num_records == 0
+    assert store.get_file_dict("heiti", "A") is None
+    store.close()
+
+
+def test_rebuilt_when_json_changes_with_the_same_time(json_file_name, store_file_name):
+    GlyphStore.open_from_json_file(store_file_name, json_file_name).close()
+    json_stat = os.stat(json_file_name)
+    global_tex_dict = get_global_tex_dict()
+    global_tex_dict["file"]["heiti"]["B"] = {"h": "0", "v": "0 0 1 1", "x": "0", "y": 0}
+    with open(json_file_name, "w", encoding=consts.UTF_8) as output_file:
+        json.dump(global_tex_dict, output_file, ensure_ascii=False)
+    os.utime(json_file_name, ns=(json_stat.st_atime_ns, json_stat.st_mtime_ns - 10 ** 9))
+    store = GlyphStore.open_from_json_file(store_file_name, json_file_name)
+    assert store.get_file_dict("heiti", "B") is not None
+    store.close()
+
+
+def test_reused_when_json_is_unchanged(json_file_name, store_file_name):
+    GlyphStore.open_from_json_file(store_file_name, json_file_name).close()
+    modified_time = os.path.getmtime(store_file_name)
+    os.utime(json_file_name)
+    store = GlyphStore.open_from_json_file(store_file_name, json_file_name)
+    assert os.path.getmtime(store_file_name) == modified_time
+    store.close()
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda store_bytes: b"",
+    lambda store_bytes: store_bytes[:20],
+    lambda store_bytes: store_bytes[:-3],
+    lambda store_bytes: b"MMLTEX02" + store_bytes[8:],
+])
+def test_corrupt_store_is_rejected_and_rebuilt(json_file_name, store_file_name, corrupt):
+    GlyphStore.open_from_json_file(store_file_name, json_file_name).close()
+    with open(store_file_name, "rb") as input_file:
+        store_bytes = input_file.read()
+    with open(store_file_name, "wb") as output_file:
+        output_file.write(corrupt(store_bytes))
+    with pytest.raises(ValueError):
+        GlyphStore(store_file_name)
+    store = GlyphStore.open_from_json_file(store_file_name, json_file_name)
+    assert store.to_dict() == get_global_tex_dict()
+    store.close()
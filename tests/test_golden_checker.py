@@ -0,0 +1,46 @@
+import pytest
+
+import maplib.constants as consts
+import maplib.utils.golden_checker as golden_checker
+
+from maplib.utils.golden_checker import GoldenChecker
+
+
+class FakeProject(object):
+    const_vals_list = []
+    error = None
+
+    def __init__(self, context, write_file=True):
+        FakeProject.const_vals_list.append([
+            getattr(consts, const_name) for const_name in GoldenChecker.disabled_const_names
+        ])
+        if FakeProject.error is not None:
+            raise FakeProject.error
+
+    def to_bytes(self):
+        return b"<svg xmlns=\"http://www.w3.org/2000/svg\"/>"
+
+
+@pytest.fixture
+def fake_project(monkeypatch):
+    monkeypatch.setattr(golden_checker, "Project", FakeProject)
+    monkeypatch.setattr(FakeProject, "const_vals_list", [])
+    monkeypatch.setattr(FakeProject, "error", None)
+    for const_name in GoldenChecker.disabled_const_names:
+        monkeypatch.setattr(consts, const_name, True)
+    return FakeProject
+
+
+def test_consts_are_disabled_during_the_check_only(fake_project):
+    checker = GoldenChecker(["Shanghai"]).check()
+    assert fake_project.const_vals_list
+    assert all([not any(const_vals) for const_vals in fake_project.const_vals_list])
+    assert all([getattr(consts, const_name) for const_name in GoldenChecker.disabled_const_names])
+    assert [result[3] for result in checker.results] == ["differs"] * len(checker.results)
+
+
+def test_consts_are_restored_after_an_error(fake_project):
+    fake_project.error = KeyError("tex")
+    with pytest.raises(KeyError):
+        GoldenChecker(["Shanghai"]).check()
+    assert all([getattr(consts, const_name) for const_name in GoldenChecker.disabled_const_names])
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from maplib.tools.input_cache import InputCache
+
+
+HEADER = {"metros": [["Line 1", "l"]], "stations": [], "names": {}, "geography": {}, "marks": {}}
+
+
+def get_arrays():
+    return {
+        "control_points": np.arange(8, dtype="float64").reshape(4, 2),
+        "route_sizes": np.array([4], dtype="int64"),
+    }
+
+
+@pytest.fixture
+def input_cache(tmp_path):
+    source_file_name = tmp_path / "input.json"
+    source_file_name.write_text("{}")
+    return InputCache(str(tmp_path / "input.bin"), [str(source_file_name)])
+
+
+def test_round_trip(input_cache):
+    fingerprint = input_cache.get_fingerprint()
+    assert input_cache.load(fingerprint) is None
+    input_cache.dump(fingerprint, HEADER, get_arrays())
+    header, arrays = input_cache.load(fingerprint)
+    assert header == dict(HEADER, fingerprint=fingerprint)
+    assert set(arrays) == set(get_arrays())
+    for key, array in get_arrays().items():
+        np.testing.assert_array_equal(arrays[key], array)
+        assert arrays[key].dtype == array.dtype
+
+
+def test_source_change_misses(input_cache):
+    input_cache.dump(input_cache.get_fingerprint(), HEADER, get_arrays())
+    with open(input_cache.source_file_names[0], "w") as output_file:
+        output_file.write("{\"metro_database\": []}")
+    assert input_cache.load(input_cache.get_fingerprint()) is None
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda cache_bytes: b"",
+    lambda cache_bytes: b"not a zip file",
+    lambda cache_bytes: cache_bytes[:len(cache_bytes) // 2],
+    lambda cache_bytes: cache_bytes[:-30],
+])
+def test_corrupt_cache_misses(input_cache, corrupt):
+    fingerprint = input_cache.get_fingerprint()
+    input_cache.dump(fingerprint, HEADER, get_arrays())
+    with open(input_cache.file_name, "rb") as input_file:
+        cache_bytes = input_file.read()
+    with open(input_cache.file_name, "wb") as output_file:
+        output_file.write(corrupt(cache_bytes))
+    assert input_cache.load(fingerprint) is None
+
+
+def test_missing_header_misses(input_cache):
+    np.savez(open(input_cache.file_name, "wb"), **get_arrays())
+    assert input_cache.load(input_cache.get_fingerprint()) is None
@@ -0,0 +1,20 @@
+import pytest
+
+from maplib.tools.job_scheduler import JobScheduler
+
+
+def parse_job(job):
+    return int(job)
+
+
+def test_failed_jobs_are_recorded():
+    scheduler = JobScheduler(max_workers=2, error_types=(ValueError,))
+    assert scheduler.map(parse_job, ["1", "x", "3"]) == [1, None, 3]
+    assert [job for job, error in scheduler.failures] == ["x"]
+    assert len(scheduler.get_report()) == 1
+
+
+def test_other_errors_are_raised():
+    scheduler = JobScheduler(max_workers=2)
+    with pytest.raises(ValueError):
+        scheduler.map(parse_job, ["1", "x"])
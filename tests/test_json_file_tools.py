@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+
+from maplib.tools.json_file_tools import JsonTools
+
+
+def test_global_tex_dict_is_a_copy():
+    shared_global_tex_dict = {
+        "file": {"heiti": {"A": {"h": "0"}}},
+        "path": {"heiti": {"0": "M0 0Z"}},
+    }
+    tool = JsonTools(SimpleNamespace(GLOBAL_TEX_DICT=shared_global_tex_dict))
+    global_tex_dict = tool.get_global_tex_dict()
+    assert global_tex_dict == shared_global_tex_dict
+    global_tex_dict["file"]["heiti"]["B"] = {"h": "1"}
+    global_tex_dict["path"]["heiti"].pop("0")
+    assert shared_global_tex_dict == {
+        "file": {"heiti": {"A": {"h": "0"}}},
+        "path": {"heiti": {"0": "M0 0Z"}},
+    }
@@ -0,0 +1,51 @@
+import concurrent.futures as ft
+
+import pytest
+
+import maplib.utils.project_builder as project_builder
+
+from maplib.utils.project_builder import ProjectBuilder
+
+
+class FakeTexJournal(object):
+    def get_size(self):
+        return 0
+
+
+class FakeRenderContext(object):
+    def __init__(self, project_city_name, params_file_name=None):
+        self.project_city_name = project_city_name
+
+    def get_tex_journal(self):
+        return FakeTexJournal()
+
+
+def prepare_project(context):
+    if context.project_city_name == "Broken":
+        raise KeyError("name")
+    return True
+
+
+def build_target(project_city_name, params_file_name):
+    return 0.0, 0, 0, 0
+
+
+@pytest.fixture
+def fake_builder(monkeypatch):
+    monkeypatch.setattr(project_builder, "RenderContext", FakeRenderContext)
+    monkeypatch.setattr(ProjectBuilder, "get_style_names", staticmethod(
+        lambda project_city_name: ["dark_style", "default_style"]
+    ))
+    monkeypatch.setattr(ProjectBuilder, "prepare_project", staticmethod(prepare_project))
+    monkeypatch.setattr(ProjectBuilder, "build_target", staticmethod(build_target))
+    monkeypatch.setattr(ProjectBuilder, "init_worker", staticmethod(lambda: None))
+    monkeypatch.setattr(ft, "ProcessPoolExecutor", ft.ThreadPoolExecutor)
+
+
+def test_broken_project_does_not_stop_the_others(fake_builder):
+    builder = ProjectBuilder(["Broken", "Good"], max_workers=2).build()
+    assert set(builder.results) == {("Good", "dark_style"), ("Good", "default_style")}
+    assert set(builder.failures) == {("Broken", "dark_style"), ("Broken", "default_style")}
+    assert all([isinstance(error, KeyError) for error in builder.failures.values()])
+    assert builder.input_cache_hits == {"Good": True}
+    builder.print_report(0.0)
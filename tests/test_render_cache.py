@@ -0,0 +1,59 @@
+import pytest
+
+import maplib.constants as consts
+
+from maplib.tools.render_cache import RenderCache
+
+
+@pytest.fixture
+def render_cache(tmp_path):
+    source_file_name = tmp_path / "input.json"
+    source_file_name.write_text("{}")
+    output_file_name = tmp_path / "output.svg"
+    output_file_name.write_bytes(b"<svg/>")
+    return RenderCache(
+        str(tmp_path / "output-cache.json"),
+        str(output_file_name),
+        [str(source_file_name), str(tmp_path / "tex.journal")],
+    )
+
+
+def test_hit_after_dump(render_cache):
+    assert render_cache.load(render_cache.get_fingerprint()) is None
+    render_cache.dump(render_cache.get_fingerprint())
+    assert render_cache.load(render_cache.get_fingerprint()) is not None
+
+
+def test_source_change_misses(render_cache):
+    render_cache.dump(render_cache.get_fingerprint())
+    with open(render_cache.source_file_names[0], "w") as output_file:
+        output_file.write("{\"a\": 1}")
+    assert render_cache.load(render_cache.get_fingerprint()) is None
+
+
+def test_new_source_file_misses(render_cache):
+    render_cache.dump(render_cache.get_fingerprint())
+    with open(render_cache.source_file_names[1], "w") as output_file:
+        output_file.write("")
+    assert render_cache.load(render_cache.get_fingerprint()) is None
+
+
+def test_runtime_const_change_misses(render_cache, monkeypatch):
+    render_cache.dump(render_cache.get_fingerprint())
+    monkeypatch.setattr(consts, "ENABLE_TEX_GENERATION", not consts.ENABLE_TEX_GENERATION)
+    assert render_cache.load(render_cache.get_fingerprint()) is None
+
+
+@pytest.mark.parametrize("output_bytes", [b"<svg></svg>", b"<svg/ "])
+def test_modified_output_misses(render_cache, output_bytes):
+    render_cache.dump(render_cache.get_fingerprint())
+    with open(render_cache.output_file_name, "wb") as output_file:
+        output_file.write(output_bytes)
+    assert render_cache.load(render_cache.get_fingerprint()) is None
+
+
+@pytest.mark.parametrize("cache_str", ["", "{", "[]", "{\"fingerprint\": 1}"])
+def test_corrupt_cache_file_misses(render_cache, cache_str):
+    with open(render_cache.file_name, "w") as output_file:
+        output_file.write(cache_str)
+    assert render_cache.load(render_cache.get_fingerprint()) is None
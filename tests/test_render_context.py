@@ -0,0 +1,17 @@
+import pytest
+
+from maplib.utils.params_getter import Container
+from maplib.utils.params_getter import RenderContext
+
+
+def test_container_without_context_is_an_error():
+    with pytest.raises(RuntimeError, match="activate"):
+        Container()
+
+
+def test_container_gets_the_active_context():
+    context = RenderContext("Shanghai", "default_style")
+    with context.activate():
+        assert Container().params is context
+    other_context = context.with_style("darcula_style")
+    assert Container(other_context).params is other_context
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+import maplib.utils.render_server as render_server
+
+from maplib.utils.render_server import RenderRequest
+from maplib.utils.render_server import RenderService
+
+
+class FakeProject(object):
+    """
+    Stands in for Project, the svg is the current version, and the render
+    waits for release if blocking.
+    """
+    version = 1
+    blocking = False
+    started = threading.Event()
+    release = threading.Event()
+
+    def __init__(self, context, write_file=True, tex_journal_compact_size=None):
+        self.version = FakeProject.version
+
+    def to_bytes(self):
+        if FakeProject.blocking:
+            FakeProject.started.set()
+            FakeProject.release.wait(10)
+        return str(self.version).encode()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(render_server, "Project", FakeProject)
+    FakeProject.version = 1
+    FakeProject.blocking = False
+    FakeProject.started.clear()
+    FakeProject.release.clear()
+    service = RenderService(max_workers=2)
+    yield service
+    FakeProject.release.set()
+    service.executor.shutdown()
+
+
+def change_files(service, project, file_names):
+    file_watcher = service.file_watcher_dict[project]
+    original_func = file_watcher.get_changed_file_names
+    file_watcher.get_changed_file_names = lambda: file_names
+    service.check_changes(RenderRequest(project))
+    file_watcher.get_changed_file_names = original_func
+
+
+def test_cache_hit(service):
+    render_request = RenderRequest()
+    assert service.get_svg(render_request) == (b"1", False)
+    assert service.get_svg(render_request) == (b"1", True)
+    assert service.stats.counter_dict["renders"] == 1
+
+
+def test_style_change_keeps_network(service):
+    render_request = RenderRequest()
+    service.get_svg(render_request)
+    base_context = service.get_base_context(render_request.project)
+    base_context.databases["INPUT_DATABASE_DICT"] = "network"
+    FakeProject.version = 2
+    change_files(service, render_request.project, [base_context.PARAMETERS_DIR])
+    assert service.get_svg(render_request) == (b"2", False)
+    assert base_context.databases["INPUT_DATABASE_DICT"] == "network"
+
+
+def test_input_change_drops_network(service):
+    render_request = RenderRequest()
+    service.get_svg(render_request)
+    base_context = service.get_base_context(render_request.project)
+    base_context.databases["INPUT_DATABASE_DICT"] = "network"
+    FakeProject.version = 2
+    change_files(service, render_request.project, [base_context.INPUT_JSON_DIR])
+    assert "INPUT_DATABASE_DICT" not in base_context.databases
+    assert service.get_svg(render_request) == (b"2", False)
+
+
+def test_render_of_older_generation_is_dropped(service):
+    render_request = RenderRequest()
+    results = []
+    FakeProject.blocking = True
+    thread = threading.Thread(target=lambda: results.append(service.get_svg(render_request)))
+    thread.start()
+    assert FakeProject.started.wait(10)
+    base_context = service.get_base_context(render_request.project)
+    FakeProject.version = 2
+    change_files(service, render_request.project, [base_context.INPUT_JSON_DIR])
+    FakeProject.blocking = False
+    FakeProject.release.set()
+    thread.join(10)
+    assert results == [(b"2", False)]
+    assert service.get_svg(render_request) == (b"2", True)
+    assert service.stats.counter_dict["renders"] == 2
+
+
+def test_unknown_lines_are_rejected(service):
+    with pytest.raises(ValueError, match="Nope, Nope 2"):
+        service.get_svg(RenderRequest(lines="Line 1,Nope", highlight="Nope 2"))
+    assert service.stats.counter_dict["renders"] == 0
+    assert service.get_svg(RenderRequest(lines="Line 1", highlight="Line 1")) == (b"1", False)
@@ -0,0 +1,42 @@
+import pytest
+
+from maplib.utils.station_table import NameTable
+from maplib.utils.station_table import StationTable
+
+
+STATIONS_DATA = [
+    [0.0, 0.0, 0, None, None, "A", "a"],
+    [2.5, 1.0, 1, 3, "*", "B", "b"],
+    [-0.5, 4.0, 2, 7, "#", "A", "a"],
+]
+
+
+def test_stations_data_round_trip():
+    name_table = NameTable()
+    station_table = StationTable.from_stations_data(STATIONS_DATA, name_table)
+    assert station_table.get_stations_data() == STATIONS_DATA
+    assert station_table.get_signs() == [None, "*", "#"]
+    assert len(name_table.names_list) == 2
+
+
+def test_keys_are_rounded_coords():
+    station_table = StationTable.from_stations_data(STATIONS_DATA, NameTable())
+    assert station_table.get_keys() == [(0, 0), (3, 1), (-1, 4)]
+
+
+def test_last_indexes_by_key():
+    stations_data = [*STATIONS_DATA, [0.0, 0.0, 0, None, None, "C", "c"]]
+    station_table = StationTable.from_stations_data(stations_data, NameTable())
+    assert station_table.get_last_indexes_by_key() == [3, 1, 2]
+
+
+def test_empty_table():
+    station_table = StationTable.from_stations_data([], NameTable())
+    assert len(station_table) == 0
+    assert station_table.get_stations_data() == []
+
+
+def test_long_sign_is_an_error():
+    stations_data = [[0.0, 0.0, 0, None, "**", "Long Sign Road", "a"]]
+    with pytest.raises(ValueError, match="Long Sign Road"):
+        StationTable.from_stations_data(stations_data, NameTable())
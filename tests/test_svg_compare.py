@@ -0,0 +1,53 @@
+import pytest
+
+from maplib.tools.svg_compare import compare_svg_bytes
+from maplib.tools.svg_compare import get_val_difference
+from maplib.tools.svg_compare import split_nums
+
+
+def test_split_nums():
+    assert split_nums("M1 -0.5L.25 2e-3") == (["M", " ", "L", " ", ""], [1.0, -0.5, 0.25, 0.002])
+
+
+@pytest.mark.parametrize("val, golden_val", [
+    ("M1 -0.0", "M1.00001 0"),
+    ("translate(3.00005,4)", "translate(3,4)"),
+    ("fill:#fff", "fill:#fff"),
+])
+def test_equal_within_tolerance(val, golden_val):
+    assert get_val_difference(val, golden_val, 1e-4) is None
+
+
+@pytest.mark.parametrize("val, golden_val, description", [
+    ("M1 2", "M1 2.001", "number 1: 2.0 != 2.001"),
+    ("M1 2", "L1 2", "'M1 2' != 'L1 2'"),
+    ("M1 2", "M1 2 3", "'M1 2' != 'M1 2 3'"),
+])
+def test_differences(val, golden_val, description):
+    assert get_val_difference(val, golden_val, 1e-4) == description
+
+
+def test_tolerance_is_inclusive():
+    assert get_val_difference("0.5", "0.75", 0.25) is None
+    assert get_val_difference("0.5", "0.75", 0.125) is not None
+
+
+SVG_BYTES = (
+    b"<svg xmlns=\"http://www.w3.org/2000/svg\"><g id=\"a\">"
+    b"<path d=\"M0 0L1 1\" fill=\"red\"/><path d=\"M2 2\"/></g></svg>"
+)
+
+
+def test_attributes_are_compared_regardless_of_order():
+    svg_bytes = SVG_BYTES.replace(b"d=\"M0 0L1 1\" fill=\"red\"", b"fill=\"red\" d=\"M0 0L1.00001 1\"")
+    assert compare_svg_bytes(svg_bytes, SVG_BYTES) is None
+
+
+def test_first_difference_is_located():
+    svg_bytes = SVG_BYTES.replace(b"M2 2", b"M2 3")
+    assert compare_svg_bytes(svg_bytes, SVG_BYTES) == ("/svg/g#a/path[2]", "attribute d, number 1: 3.0 != 2.0")
+
+
+def test_missing_child():
+    svg_bytes = SVG_BYTES.replace(b"<path d=\"M2 2\"/>", b"")
+    assert compare_svg_bytes(svg_bytes, SVG_BYTES) == ("/svg/g#a", "1 children != 2")
@@ -0,0 +1,158 @@
+import os
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+import maplib.constants as consts
+
+from maplib.svg.tex import TexBatchWriter
+from maplib.svg.tex import TexFileBaseWriter
+from maplib.svg.tex import TexFileWriter
+from maplib.tools.job_scheduler import CommandError
+from maplib.tools.job_scheduler import run_command
+
+
+@pytest.fixture
+def tex_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(consts, "TEX_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(consts, "PRINT_TEX_WRITING_PROGRESS_MSG", False)
+    return tmp_path
+
+
+def get_cached_file_name(tex_string):
+    return TexFileBaseWriter.get_cached_svg_file_name(TexFileBaseWriter.get_new_body(tex_string))
+
+
+def get_preamble(template_body):
+    return template_body.split("\n", 1)[1]
+
+
+def test_batch_template_has_the_preamble_of_a_single_run():
+    assert consts.TEMPLATE_BATCH_TEX_FILE_BODY.startswith("\\documentclass[preview,multi=preview]{standalone}\n")
+    assert get_preamble(consts.TEMPLATE_BATCH_TEX_FILE_BODY) == get_preamble(consts.TEMPLATE_TEX_FILE_BODY)
+
+
+def test_existing_svg_file_name(tex_cache_dir):
+    tex_string = "\\heiti{A}"
+    assert TexFileBaseWriter.get_existing_svg_file_name(tex_string) is None
+    open(get_cached_file_name(tex_string), "w").close()
+    assert TexFileBaseWriter.get_existing_svg_file_name(tex_string) == get_cached_file_name(tex_string)
+
+
+def test_batch_pages_are_stored_under_the_single_run_key(tex_cache_dir, monkeypatch):
+    tex_strings = ["\\heiti{A}", "\\heiti{B}"]
+
+    def dvi_to_svg_pages(dvi_file):
+        page_svg_files = []
+        for page_num in range(len(tex_strings)):
+            page_svg_file = os.path.join(str(tex_cache_dir), "page-{0}.svg".format(page_num))
+            with open(page_svg_file, "w") as output_file:
+                output_file.write(str(page_num))
+            page_svg_files.append(page_svg_file)
+        return page_svg_files
+
+    monkeypatch.setattr(TexFileBaseWriter, "tex_to_dvi", staticmethod(lambda tex_file: tex_file[:-4] + ".xdv"))
+    monkeypatch.setattr(TexBatchWriter, "dvi_to_svg_pages", staticmethod(dvi_to_svg_pages))
+    TexBatchWriter(tex_strings)
+    for page_num, tex_string in enumerate(tex_strings):
+        with open(get_cached_file_name(tex_string)) as input_file:
+            assert input_file.read() == str(page_num)
+
+
+@pytest.mark.skipif(
+    shutil.which("xelatex") is None or shutil.which("dvisvgm") is None,
+    reason="needs xelatex and dvisvgm"
+)
+def test_batch_page_equals_a_single_run(tex_cache_dir):
+    tex_string = "\\heiti{人民广场}"
+    single_svg_file = TexFileBaseWriter(tex_string).svg_file
+    single_result = TexFileWriter.parse_svg_file(single_svg_file)
+    os.remove(single_svg_file)
+    TexBatchWriter(["\\sffamily{People's Square}", tex_string, "\\heiti{1}"])
+    batch_result = TexFileWriter.parse_svg_file(get_cached_file_name(tex_string))
+    assert batch_result[0] == single_result[0]
+    assert {
+        path_id_num: outline.to_path_string() for path_id_num, outline in batch_result[1].items()
+    } == {
+        path_id_num: outline.to_path_string() for path_id_num, outline in single_result[1].items()
+    }
+
+
+class FakeRun(object):
+    def __init__(self, error=None, returncode=0):
+        self.error = error
+        self.returncode = returncode
+        self.num_calls = 0
+
+    def __call__(self, commands, **kwargs):
+        self.num_calls += 1
+        if self.error is not None:
+            raise self.error
+        return subprocess.CompletedProcess(commands, self.returncode, b"log")
+
+
+def test_run_command_does_not_retry_exit_code(monkeypatch):
+    fake_run = FakeRun(returncode=1)
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    with pytest.raises(CommandError) as error_info:
+        run_command(["xelatex"], retries=2)
+    assert fake_run.num_calls == 1
+    assert error_info.value.log == "log"
+
+
+@pytest.mark.parametrize("error", [
+    subprocess.TimeoutExpired(["xelatex"], 1.0),
+    PermissionError("busy"),
+])
+def test_run_command_retries_timeout_and_os_error(monkeypatch, error):
+    fake_run = FakeRun(error=error)
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    with pytest.raises(CommandError):
+        run_command(["xelatex"], retries=2)
+    assert fake_run.num_calls == 3
+
+
+def test_run_command_missing_command(monkeypatch):
+    fake_run = FakeRun(error=FileNotFoundError("xelatex"))
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    with pytest.raises(CommandError):
+        run_command(["xelatex"], retries=2)
+    assert fake_run.num_calls == 1
+
+
+class FakeTexWriter(object):
+    def __init__(self, tex_string, tex_file_dict=None):
+        self.tex_string = tex_string
+        self.tex_file_dict = tex_file_dict
+        self.thread_ident = None
+        self.written = False
+
+    def get_file_dict_if_existed(self):
+        return self.tex_file_dict
+
+    def write_tex_file(self, tex_file_dict):
+        self.thread_ident = threading.get_ident()
+        if "FAIL" in self.tex_string:
+            raise CommandError(["xelatex"], "exit code 1")
+        self.written = True
+        return self
+
+    def write_empty(self):
+        self.tex_file_dict = {"h": ""}
+        return self
+
+
+def test_write_all_compiles_missing_strings_in_the_scheduler(monkeypatch):
+    batch_calls = []
+    monkeypatch.setattr(TexBatchWriter, "write_missing_tex_files", staticmethod(batch_calls.append))
+    found_writer = FakeTexWriter("\\heiti{A}", {"h": "1"})
+    missing_writers = [FakeTexWriter("\\heiti{B}"), FakeTexWriter("\\heiti{FAIL}"), FakeTexWriter("\\heiti{C}")]
+    failures = TexFileWriter.write_all([found_writer, *missing_writers])
+    assert batch_calls == [missing_writers]
+    assert found_writer.written and found_writer.thread_ident == threading.get_ident()
+    assert all([tex_writer.thread_ident != threading.get_ident() for tex_writer in missing_writers])
+    assert [tex_writer for tex_writer, error in failures] == [missing_writers[1]]
+    assert missing_writers[1].tex_file_dict == {"h": ""}
+    assert missing_writers[0].written and missing_writers[2].written
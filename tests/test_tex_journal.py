@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+
+from maplib.tools.glyph_outline import GlyphOutline
+from maplib.tools.tex_journal import TexJournal
+
+
+PATH_STRING = "M5.092496 -6.761995H2.540998C1.259999 -6.761995 1.238999 -6.898495 1.196999 -7.097995Z"
+
+
+def get_tex_obj(string, path_id_num):
+    return SimpleNamespace(
+        font_type="heiti",
+        string=string,
+        tex_file_dict={"h": path_id_num, "v": "0 0 1 1", "x": "0", "y": 0},
+        tex_path_dict={path_id_num: GlyphOutline.from_path_string(PATH_STRING)},
+    )
+
+
+@pytest.fixture
+def tex_journal(tmp_path):
+    return TexJournal(str(tmp_path / "tex.journal"))
+
+
+def get_empty_global_tex_dict():
+    return {"file": {"heiti": {}}, "path": {"heiti": {}}}
+
+
+def test_missing_journal(tex_journal):
+    assert not tex_journal.exists()
+    assert tex_journal.get_size() == 0
+    assert tex_journal.get_layer() == ({}, {})
+    assert tex_journal.apply(get_empty_global_tex_dict()) == get_empty_global_tex_dict()
+
+
+def test_round_trip(tex_journal):
+    tex_journal.append([get_tex_obj("A", "0")])
+    tex_journal.append([get_tex_obj("10号线", "1")])
+    global_tex_dict = tex_journal.apply(get_empty_global_tex_dict())
+    assert global_tex_dict["file"]["heiti"]["10号线"]["h"] == "1"
+    assert global_tex_dict["path"]["heiti"] == {"0": PATH_STRING, "1": PATH_STRING}
+    file_layer, path_layer = tex_journal.get_layer()
+    assert set(file_layer) == {("heiti", "A"), ("heiti", "10号线")}
+    assert path_layer[("heiti", "1")].to_path_string() == PATH_STRING
+
+
+def test_later_entries_win(tex_journal):
+    tex_journal.append([get_tex_obj("A", "0"), get_tex_obj("A", "1")])
+    global_tex_dict = tex_journal.apply(get_empty_global_tex_dict())
+    assert global_tex_dict["file"]["heiti"]["A"]["h"] == "1"
+
+
+def test_cut_line_is_skipped(tex_journal):
+    tex_journal.append([get_tex_obj("A", "0"), get_tex_obj("B", "1")])
+    with open(tex_journal.file_name, "rb") as input_file:
+        journal_bytes = input_file.read()
+    with open(tex_journal.file_name, "wb") as output_file:
+        output_file.write(journal_bytes[:-10])
+    assert [entry[1] for entry in tex_journal.iter_entries()] == ["A"]
+    tex_journal.append([get_tex_obj("C", "2")])
+    assert [entry[1] for entry in tex_journal.iter_entries()] == ["A", "C"]
+
+
+def test_remove(tex_journal):
+    tex_journal.append([get_tex_obj("A", "0")])
+    assert tex_journal.get_size() > 0
+    tex_journal.remove()
+    assert not tex_journal.exists()
+    tex_journal.remove()
@@ -0,0 +1,48 @@
+import sys
+
+import pytest
+
+import maplib
+import maplib.constants as consts
+
+from maplib.utils.params_getter import RenderContext
+from maplib.utils.project_watcher import ProjectWatcher
+
+
+@pytest.fixture
+def temp_outputs(tmp_path, monkeypatch):
+    """
+    main renders the default style of Shanghai into tmp_path, and the
+    watch loop runs a single update for a change of input.json.
+    """
+    list_from_cmd = RenderContext.list_from_cmd
+
+    def list_temp_contexts_from_cmd(args=None):
+        contexts = list_from_cmd(args)
+        for context in contexts:
+            context.OUTPUT_SVG_DIR = str(tmp_path / (context.OUTPUT_FILE_NAME + ".svg"))
+            context.RENDER_CACHE_DIR = str(tmp_path / (context.OUTPUT_FILE_NAME + "-cache.json"))
+        return contexts
+
+    updates = []
+
+    def watch(project_watcher):
+        context = project_watcher.contexts[0]
+        num_hits = context.component_cache.num_hits
+        project_watcher.update([context.INPUT_JSON_DIR])
+        updates.append(context.component_cache.num_hits - num_hits)
+        return project_watcher
+
+    monkeypatch.setattr(RenderContext, "list_from_cmd", staticmethod(list_temp_contexts_from_cmd))
+    monkeypatch.setattr(ProjectWatcher, "watch", watch)
+    monkeypatch.setattr(consts, "OPEN_OUTPUT_FILE_AT_ONCE", False)
+    return updates
+
+
+def test_first_watched_update_reuses_components(temp_outputs, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["main.py", "-s", "default_style"])
+    maplib.main()
+    monkeypatch.setattr(sys, "argv", ["main.py", "-s", "default_style", "-w"])
+    maplib.main()
+    assert len(temp_outputs) == 1
+    assert temp_outputs[0] > 0